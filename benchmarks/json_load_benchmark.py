@@ -0,0 +1,62 @@
+"""
+Benchmark of the JSON load throughput (items/sec), with and without per-item validation.
+
+Run from the repository root:
+
+    poetry run python benchmarks/json_load_benchmark.py --items 200000
+"""
+
+import argparse, importlib, json, os, random, sys, tempfile, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+JsonDataLoader = importlib.import_module(
+    "data-filter.data_loader.json_data_loader"
+).JsonDataLoader
+
+
+def write_dataset(path: str, items: int):
+    """
+    Write a JSON file holding `items` random items.
+    """
+    data = [
+        {
+            "item": {
+                "field1": f"value{i}",
+                "field2": random.randint(0, 1000),
+                "field3": random.random() * 100,
+                "field4": random.random() < 0.5,
+                "field5": [random.randint(0, 100) for _ in range(5)],
+            }
+        }
+        for i in range(items)
+    ]
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"data": data}, file)
+
+
+def measure(path: str, items: int, repeat: int, **loader_options) -> float:
+    """
+    Return the best load throughput in items/sec over `repeat` runs.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        JsonDataLoader(data_source=path, **loader_options).load_data()
+        best = min(best, time.perf_counter() - start)
+    return items / best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "benchmark.json")
+        write_dataset(path, args.items)
+        validated = measure(path, args.items, args.repeat)
+        trusted = measure(path, args.items, args.repeat, trusted=True)
+
+    print(f"validated: {validated:,.0f} items/sec")
+    print(f"trusted:   {trusted:,.0f} items/sec ({trusted / validated:.1f}x)")
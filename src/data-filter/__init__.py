@@ -1,115 +1,430 @@
-import argparse
+import argparse, json, shlex, sys
+import pandas as pd
+import yaml
+from .config import Config, get_config
 from .data_loader.factory import Factory
+from .data_loader.dataset_cache import DEFAULT_CACHE_DIR, DatasetCache
+from .data_loader.sharded_data_loader import (
+    ShardedDataLoader,
+    is_sharded,
+    list_data_files,
+)
+from .data_loader.yaml_data_loader import SafeDumper
 from .stats.csv_stats import CSVStats
+from .stats.incremental_stats import IncrementalStats
+from .stats.sketches import (
+    DEFAULT_DISTINCT_ERROR,
+    DEFAULT_FREQUENCY_ERROR,
+    DEFAULT_RANK_ERROR,
+    DEFAULT_TOP_K,
+    SketchAccumulator,
+)
 from .stats.json_stats import JSONStats
 from .models.data_containers.json_data_container import JsonDataContainer
+from .models.data_containers.json_data_view import JsonDataView
+from .models.data_containers.xml_data_container import XMLDataContainer
 from .sorter.csv_sorter import CSVSorter
 from .sorter.json_sorter import JsonSorter
+from .sorter.external_sorter import ExternalSorter
 from .filter.csv_filter import CSVFilter
 from .filter.json_filter import JSONFilter
+from .filter.predicate import parse_expression, parse_value
+from .query_plan import QueryPlan
 
+# file types loaded as records into the JSON containers
+RECORD_FILE_TYPES = ("json", "xml", "yaml", "yml")
 
-def create_cli():
-    data = None
-    file_type = None
-    while True:
-        parser = argparse.ArgumentParser(description="Data Filter CLI Application")
-        parser.add_argument(
-            "--version", action="version", version="Data Filter CLI 1.0"
-        )
-        subparsers = parser.add_subparsers(dest="command", help="Sub-command help")
-
-        # loading data
-        load_parser = subparsers.add_parser("load", help="Load data")
-        load_parser.add_argument("file", type=str, help="Path to the data file")
-        # load_parser.add_argument('type', type=str, choices=['csv', 'json'], help='Type of the data file (csv or json)')
-
-        # stats command
-        stats_parser = subparsers.add_parser("stats", help="Display statistics")
-
-        # sort command
-        sort_parser = subparsers.add_parser("sort", help="Sort data")
-        # sort_parser.add_argument("file", type=str, help="Path to the data file")
-        sort_parser.add_argument("key", type=str, help="Key/Column to sort by")
-        sort_parser.add_argument(
-            "--reverse", action="store_true", help="Sort in descending order"
-        )
+XML_DOCUMENT_MESSAGE = (
+    "The XML document was loaded as a dict. Please load its records with --record-tag."
+)
 
-        # filter command
-        filter_parser = subparsers.add_parser("filter", help="Filter data")
-        # filter_parser.add_argument('file', type=str, help='Path to the data file')
-        filter_parser.add_argument("column", type=str, help="Column/Key to filter by")
-        filter_parser.add_argument("value", type=str, help="Value to filter by")
-        filter_parser.add_argument(
-            "--comparison",
-            type=str,
-            choices=["eq", "lt", "gt"],
-            default="eq",
-            help="Comparison type",
-        )
 
-        # display parser
-        display_parser = subparsers.add_parser("display", help="Display data")
+def _build_parser(config: Config) -> argparse.ArgumentParser:
+    """
+    Build the parser of the interactive commands, once for the whole session.
+
+    Args:
+        config (Config): The config of the CLI, holding the defaults of the options.
+    """
+    parser = argparse.ArgumentParser(description="Data Filter CLI Application")
+    parser.add_argument("--version", action="version", version="Data Filter CLI 1.0")
+    subparsers = parser.add_subparsers(dest="command", help="Sub-command help")
+
+    # loading data
+    load_parser = subparsers.add_parser("load", help="Load data")
+    load_parser.add_argument(
+        "file",
+        type=str,
+        help="Path to the data file, or a directory or quoted glob pattern of data "
+        "files, e.g. 'exports/*.json'",
+    )
+    load_parser.add_argument(
+        "--trusted",
+        action=argparse.BooleanOptionalAction,
+        default=config.data_loader.trusted_input,
+        help="Skip the validation of each JSON item, only validating a sample "
+        "(default: trusted_input of the config)",
+    )
+    load_parser.add_argument(
+        "--record-tag",
+        type=str,
+        default=config.data_loader.xml_record_tag,
+        help="Tag of the repeated XML elements loaded as records, e.g. flower "
+        "(default: xml_record_tag of the config)",
+    )
+    load_parser.add_argument(
+        "--columnar",
+        action="store_true",
+        help="Store JSON/XML/YAML records column by column for faster filter, sort and stats",
+    )
+    load_parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Read the parsed data from the on-disk cache, filling it on a miss",
+    )
+    load_parser.add_argument(
+        "--mmap",
+        action="store_true",
+        help="Memory-map the numeric CSV columns, converted once to .npy files",
+    )
+    load_parser.add_argument(
+        "--lazy",
+        action="store_true",
+        help="Only plan the load, filter and sort commands, run on display, stats or save",
+    )
+    load_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="With --lazy, load, filter and compute stats with N processes",
+    )
+    load_parser.add_argument(
+        "--filter",
+        nargs=2,
+        metavar=("COLUMN", "VALUE"),
+        help="Only keep the rows matching the filter while reading the file",
+    )
+    load_parser.add_argument(
+        "--comparison",
+        type=str,
+        choices=["eq", "lt", "gt"],
+        default="eq",
+        help="Comparison type of the load filter",
+    )
+    load_parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=100_000,
+        help="Number of rows/items read at a time when filtering on load",
+    )
+    load_parser.add_argument(
+        "--columns",
+        type=str,
+        help="Comma separated list of CSV columns to keep when filtering on load",
+    )
+    # load_parser.add_argument('type', type=str, choices=['csv', 'json'], help='Type of the data file (csv or json)')
+
+    # stats command
+    stats_parser = subparsers.add_parser("stats", help="Display statistics")
+    _add_sketch_arguments(stats_parser)
+
+    # sort command
+    sort_parser = subparsers.add_parser("sort", help="Sort data")
+    # sort_parser.add_argument("file", type=str, help="Path to the data file")
+    sort_parser.add_argument("key", type=str, help="Key/Column to sort by")
+    sort_parser.add_argument(
+        "--reverse", action="store_true", help="Sort in descending order"
+    )
+    sort_parser.add_argument(
+        "--limit",
+        type=int,
+        metavar="K",
+        help="Only keep the first K sorted rows, without sorting the others",
+    )
+
+    # external sort command
+    sort_file_parser = subparsers.add_parser(
+        "sort-file", help="Sort a file larger than memory into another file"
+    )
+    sort_file_parser.add_argument("file", type=str, help="Path to the data file")
+    sort_file_parser.add_argument("output", type=str, help="Path of the sorted file")
+    sort_file_parser.add_argument(
+        "keys", type=str, nargs="+", help="Keys/Columns to sort by"
+    )
+    sort_file_parser.add_argument(
+        "--reverse", action="store_true", help="Sort in descending order"
+    )
+    sort_file_parser.add_argument(
+        "--memory-budget",
+        type=int,
+        default=config.sorter.memory_budget_mb,
+        metavar="MB",
+        help="Maximum size of the rows held in memory, in megabytes "
+        "(default: memory_budget_mb of the config)",
+    )
+    sort_file_parser.add_argument(
+        "--trusted",
+        action=argparse.BooleanOptionalAction,
+        default=config.data_loader.trusted_input,
+        help="Skip the validation of each JSON item, only validating a sample "
+        "(default: trusted_input of the config)",
+    )
+
+    # filter command
+    filter_parser = subparsers.add_parser("filter", help="Filter data")
+    # filter_parser.add_argument('file', type=str, help='Path to the data file')
+    filter_parser.add_argument(
+        "column", type=str, nargs="?", help="Column/Key to filter by"
+    )
+    filter_parser.add_argument("value", type=str, nargs="?", help="Value to filter by")
+    filter_parser.add_argument(
+        "--index",
+        action="store_true",
+        help="Answer the filter with an index kept across filter commands",
+    )
+    filter_parser.add_argument(
+        "--where",
+        type=str,
+        help='Filter expression, e.g. "field2 gt 5 and not field1 contains x"',
+    )
+    filter_parser.add_argument(
+        "--comparison",
+        type=str,
+        choices=["eq", "lt", "gt"],
+        default="eq",
+        help="Comparison type",
+    )
 
-        exit_parser = subparsers.add_parser("exit", help="Exit the CLI")
+    # cache invalidation command
+    invalidate_parser = subparsers.add_parser(
+        "invalidate-cache", help="Remove cached data from the on-disk cache"
+    )
+    invalidate_parser.add_argument(
+        "file",
+        type=str,
+        nargs="?",
+        help="Path to the data file to invalidate, the whole cache if omitted",
+    )
 
-        args = parser.parse_args(input("Enter command: ").split())
+    # lazy plan commands
+    explain_parser = subparsers.add_parser(
+        "explain", help="Display the optimized plan of a lazy load"
+    )
+    save_parser = subparsers.add_parser("save", help="Save data to a file")
+    save_parser.add_argument(
+        "output", type=str, help="Path of the output file (csv, json, xml or yaml)"
+    )
+    save_parser.add_argument(
+        "--record-tag",
+        type=str,
+        help="Tag of the XML record elements written, item if omitted",
+    )
+
+    # display parser
+    display_parser = subparsers.add_parser("display", help="Display data")
+
+    exit_parser = subparsers.add_parser("exit", help="Exit the CLI")
+
+    return parser
+
+
+def create_cli():
+    data = None
+    file_type = None
+    parser = _build_parser(get_config())
+    while True:
+        try:
+            command = shlex.split(input("Enter command: "))
+        except ValueError as e:
+            print(f"Invalid command: {e}")
+            continue
+        args = parser.parse_args(command)
 
         if args.command is None:
             parser.print_help()
         else:
             if args.command == "load":
-                data = load_data(args.file)
-                file_type = args.file.split(".")[-1]
+                if args.lazy:
+                    data = plan_data(
+                        args.file,
+                        trusted=args.trusted,
+                        record_tag=args.record_tag,
+                        workers=args.workers,
+                    )
+                elif args.filter is None:
+                    data = load_data(
+                        args.file,
+                        columnar=args.columnar,
+                        trusted=args.trusted,
+                        record_tag=args.record_tag,
+                        cache=args.cache,
+                        mmap=args.mmap,
+                    )
+                else:
+                    data = load_filtered_data(
+                        args.file,
+                        column=args.filter[0],
+                        value=parse_value(args.filter[1]),
+                        comparison=args.comparison,
+                        chunksize=args.chunksize,
+                        columns=args.columns.split(",") if args.columns else None,
+                        trusted=args.trusted,
+                        record_tag=args.record_tag,
+                    )
+                file_type = _get_file_type(args.file)
             elif args.command == "stats":
                 if data is None:
                     print("Data not loaded. Please load data first.")
+                elif isinstance(data, dict):
+                    print(XML_DOCUMENT_MESSAGE)
                 else:
-                    display_stats(data, loader_name=file_type)
+                    display_stats(
+                        data, loader_name=file_type, sketch=_sketch_options(args)
+                    )
             elif args.command == "sort":
                 if data is None:
                     print("Data not loaded. Please load data first.")
+                elif isinstance(data, dict):
+                    print(XML_DOCUMENT_MESSAGE)
+                elif isinstance(data, QueryPlan):
+                    data.sort(args.key, reverse=args.reverse)
+                    if args.limit is not None:
+                        data.limit(args.limit)
                 else:
                     sort_data(
-                        data, loader_name=file_type, key=args.key, reverse=args.reverse
+                        data,
+                        loader_name=file_type,
+                        key=args.key,
+                        reverse=args.reverse,
+                        limit=args.limit,
                     )
+            elif args.command == "sort-file":
+                sort_file(
+                    args.file,
+                    args.output,
+                    keys=args.keys,
+                    reverse=args.reverse,
+                    memory_budget_mb=args.memory_budget,
+                    trusted=args.trusted,
+                )
             elif args.command == "filter":
                 if data is None:
                     print("Data not loaded. Please load data first.")
+                elif isinstance(data, dict):
+                    print(XML_DOCUMENT_MESSAGE)
                 else:
-                    # attempt to convert the value to an integer, float, or boolean
-                    try:
-                        value = int(args.value)
-                    except ValueError:
-                        try:
-                            value = float(args.value)
-                        except ValueError:
-                            if args.value.lower() == "true":
-                                value = True
-                            elif args.value.lower() == "false":
-                                value = False
-                            else:
-                                value = args.value
-                    filter_data(
-                        data,
-                        loader_name=file_type,
-                        column=args.column,
-                        value=value,
-                        comparison=args.comparison,
-                    )
+                    if isinstance(data, QueryPlan) and args.where is not None:
+                        data.where(parse_expression(args.where))
+                    elif args.where is not None:
+                        filter_data_by_expression(
+                            data, loader_name=file_type, expression=args.where
+                        )
+                    elif args.column is None or args.value is None:
+                        print("Please provide a column and a value, or --where.")
+                    elif isinstance(data, QueryPlan):
+                        data.filter(
+                            args.column,
+                            parse_value(args.value),
+                            comparison=args.comparison,
+                        )
+                    else:
+                        filter_data(
+                            data,
+                            loader_name=file_type,
+                            column=args.column,
+                            value=parse_value(args.value),
+                            comparison=args.comparison,
+                            use_index=args.index,
+                        )
+            elif args.command == "invalidate-cache":
+                invalidate_cache(args.file)
+            elif args.command == "explain":
+                if isinstance(data, QueryPlan):
+                    print(data.explain())
+                else:
+                    print("No plan. Please load data with --lazy first.")
+            elif args.command == "save":
+                if data is None:
+                    print("Data not loaded. Please load data first.")
+                elif isinstance(data, dict):
+                    print(XML_DOCUMENT_MESSAGE)
+                else:
+                    save_data(data, args.output, record_tag=args.record_tag)
             elif args.command == "display":
                 if data is None:
                     print("Data not loaded. Please load data first.")
                 else:
-                    if file_type == "csv":
-                        print(data.head(-1))
-                    elif file_type == "json":
-                        pretty_print_json(data)
+                    rows = execute_plan(data) if isinstance(data, QueryPlan) else data
+                    if rows is not None and file_type == "csv":
+                        print(rows.head(-1))
+                    elif isinstance(rows, dict):
+                        print(json.dumps(rows, indent=4))
+                    elif rows is not None and file_type in RECORD_FILE_TYPES:
+                        pretty_print_json(rows)
             elif args.command == "exit":
                 print("Exiting the CLI.")
                 break
 
 
+def plan_data(file_path, trusted=False, record_tag=None, workers=1):
+    """
+    Create a lazy plan over a data file, or a directory of data files.
+
+    Args:
+        file_path (str): The path to the data file or directory.
+        trusted (bool): Whether to skip the validation of each JSON item.
+        record_tag (str): The tag of the XML record elements.
+        workers (int): The number of processes running the plan.
+
+    Returns:
+        QueryPlan: The plan, None if the path cannot be planned.
+    """
+    try:
+        plan = QueryPlan(
+            file_path, trusted=trusted, record_tag=record_tag, workers=workers
+        )
+        print(f"Planned {file_path}, run on display, stats or save")
+        return plan
+    except Exception as e:
+        print(f"Error planning data: {e}")
+
+
+def execute_plan(plan):
+    """
+    Run a lazy plan.
+
+    Args:
+        plan (QueryPlan): The plan to run.
+
+    Returns:
+        The resulting rows, None if the plan failed.
+    """
+    try:
+        return plan.execute()
+    except Exception as e:
+        print(f"Error running the plan: {e}")
+
+
+def save_data(data, output_path, record_tag=None):
+    """
+    Save the data, or the result of a lazy plan, to a file.
+
+    Args:
+        data: The data, or a QueryPlan.
+        output_path (str): The path of the output file (csv, json, xml or yaml).
+        record_tag (str): The tag of the XML record elements, "item" if None.
+    """
+    try:
+        rows = data.execute() if isinstance(data, QueryPlan) else data
+        if not isinstance(rows, (pd.DataFrame, JsonDataView)):
+            rows = JsonDataView.of(rows)
+        _write_rows(rows, output_path, record_tag)
+        print(f"Saved {len(rows)} rows to {output_path}")
+    except Exception as e:
+        print(f"Error saving data: {e}")
+
+
 def pretty_print_json(data: JsonDataContainer):
     """
     Pretty print the JSON data.
@@ -123,22 +438,44 @@ def pretty_print_json(data: JsonDataContainer):
         print()
 
 
-def load_data(file_path):
+def load_data(
+    file_path, columnar=False, trusted=False, record_tag=None, cache=False, mmap=False
+):
     """
     Load data from the specified file path using the specified file type.
 
     Args:
         file_path (str): The path to the data file.
+        columnar (bool): Whether to load JSON/XML/YAML records into a columnar container.
+        trusted (bool): Whether to skip the validation of each JSON item.
+        record_tag (str): The tag of the XML record elements.
+        cache (bool): Whether to use the on-disk cache of parsed data.
+        mmap (bool): Whether to memory-map the numeric columns of a CSV file.
     """
     try:
-        loader_name = file_path.split(".")[-1]
-        data_loader = Factory.get_data_loader(
-            loader_name=loader_name, data_source=file_path
-        )
-        data = data_loader.load_data()
+        loader_name = _get_file_type(file_path)
+        if is_sharded(file_path):
+            data_loader = ShardedDataLoader(file_path, trusted, record_tag)
+            if columnar and loader_name in RECORD_FILE_TYPES:
+                data = data_loader.load_columnar_data()
+            else:
+                data = data_loader.load_data()
+            if data is None:
+                raise ValueError(f"Could not load {file_path}")
+        elif mmap and loader_name == "csv":
+            data = _get_data_loader(file_path).load_mmap_data()
+        elif cache:
+            data = _load_cached_data(file_path, columnar, trusted, record_tag)
+        else:
+            data_loader = _get_data_loader(file_path, trusted, record_tag)
+            if columnar and loader_name in RECORD_FILE_TYPES:
+                data = data_loader.load_columnar_data()
+            else:
+                data = data_loader.load_data()
         if loader_name == "csv":
             print(data.head(-1))
-        elif loader_name == "json":
+        elif loader_name in RECORD_FILE_TYPES and not isinstance(data, dict):
+            # an XML document loaded without record tag is a plain dict
             pretty_print_json(data)
         print(f"Loaded {loader_name.upper()} data from {file_path}:")
         return data
@@ -146,53 +483,220 @@ def load_data(file_path):
         print(f"Error loading data: {e}")
 
 
-def display_stats(data, loader_name):
+def _load_cached_data(file_path, columnar=False, trusted=False, record_tag=None):
     """
-    Display statistics for the specified data file.
+    Load data from the on-disk cache, parsing the file and caching it on a miss.
+    Records are cached column by column whether they are loaded columnar or not.
 
     Args:
-        data: The data to display statistics for.
-        loader_name (str): The type of the data file (csv or json).
+        file_path (str): The path to the data file.
+        columnar (bool): Whether to load JSON/XML/YAML records into a columnar container.
+        trusted (bool): Whether to skip the validation of each JSON item.
+        record_tag (str): The tag of the XML record elements.
+    """
+    loader_name = file_path.split(".")[-1]
+    cache = _get_dataset_cache()
+    options = {"trusted": trusted, "record_tag": record_tag}
+    data = cache.get(file_path, options)
+    if data is None:
+        data_loader = _get_data_loader(file_path, trusted, record_tag)
+        if loader_name in RECORD_FILE_TYPES:
+            data = data_loader.load_columnar_data()
+        else:
+            data = data_loader.load_data()
+        if data is None:
+            raise ValueError(f"Could not load {file_path}")
+        cache.put(file_path, data, options)
+    if loader_name in RECORD_FILE_TYPES and not columnar:
+        return data.to_json_container()
+    return data
+
+
+def _get_dataset_cache():
+    """
+    Get the on-disk cache of parsed data, with the directory and size of the config.
+    """
+    cache_config = get_config().cache
+    return DatasetCache(
+        directory=cache_config.directory or DEFAULT_CACHE_DIR,
+        max_size=cache_config.max_size_mb * 1024 * 1024,
+    )
+
+
+def invalidate_cache(file_path=None):
+    """
+    Remove the cached data of a file, or the whole on-disk cache.
+
+    Args:
+        file_path (str): The path to the data file, all files if None.
     """
     try:
+        removed = _get_dataset_cache().invalidate(file_path)
+        print(f"Removed {removed} cache entries")
+    except Exception as e:
+        print(f"Error invalidating the cache: {e}")
+
+
+def load_filtered_data(
+    file_path,
+    column,
+    value,
+    comparison,
+    chunksize,
+    columns=None,
+    trusted=False,
+    record_tag=None,
+):
+    """
+    Load only the rows matching the filter, applying it while the file is read.
+
+    Args:
+        file_path (str): The path to the data file.
+        column (str): The column/key to filter by.
+        value: The value to filter by.
+        comparison (str): The type of comparison ('eq', 'lt', 'gt').
+        chunksize (int): The number of rows/items read at a time.
+        columns (list): The CSV columns to keep, all columns if None.
+        trusted (bool): Whether to skip the validation of each JSON item.
+        record_tag (str): The tag of the XML record elements.
+    """
+    try:
+        loader_name = _get_file_type(file_path)
+        if is_sharded(file_path):
+            # only the files whose partition values may match the filter are opened
+            plan = QueryPlan(file_path, trusted=trusted, record_tag=record_tag)
+            plan.filter(column, value, comparison=comparison)
+            if columns is not None and loader_name == "csv":
+                plan.select(columns)
+            data = plan.execute()
+            if loader_name == "csv":
+                print(data.head(-1))
+            else:
+                pretty_print_json(data)
+            print(f"Loaded filtered {loader_name.upper()} data from {file_path}:")
+            return data
+        data_loader = _get_data_loader(file_path, trusted, record_tag)
         if loader_name == "csv":
-            stats = CSVStats(data)
-        elif loader_name == "json":
-            stats = JSONStats(data)
+            data = data_loader.load_filtered_data(
+                column,
+                value,
+                comparison=comparison,
+                chunksize=chunksize,
+                usecols=columns,
+            )
+            print(data.head(-1))
+        elif loader_name in RECORD_FILE_TYPES:
+            items = []
+            for batch in data_loader.iter_data(batch_size=chunksize):
+                filterer = JSONFilter(batch)
+                filterer.filter_by_key(column, value, comparison=comparison)
+                items.extend(filterer.get_filtered_data().data)
+            data = JsonDataContainer.model_construct(data=items)
+            pretty_print_json(data)
+        else:
+            raise ValueError(f"Filtering on load is not supported for: {loader_name}")
+        print(f"Loaded filtered {loader_name.upper()} data from {file_path}:")
+        return data
+    except Exception as e:
+        print(f"Error loading data: {e}")
+
+
+def _get_file_type(file_path):
+    """
+    Get the type of a data file, or of the data files named by a directory or a glob
+    pattern, from the extension.
+
+    Args:
+        file_path (str): The path to the data file, directory or glob pattern.
+
+    Returns:
+        str: The file type, None if no data file matches.
+    """
+    if is_sharded(file_path):
+        try:
+            return list_data_files(file_path)[0].split(".")[-1]
+        except ValueError:
+            return None
+    return file_path.split(".")[-1]
+
+
+def _get_data_loader(file_path, trusted=False, record_tag=None):
+    """
+    Get the data loader of a file, from its extension.
+
+    Args:
+        file_path (str): The path to the data file.
+        trusted (bool): Whether to skip the validation of each JSON item.
+        record_tag (str): The tag of the XML record elements, the XML document is
+            loaded as a dict if None.
+    """
+    loader_name = file_path.split(".")[-1]
+    return Factory.get_data_loader(
+        loader_name=loader_name,
+        data_source=file_path,
+        trusted=trusted,
+        record_tag=record_tag,
+    )
+
+
+def display_stats(data, loader_name, sketch=None):
+    """
+    Display statistics for the specified data file.
+
+    Args:
+        data: The data to display statistics for, or a QueryPlan.
+        loader_name (str): The type of the data file (csv, json, xml or yaml).
+        sketch (dict): The error bounds of approximate stats, as SketchAccumulator
+            arguments, None for exact stats.
+    """
+    try:
+        if isinstance(data, QueryPlan):
+            all_stats = data.stats(sketch)
+        elif loader_name not in RECORD_FILE_TYPES + ("csv",):
+            raise ValueError(f"Unsupported file type: {loader_name}")
+        elif sketch is not None:
+            all_stats = _approx_stats(data, sketch)
+        elif loader_name == "csv":
+            all_stats = CSVStats(data).get_all_stats()
+        elif loader_name in RECORD_FILE_TYPES:
+            all_stats = JSONStats(data).get_all_stats()
         else:
             raise ValueError(f"Unsupported file type: {loader_name}")
 
-        all_stats = stats.get_all_stats()
         # unpack the dictionary and display the stats
         for key, value in all_stats.items():
             print(f"{key.capitalize()} statistics:")
             for field, field_stats in value.items():
                 print(f"  {field.capitalize()}:")
                 for stat, stat_value in field_stats.items():
-                    print(f"    {stat.replace('_', ' ').capitalize()}: {stat_value}")
+                    if key != "heavy_hitter_stats":
+                        # heavy hitters are keyed by the values themselves
+                        stat = stat.replace("_", " ").capitalize()
+                    print(f"    {stat}: {stat_value}")
     except Exception as e:
         print(f"Error displaying stats: {e}")
 
 
-def sort_data(data, loader_name, key, reverse):
+def sort_data(data, loader_name, key, reverse, limit=None):
     """
     Sort the data by the specified key.
 
     Args:
         data: The data to sort.
-        loader_name (str): The type of the data file (csv or json).
+        loader_name (str): The type of the data file (csv, json, xml or yaml).
         key (str): The key/column to sort by.
         reverse (bool): Whether to sort in descending order.
+        limit (int): Only keep the first `limit` sorted rows, all rows if None.
     """
     try:
         if loader_name == "csv":
             sorter = CSVSorter(data)
-            sorter.sort_by_column(key, ascending=not reverse)
+            sorter.sort_by_column(key, ascending=not reverse, limit=limit)
             sorted_data = sorter.get_sorted_dataframe()
             print(sorted_data.head(-1))
-        elif loader_name == "json":
+        elif loader_name in RECORD_FILE_TYPES:
             sorter = JsonSorter(data)
-            sorter.sort_by_key(key, reverse=reverse)
+            sorter.sort_by_key(key, reverse=reverse, limit=limit)
             sorted_data = sorter.get_sorted_data()
             pretty_print_json(sorted_data)
         else:
@@ -201,25 +705,60 @@ def sort_data(data, loader_name, key, reverse):
         print(f"Error sorting data: {e}")
 
 
-def filter_data(data, loader_name, column, value, comparison):
+def sort_file(
+    file_path, output_path, keys, reverse, memory_budget_mb=256, trusted=False
+):
+    """
+    Sort a data file into another file with an external merge sort, holding at most
+    the memory budget of rows in memory.
+
+    Args:
+        file_path (str): The path to the data file.
+        output_path (str): The path of the sorted file.
+        keys (list): The keys/columns to sort by.
+        reverse (bool): Whether to sort in descending order.
+        memory_budget_mb (int): The memory budget, in megabytes.
+        trusted (bool): Whether to skip the validation of each JSON item.
+    """
+    try:
+        loader_name = file_path.split(".")[-1]
+        sorter = ExternalSorter(
+            keys, reverse=reverse, memory_budget=memory_budget_mb * 1024 * 1024
+        )
+        if loader_name == "csv":
+            count = sorter.sort_csv_file(file_path, output_path)
+        elif loader_name == "json":
+            count = sorter.sort_json_file(file_path, output_path, trusted=trusted)
+        else:
+            raise ValueError(f"Unsupported file type: {loader_name}")
+        print(
+            f"Sorted {count} rows of {file_path} into {output_path} "
+            f"({sorter.run_count} runs)"
+        )
+    except Exception as e:
+        print(f"Error sorting file: {e}")
+
+
+def filter_data(data, loader_name, column, value, comparison, use_index=False):
     """
     Filter the data by the specified column and value.
 
     Args:
         data: The data to filter.
-        loader_name (str): The type of the data file (csv or json).
+        loader_name (str): The type of the data file (csv, json, xml or yaml).
         column (str): The column/key to filter by.
         value (str): The value to filter by.
         comparison (str): The type of comparison ('eq', 'lt', 'gt').
+        use_index (bool): Whether to answer the filter with a secondary index.
     """
     try:
         if loader_name == "csv":
-            filterer = CSVFilter(data)
+            filterer = CSVFilter(data, use_index=use_index)
             filterer.filter_by_column(column, value, comparison=comparison)
             filtered_data = filterer.get_filtered_dataframe()
             print(filtered_data.head(-1))
-        elif loader_name == "json":
-            filterer = JSONFilter(data)
+        elif loader_name in RECORD_FILE_TYPES:
+            filterer = JSONFilter(data, use_index=use_index)
             filterer.filter_by_key(column, value, comparison=comparison)
             filtered_data = filterer.get_filtered_data()
             pretty_print_json(filtered_data)
@@ -227,3 +766,504 @@ def filter_data(data, loader_name, column, value, comparison):
             raise ValueError(f"Unsupported file type: {loader_name}")
     except Exception as e:
         print(f"Error filtering data: {e}")
+
+
+def filter_data_by_expression(data, loader_name, expression):
+    """
+    Filter the data by a predicate expression, compiled once and applied in a single pass.
+
+    Args:
+        data: The data to filter.
+        loader_name (str): The type of the data file (csv, json, xml or yaml).
+        expression (str): The filter expression, e.g. "field2 gt 5 and field4 eq true".
+    """
+    try:
+        predicate = parse_expression(expression)
+        if loader_name == "csv":
+            filterer = CSVFilter(data)
+            filterer.filter_by_predicate(predicate)
+            print(filterer.get_filtered_dataframe().head(-1))
+        elif loader_name in RECORD_FILE_TYPES:
+            filterer = JSONFilter(data)
+            filterer.filter_by_predicate(predicate)
+            pretty_print_json(filterer.get_filtered_data())
+        else:
+            raise ValueError(f"Unsupported file type: {loader_name}")
+    except Exception as e:
+        print(f"Error filtering data: {e}")
+
+
+# exit codes of the non-interactive run mode
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_USAGE = 2
+EXIT_EMPTY = 3
+
+
+class _AppendStep(argparse.Action):
+    """
+    Record the pipeline options in a single list, in command line order.
+    """
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        steps = list(getattr(namespace, "steps", None) or [])
+        steps.append((self.dest, values))
+        namespace.steps = steps
+
+
+def _fraction(value: str) -> float:
+    """
+    Parse an error bound, strictly between 0 and 1.
+    """
+    try:
+        bound = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number: {value}")
+    if not 0 < bound < 1:
+        raise argparse.ArgumentTypeError(f"must be between 0 and 1, got: {value}")
+    return bound
+
+
+def _add_sketch_arguments(parser: argparse.ArgumentParser):
+    """
+    Add the options of the approximate stats to the parser of a command.
+    """
+    parser.add_argument(
+        "--approx",
+        action="store_true",
+        help="Compute approximate distinct counts, quantiles and most frequent values "
+        "with sketches, in one pass with bounded memory",
+    )
+    parser.add_argument(
+        "--distinct-error",
+        type=_fraction,
+        default=DEFAULT_DISTINCT_ERROR,
+        metavar="E",
+        help="With --approx, relative standard error of the distinct counts "
+        "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--rank-error",
+        type=_fraction,
+        default=DEFAULT_RANK_ERROR,
+        metavar="E",
+        help="With --approx, error of the quantiles as a fraction of the number of "
+        "values (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--frequency-error",
+        type=_fraction,
+        default=DEFAULT_FREQUENCY_ERROR,
+        metavar="E",
+        help="With --approx, overestimate of the counts of the most frequent values as "
+        "a fraction of the number of values, values less frequent than that are not "
+        "reported (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=DEFAULT_TOP_K,
+        metavar="K",
+        help="With --approx, number of most frequent values per column/key "
+        "(default: %(default)s)",
+    )
+
+
+def _sketch_options(args) -> dict:
+    """
+    Get the SketchAccumulator arguments of the parsed options, None without --approx.
+    """
+    if not args.approx:
+        return None
+    return {
+        "distinct_error": args.distinct_error,
+        "rank_error": args.rank_error,
+        "frequency_error": args.frequency_error,
+        "top_k": args.top,
+    }
+
+
+def _build_run_parser(config: Config) -> argparse.ArgumentParser:
+    """
+    Build the parser of the non-interactive run mode.
+
+    Args:
+        config (Config): The config of the CLI, holding the defaults of the options.
+    """
+    parser = argparse.ArgumentParser(
+        prog="data-filter",
+        description="Run a data pipeline in one pass, without prompting.",
+        epilog=(
+            f"Exit codes: {EXIT_OK} on success, {EXIT_ERROR} on error, "
+            f"{EXIT_USAGE} on invalid arguments, {EXIT_EMPTY} with --fail-on-empty "
+            "when no row is left."
+        ),
+    )
+    parser.add_argument("--version", action="version", version="Data Filter CLI 1.0")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser(
+        "run",
+        help="Load a file, apply the steps in order and write the result",
+        description="Steps (--filter, --where, --sort, --limit) apply in the given "
+        "order. They form a lazy plan, optimized before it runs.",
+    )
+    run_parser.add_argument(
+        "file",
+        type=str,
+        help="Path to the data file, or a directory or quoted glob pattern of data files",
+    )
+    run_parser.add_argument(
+        "--filter",
+        nargs=3,
+        action=_AppendStep,
+        metavar=("COLUMN", "COMPARISON", "VALUE"),
+        help="Keep the rows where COLUMN compares to VALUE, COMPARISON being eq, lt or gt",
+    )
+    run_parser.add_argument(
+        "--where",
+        type=str,
+        action=_AppendStep,
+        help='Keep the rows matching an expression, e.g. "field2 gt 5 and field4 eq true"',
+    )
+    run_parser.add_argument(
+        "--sort",
+        nargs="+",
+        action=_AppendStep,
+        metavar="KEY",
+        help="Sort by one or more keys/columns",
+    )
+    run_parser.add_argument(
+        "--limit",
+        type=int,
+        action=_AppendStep,
+        metavar="K",
+        help="Keep the first K rows",
+    )
+    run_parser.add_argument(
+        "--reverse", action="store_true", help="Sort in descending order"
+    )
+    run_parser.add_argument(
+        "--columns",
+        type=str,
+        help="Comma separated list of the columns/keys to output, only loading the "
+        "columns needed by the steps",
+    )
+    run_parser.add_argument(
+        "--explain",
+        action="store_true",
+        help="Print the optimized plan instead of running it",
+    )
+    run_parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Write the statistics of the result to stdout, as JSON",
+    )
+    _add_sketch_arguments(run_parser)
+    run_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="With --stats and no step, keep the stats of an append-only CSV or JSON "
+        "file in a sidecar file, only reading the rows appended since the last run",
+    )
+    run_parser.add_argument(
+        "--out",
+        type=str,
+        help="Write the resulting rows to this file (csv, json, xml or yaml), "
+        "to stdout as JSON if neither --out nor --stats is given",
+    )
+    run_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Load, filter and compute stats with N processes, one partition of the "
+        "data at a time",
+    )
+    run_parser.add_argument(
+        "--fail-on-empty",
+        action="store_true",
+        help=f"Exit with code {EXIT_EMPTY} when no row is left",
+    )
+    run_parser.add_argument(
+        "--trusted",
+        action=argparse.BooleanOptionalAction,
+        default=config.data_loader.trusted_input,
+        help="Skip the validation of each JSON item, only validating a sample "
+        "(default: trusted_input of the config)",
+    )
+    run_parser.add_argument(
+        "--record-tag",
+        type=str,
+        default=config.data_loader.xml_record_tag,
+        help="Tag of the repeated XML elements loaded as records, e.g. flower "
+        "(default: xml_record_tag of the config)",
+    )
+    run_parser.set_defaults(steps=[])
+    return parser
+
+
+def run_cli(argv=None) -> int:
+    """
+    Run the non-interactive mode, e.g.
+    `data-filter run data.json --where "field2 gt 5" --sort field3 --stats --out out.json`.
+
+    Args:
+        argv (list): The command line arguments, sys.argv[1:] if None.
+
+    Returns:
+        int: The exit code.
+    """
+    try:
+        config = get_config()
+    except Exception as e:
+        print(f"Invalid config: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    try:
+        args = _build_run_parser(config).parse_args(argv)
+    except SystemExit as e:
+        # --help and --version exit with 0, invalid arguments with 2
+        return EXIT_OK if e.code in (0, None) else EXIT_USAGE
+    for step, values in args.steps:
+        if step == "filter" and values[1] not in ("eq", "lt", "gt"):
+            print(f"Invalid comparison: {values[1]}", file=sys.stderr)
+            return EXIT_USAGE
+        if step == "limit" and values < 0:
+            print("Limit must be a non-negative integer", file=sys.stderr)
+            return EXIT_USAGE
+    if args.workers < 1:
+        print("Workers must be a positive integer", file=sys.stderr)
+        return EXIT_USAGE
+    if args.top < 1:
+        print("--top must be a positive integer", file=sys.stderr)
+        return EXIT_USAGE
+    if args.approx and not args.stats:
+        print("--approx only applies to --stats", file=sys.stderr)
+        return EXIT_USAGE
+    if args.incremental and (
+        not args.stats
+        or args.approx
+        or args.steps
+        or args.columns
+        or args.out
+        or args.explain
+        or args.fail_on_empty
+    ):
+        print(
+            "--incremental only applies to exact --stats of a whole file, without "
+            "steps, --approx, --columns, --out, --explain or --fail-on-empty",
+            file=sys.stderr,
+        )
+        return EXIT_USAGE
+    if args.incremental:
+        return run_incremental_stats(args.file, trusted=args.trusted)
+    return run_pipeline(
+        args.file,
+        args.steps,
+        reverse=args.reverse,
+        columns=args.columns.split(",") if args.columns else None,
+        explain=args.explain,
+        stats=args.stats,
+        output_path=args.out,
+        fail_on_empty=args.fail_on_empty,
+        trusted=args.trusted,
+        record_tag=args.record_tag,
+        workers=args.workers,
+        sketch=_sketch_options(args),
+    )
+
+
+def run_pipeline(
+    file_path,
+    steps,
+    reverse=False,
+    columns=None,
+    explain=False,
+    stats=False,
+    output_path=None,
+    fail_on_empty=False,
+    trusted=False,
+    record_tag=None,
+    workers=1,
+    sketch=None,
+) -> int:
+    """
+    Build a lazy plan of the steps over a data file, then run it and write the result,
+    without any intermediate printing. Errors are reported on stderr.
+
+    Args:
+        file_path (str): The path to the data file.
+        steps (list): The (step, values) pairs: ("filter", [column, comparison, value]),
+            ("where", expression), ("sort", [keys]) or ("limit", k).
+        reverse (bool): Whether to sort in descending order.
+        columns (list): The columns/keys to output, all columns if None.
+        explain (bool): Whether to print the optimized plan instead of running it.
+        stats (bool): Whether to write the statistics of the result to stdout.
+        output_path (str): The file to write the resulting rows to.
+        fail_on_empty (bool): Whether an empty result is a failure.
+        trusted (bool): Whether to skip the validation of each JSON item.
+        record_tag (str): The tag of the XML record elements.
+        workers (int): The number of processes running the plan.
+        sketch (dict): The error bounds of approximate stats, as SketchAccumulator
+            arguments, None for exact stats.
+
+    Returns:
+        int: The exit code.
+    """
+    try:
+        plan = QueryPlan(
+            file_path, trusted=trusted, record_tag=record_tag, workers=workers
+        )
+        if plan.loader_name not in RECORD_FILE_TYPES + ("csv",):
+            raise ValueError(f"Unsupported file type: {plan.loader_name}")
+        for step, values in steps:
+            if step == "filter":
+                column, comparison, value = values
+                plan.filter(column, parse_value(value), comparison=comparison)
+            elif step == "where":
+                plan.where(parse_expression(values))
+            elif step == "sort":
+                plan.sort(values, reverse=reverse)
+            elif step == "limit":
+                plan.limit(values)
+        if columns is not None:
+            plan.select(columns)
+        if explain:
+            print(plan.explain())
+            return EXIT_OK
+        if stats and output_path is None and not fail_on_empty:
+            # the rows are not needed, parallel workers only return their stats
+            data = None
+            all_stats = plan.stats(sketch)
+        else:
+            data = plan.execute()
+            if stats and sketch is not None:
+                all_stats = _approx_stats(data, sketch)
+            elif stats and isinstance(data, pd.DataFrame):
+                all_stats = CSVStats(data).get_all_stats()
+            elif stats:
+                all_stats = JSONStats(data).get_all_stats()
+
+        if stats:
+            json.dump(all_stats, sys.stdout, indent=4, default=_to_json_value)
+            sys.stdout.write("\n")
+        if output_path is not None:
+            _write_rows(data, output_path, record_tag)
+        elif not stats:
+            _write_json_rows(data, sys.stdout)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    if fail_on_empty and len(data) == 0:
+        return EXIT_EMPTY
+    return EXIT_OK
+
+
+def run_incremental_stats(file_path, trusted=False) -> int:
+    """
+    Write the statistics of an append-only data file to stdout, as JSON, updating the
+    stats persisted next to the file with the rows appended since the last run.
+
+    Args:
+        file_path (str): The path to the CSV or JSON file.
+        trusted (bool): Whether to skip the validation of each JSON item.
+
+    Returns:
+        int: The exit code.
+    """
+    try:
+        all_stats = IncrementalStats(file_path, trusted=trusted).refresh()
+        json.dump(all_stats, sys.stdout, indent=4, default=_to_json_value)
+        sys.stdout.write("\n")
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    return EXIT_OK
+
+
+def _approx_stats(data, sketch) -> dict:
+    """
+    Compute the approximate stats of loaded rows, a DataFrame or a JSON container.
+    """
+    accumulator = SketchAccumulator(**sketch)
+    if isinstance(data, pd.DataFrame):
+        accumulator.update_frame(data)
+    else:
+        accumulator.update_container(data)
+    return accumulator.get_all_stats()
+
+
+def _to_json_value(value):
+    # NumPy scalars of the stats
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def _iter_row_dicts(data):
+    """
+    Iterate over the rows of a DataFrame or a JsonDataView as dicts, leaving out the
+    missing values of DataFrame rows.
+    """
+    if isinstance(data, pd.DataFrame):
+        columns = list(data.columns)
+        for row in (
+            data.astype(object)
+            .where(data.notna(), None)
+            .itertuples(index=False, name=None)
+        ):
+            yield {
+                column: value
+                for column, value in zip(columns, row)
+                if value is not None
+            }
+    else:
+        yield from data.items()
+
+
+def _write_json_rows(data, file):
+    """
+    Write rows in the {"data": [{"item": {...}}]} format of the JSON loader, one row
+    at a time.
+    """
+    file.write('{"data": [')
+    for position, row in enumerate(_iter_row_dicts(data)):
+        file.write(",\n" if position else "\n")
+        json.dump({"item": row}, file, default=_to_json_value)
+    file.write("\n]}\n")
+
+
+def _write_rows(data, output_path, record_tag=None):
+    """
+    Write rows to a file, in the format given by its extension.
+
+    Args:
+        data: The rows, a DataFrame or a JsonDataView.
+        output_path (str): The path of the output file.
+        record_tag (str): The tag of the XML record elements, "item" if None.
+    """
+    output_type = output_path.split(".")[-1]
+    if output_type == "csv":
+        if isinstance(data, pd.DataFrame):
+            data.to_csv(output_path, index=False)
+        else:
+            pd.DataFrame.from_records(list(data.items())).to_csv(
+                output_path, index=False
+            )
+    elif output_type == "json":
+        with open(output_path, "w", encoding="utf-8") as file:
+            _write_json_rows(data, file)
+    elif output_type in ("yaml", "yml"):
+        with open(output_path, "w", encoding="utf-8") as file:
+            yaml.dump_all(
+                _iter_row_dicts(data),
+                file,
+                Dumper=SafeDumper,
+                explicit_start=True,
+                sort_keys=False,
+            )
+    elif output_type == "xml":
+        XMLDataContainer._write_records(
+            _iter_row_dicts(data), output_path, record_tag or "item"
+        )
+    else:
+        raise ValueError(f"Unsupported output file type: {output_type}")
@@ -1,19 +1,30 @@
 from omegaconf import OmegaConf
 from pydantic import BaseModel, field_validator
+from typing import Optional
 import os
 
-
 """
 Config module for the data-filter application.
 """
 
+CONFIG_PATH_VARIABLE = "DATA_FILTER_CONFIG"
+DEFAULT_CONFIG_PATH = os.path.join("config", "config.yaml")
+
 
 class BaseDataLoaderConfig(BaseModel):
 
-    loader_name: str
+    # the CLI picks the loader of each data file from its extension
+    loader_name: Optional[str] = None
+    # default of the --trusted option of the CLI
+    trusted_input: bool = False
+    # tag of the repeated XML elements loaded as records, e.g. "flower"
+    xml_record_tag: Optional[str] = None
 
     @field_validator("loader_name")
     def check_loader_name(cls, value):
+        if value is None:
+            return value
+
         if not isinstance(value, str):
             raise ValueError("loader_name must be a string")
 
@@ -25,8 +36,38 @@ class BaseDataLoaderConfig(BaseModel):
         return value
 
 
+class SorterConfig(BaseModel):
+
+    # memory budget of the external sort, in megabytes
+    memory_budget_mb: int = 256
+
+    @field_validator("memory_budget_mb")
+    def check_memory_budget_mb(cls, value):
+        if value <= 0:
+            raise ValueError("memory_budget_mb must be a positive integer")
+
+        return value
+
+
+class CacheConfig(BaseModel):
+
+    # directory of the on-disk cache of parsed data, ~/.cache/data-filter if None
+    directory: Optional[str] = None
+    # maximum total size of the cache, in megabytes
+    max_size_mb: int = 1024
+
+    @field_validator("max_size_mb")
+    def check_max_size_mb(cls, value):
+        if value <= 0:
+            raise ValueError("max_size_mb must be a positive integer")
+
+        return value
+
+
 class Config(BaseModel):
-    data_loader: BaseDataLoaderConfig
+    data_loader: BaseDataLoaderConfig = BaseDataLoaderConfig()
+    sorter: SorterConfig = SorterConfig()
+    cache: CacheConfig = CacheConfig()
 
 
 def load_config(config_path: str) -> Config:
@@ -35,3 +76,17 @@ def load_config(config_path: str) -> Config:
     config_dict = OmegaConf.to_container(config, resolve=True)
 
     return Config.model_validate(config_dict)
+
+
+def get_config() -> Config:
+    """
+    Get the config of the CLI: the file named by the DATA_FILTER_CONFIG environment
+    variable, else config/config.yaml in the working directory if it exists, else the
+    defaults.
+    """
+    config_path = os.environ.get(CONFIG_PATH_VARIABLE)
+    if config_path is not None:
+        return load_config(config_path)
+    if os.path.isfile(DEFAULT_CONFIG_PATH):
+        return load_config(DEFAULT_CONFIG_PATH)
+    return Config()
@@ -3,6 +3,9 @@ from abc import ABC, abstractmethod
 
 class BaseDataLoader(ABC):
 
+    # whether full loads write the zone map sidecar of their file, see zone_map.py
+    write_zone_maps = True
+
     def __init__(self, data_source):
         self.data_source = data_source
 
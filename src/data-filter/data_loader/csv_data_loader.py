@@ -1,5 +1,10 @@
 from .base_data_loader import BaseDataLoader
 from ..models.data_containers.csv_data_container import CSVDataContainer
+from ..filter.csv_filter import CSVFilter
+from ..filter.predicate import Predicate
+from .zone_map import ZoneMap, refresh_zone_map
+from typing import Any, Dict, List, Tuple
+import numpy as np
 import pandas as pd
 import os, logging
 
@@ -12,8 +17,18 @@ class CSVDataLoader(BaseDataLoader):
         data_source (str): The path to the CSV file to load data from or save data to.
 
     Methods:
-        load_data() -> pd.DataFrame:
-            Loads data from the CSV file specified by data_source and returns it as a pandas DataFrame.
+        load_data(usecols: List[str] = None, predicate: Predicate = None) -> pd.DataFrame:
+            Loads data from the CSV file specified by data_source and returns it as a pandas DataFrame,
+            skipping the row groups of its zone map that cannot match the predicate.
+
+        load_filtered_data(column: str, value: Any, comparison: str = "eq", ...) -> pd.DataFrame:
+            Loads the CSV file in chunks, keeping only the rows that match the filter.
+
+        convert_to_npy(output_dir: str = None, chunksize: int = 100_000) -> str:
+            Writes the numeric columns of the CSV file to .npy files.
+
+        load_mmap_data(output_dir: str = None, usecols: List[str] = None) -> pd.DataFrame:
+            Loads the numeric columns of the CSV file as memory-mapped arrays.
 
         save_data(data: pd.DataFrame):
             Saves the given pandas DataFrame to the CSV file specified by data_source.
@@ -28,10 +43,20 @@ class CSVDataLoader(BaseDataLoader):
         """
         super().__init__(data_source)
 
-    def load_data(self) -> pd.DataFrame:
+    def load_data(
+        self, usecols: List[str] = None, predicate: Predicate = None
+    ) -> pd.DataFrame:
         """
         Loads data from the CSV file specified by data_source and returns it as a pandas DataFrame.
 
+        The first full load writes the zone map of the file. When the zone map is current
+        and a predicate is given, only the row groups which may hold matching rows are
+        parsed, indexed by their position in the file; the rows themselves are not filtered.
+
+        Args:
+            usecols (List[str]): Only parse these columns, all columns if None.
+            predicate (Predicate): The predicate used to skip row groups.
+
         Returns:
             pd.DataFrame: The loaded data.
 
@@ -40,7 +65,27 @@ class CSVDataLoader(BaseDataLoader):
             Exception: If there is an error loading the data.
         """
         try:
-            data = CSVDataContainer._as_pandas_data_frame(data_source=self.data_source)
+            zone_map = ZoneMap.load(self.data_source) if predicate is not None else None
+            if zone_map is not None and zone_map.row_groups:
+                groups = zone_map.matching_row_groups(predicate)
+                logging.info(
+                    f"Reading {len(groups)} of {len(zone_map.row_groups)} row groups "
+                    f"of {self.data_source}"
+                )
+                return CSVDataContainer._read_byte_ranges(
+                    self.data_source,
+                    [
+                        (group["start"], group["end"], group["first_row"])
+                        for group in groups
+                    ],
+                    usecols=usecols,
+                    dtype=zone_map.dtypes,
+                )
+            data = CSVDataContainer._as_pandas_data_frame(
+                data_source=self.data_source, usecols=usecols
+            )
+            if usecols is None and self.write_zone_maps:
+                refresh_zone_map(self.data_source, data)
             logging.info(f"Data loaded from {self.data_source}")
             return data
         except FileNotFoundError as e:
@@ -50,6 +95,189 @@ class CSVDataLoader(BaseDataLoader):
             logging.error(f"Error loading data: {e}")
             print(f"Error loading data: {e}")
 
+    def load_filtered_data(
+        self,
+        column: str,
+        value: Any,
+        comparison: str = "eq",
+        chunksize: int = 100_000,
+        usecols: List[str] = None,
+        dtype: Dict[str, str] = None,
+    ) -> pd.DataFrame:
+        """
+        Loads the CSV file specified by data_source in chunks and applies the filter to each
+        chunk as it is read, so only the matching rows are ever kept in memory.
+
+        The result is the same as filtering the fully loaded DataFrame with
+        CSVFilter.filter_by_column, including the row index: every chunk is parsed with
+        the dtypes of the whole file. They come from the zone map of the file when it is
+        current, else from the chunks themselves, the file being read a second time with
+        fixed dtypes if a column is parsed as numbers in a chunk and as text in another.
+
+        Args:
+            column (str): The column to filter by.
+            value (Any): The value to compare against.
+            comparison (str): The type of comparison ('eq', 'lt', 'gt').
+            chunksize (int): The number of rows parsed at a time.
+            usecols (List[str]): Only keep these columns. The filter column is read even if it is not listed.
+            dtype (Dict[str, str]): dtype hints per column, passed to pandas.read_csv.
+
+        Returns:
+            pd.DataFrame: The filtered data.
+
+        Raises:
+            FileNotFoundError: If the CSV file specified by data_source is not found.
+            Exception: If there is an error loading the data.
+        """
+        if comparison not in ["eq", "lt", "gt"]:
+            raise ValueError("Comparison must be 'eq', 'lt', or 'gt'")
+
+        read_columns = usecols
+        if usecols is not None and column not in usecols:
+            read_columns = list(usecols) + [column]
+        try:
+            zone_map = ZoneMap.load(self.data_source)
+            if zone_map is not None and zone_map.dtypes:
+                dtype = {
+                    **{
+                        name: column_dtype
+                        for name, column_dtype in zone_map.dtypes.items()
+                        if read_columns is None or name in read_columns
+                    },
+                    **(dtype or {}),
+                }
+            data, chunk_dtypes = self._filter_chunks(
+                column, value, comparison, chunksize, read_columns, dtype
+            )
+            mixed = CSVDataContainer._conflicting_columns(chunk_dtypes)
+            if mixed:
+                # the chunks disagree on the type of a column, parse it again like
+                # read_csv does for the whole file
+                data, _ = self._filter_chunks(
+                    column,
+                    value,
+                    comparison,
+                    chunksize,
+                    read_columns,
+                    {**(dtype or {}), **mixed},
+                )
+            if usecols is not None:
+                data = data[[col for col in data.columns if col in usecols]]
+            logging.info(f"Filtered data loaded from {self.data_source}")
+            return data
+        except FileNotFoundError as e:
+            logging.error(f"File not found: {e}")
+            print(f"File not found: {e}")
+        except Exception as e:
+            logging.error(f"Error loading data: {e}")
+            print(f"Error loading data: {e}")
+
+    def _filter_chunks(
+        self,
+        column: str,
+        value: Any,
+        comparison: str,
+        chunksize: int,
+        usecols: List[str],
+        dtype: Dict[str, str],
+    ) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+        """
+        Filters the CSV file chunk by chunk.
+
+        Returns:
+            Tuple[pd.DataFrame, List[Dict[str, Any]]]: The matching rows, and the
+                dtypes of the columns of each chunk.
+        """
+        kept = []
+        empty = None
+        chunk_dtypes = []
+        for chunk in CSVDataContainer._iter_pandas_chunks(
+            self.data_source, chunksize=chunksize, usecols=usecols, dtype=dtype
+        ):
+            chunk_dtypes.append(CSVDataContainer._value_dtypes(chunk))
+            filterer = CSVFilter(chunk)
+            filterer.filter_by_column(column, value, comparison=comparison)
+            filtered = filterer.get_filtered_dataframe()
+            if not filtered.empty:
+                kept.append(filtered)
+            elif empty is None:
+                # keep the schema in case no row matches
+                empty = filtered
+        if kept:
+            data = pd.concat(kept) if len(kept) > 1 else kept[0]
+        else:
+            data = empty if empty is not None else pd.DataFrame()
+        return data, chunk_dtypes
+
+    def convert_to_npy(self, output_dir: str = None, chunksize: int = 100_000) -> str:
+        """
+        Writes the numeric columns of the CSV file specified by data_source to raw .npy
+        files, parsing the file in chunks. Text columns are not converted.
+
+        Args:
+            output_dir (str): The directory of the .npy files, "<data_source>.npy.d" if None.
+            chunksize (int): The number of rows parsed at a time.
+
+        Returns:
+            str: The directory of the .npy files.
+        """
+        output_dir = output_dir or self._npy_dir()
+        columns = CSVDataContainer._convert_to_npy(
+            self.data_source, output_dir, chunksize=chunksize
+        )
+        logging.info(
+            f"Converted {len(columns)} numeric columns of {self.data_source} to {output_dir}"
+        )
+        return output_dir
+
+    def load_mmap_data(
+        self, output_dir: str = None, usecols: List[str] = None
+    ) -> pd.DataFrame:
+        """
+        Loads the numeric columns of the CSV file specified by data_source as a DataFrame
+        of read-only memory-mapped arrays, converting them to .npy files first if they are
+        missing or older than the CSV file. Text columns are left out, with a warning
+        naming them.
+
+        Stats and filters then read the columns through the OS page cache, without
+        parsing the file or holding the columns in process memory.
+
+        Args:
+            output_dir (str): The directory of the .npy files, "<data_source>.npy.d" if None.
+            usecols (List[str]): Only load these numeric columns.
+
+        Returns:
+            pd.DataFrame: The numeric columns.
+
+        Raises:
+            FileNotFoundError: If the CSV file specified by data_source is not found.
+            Exception: If there is an error loading the data.
+        """
+        try:
+            output_dir = output_dir or self._npy_dir()
+            if not CSVDataContainer._is_npy_current(self.data_source, output_dir):
+                self.convert_to_npy(output_dir)
+            data = CSVDataContainer._load_npy(output_dir, usecols=usecols)
+            skipped = CSVDataContainer._skipped_npy_columns(output_dir)
+            if usecols is None and skipped:
+                message = (
+                    f"Non-numeric columns not memory-mapped: {', '.join(skipped)}. "
+                    "Load without --mmap to keep them."
+                )
+                logging.warning(message)
+                print(message)
+            logging.info(f"Memory-mapped data loaded from {output_dir}")
+            return data
+        except FileNotFoundError as e:
+            logging.error(f"File not found: {e}")
+            print(f"File not found: {e}")
+        except Exception as e:
+            logging.error(f"Error loading data: {e}")
+            print(f"Error loading data: {e}")
+
+    def _npy_dir(self) -> str:
+        return f"{self.data_source}.npy.d"
+
     def save_data(self, data: pd.DataFrame):
         """
         Saves the given pandas DataFrame to the CSV file specified by data_source.
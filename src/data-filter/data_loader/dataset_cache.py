@@ -0,0 +1,325 @@
+from ..models.data_containers.columnar_json_data_container import (
+    ColumnarJsonDataContainer,
+)
+from ..models.data_containers.columns import (
+    BoolColumn,
+    Column,
+    ListColumn,
+    NumericColumn,
+    ObjectColumn,
+    StringColumn,
+)
+from typing import Any, Dict, List, Optional, Union
+import hashlib, json, logging, os, shutil, tempfile
+import numpy as np
+import pandas as pd
+
+"""
+On-disk cache of parsed datasets, so that loading an unchanged file again skips parsing.
+
+Every entry is a directory holding one .npy file per array of the dataset plus a
+meta.json file describing the columns. Numeric arrays are memory-mapped when an entry
+is read, so a cached load costs little more than opening the files. Entries are keyed
+by the path, modification time and size of the source file and by the loader options,
+so a modified file never hits a stale entry. The total size of the cache is bounded by
+evicting the least recently used entries.
+"""
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "data-filter")
+DEFAULT_MAX_SIZE = 1024 * 1024 * 1024
+
+_META = "meta.json"
+
+
+class DatasetCache:
+    """
+    LRU cache of ColumnarJsonDataContainer and DataFrame datasets, stored as columns of
+    .npy files.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_size=DEFAULT_MAX_SIZE):
+        """
+        :param directory: The directory of the cache entries, created if needed.
+        :param max_size: The maximum total size of the entries, in bytes.
+        """
+        if max_size <= 0:
+            raise ValueError("max_size must be a positive number of bytes")
+        self.directory = directory
+        self.max_size = max_size
+
+    def get(
+        self, data_source: str, options: Dict[str, Any] = None
+    ) -> Optional[Union[ColumnarJsonDataContainer, pd.DataFrame]]:
+        """
+        Read the cached dataset of a file.
+
+        :param data_source: The path of the source file.
+        :param options: The loader options the dataset was loaded with.
+        :return: The dataset, or None if the file is not cached with these options.
+        """
+        entry = self._entry_path(data_source, options)
+        try:
+            with open(os.path.join(entry, _META), "r", encoding="utf-8") as file:
+                meta = json.load(file)
+            dataset = self._read(entry, meta)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            # a corrupted entry is dropped and the file parsed again
+            logging.warning(f"Dropping unreadable cache entry {entry}: {e}")
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+        # the modification time of an entry is its last use
+        os.utime(entry)
+        return dataset
+
+    def put(
+        self,
+        data_source: str,
+        dataset: Union[ColumnarJsonDataContainer, pd.DataFrame],
+        options: Dict[str, Any] = None,
+    ) -> bool:
+        """
+        Store the dataset of a file, then evict the least recently used entries until
+        the cache fits its maximum size.
+
+        :param data_source: The path of the source file.
+        :param dataset: The parsed dataset.
+        :param options: The loader options the dataset was loaded with.
+        :return: Whether the dataset was stored, False if it is larger than the cache.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        entry = self._entry_path(data_source, options)
+        staging = tempfile.mkdtemp(prefix=".staging-", dir=self.directory)
+        try:
+            meta = self._write(staging, dataset)
+            meta["source"] = os.path.abspath(data_source)
+            with open(os.path.join(staging, _META), "w", encoding="utf-8") as file:
+                json.dump(meta, file)
+            if self._size(staging) > self.max_size:
+                return False
+            shutil.rmtree(entry, ignore_errors=True)
+            os.rename(staging, entry)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        self._evict(keep=entry)
+        return True
+
+    def invalidate(self, data_source: str = None) -> int:
+        """
+        Remove the cached datasets of a file, or every entry.
+
+        :param data_source: The path of the source file, all files if None.
+        :return: The number of removed entries.
+        """
+        source = os.path.abspath(data_source) if data_source is not None else None
+        removed = 0
+        for entry in self._entries():
+            if source is not None:
+                try:
+                    with open(
+                        os.path.join(entry, _META), "r", encoding="utf-8"
+                    ) as file:
+                        if json.load(file).get("source") != source:
+                            continue
+                except (OSError, ValueError):
+                    pass
+            shutil.rmtree(entry, ignore_errors=True)
+            removed += 1
+        return removed
+
+    def _entry_path(self, data_source: str, options: Dict[str, Any] = None) -> str:
+        status = os.stat(data_source)
+        key = json.dumps(
+            [
+                os.path.abspath(data_source),
+                status.st_mtime_ns,
+                status.st_size,
+                options or {},
+            ],
+            sort_keys=True,
+        )
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest())
+
+    def _entries(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return [
+            entry.path
+            for entry in os.scandir(self.directory)
+            if entry.is_dir() and not entry.name.startswith(".")
+        ]
+
+    @staticmethod
+    def _size(entry: str) -> int:
+        return sum(file.stat().st_size for file in os.scandir(entry) if file.is_file())
+
+    def _evict(self, keep: str):
+        """
+        Remove the least recently used entries until the cache fits its maximum size.
+
+        :param keep: The entry just written, never evicted.
+        """
+        entries = sorted(
+            (os.stat(entry).st_mtime_ns, entry, self._size(entry))
+            for entry in self._entries()
+        )
+        total = sum(size for _, _, size in entries)
+        for _, entry, size in entries:
+            if total <= self.max_size:
+                break
+            if entry == keep:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def _write(
+        self, entry: str, dataset: Union[ColumnarJsonDataContainer, pd.DataFrame]
+    ) -> Dict[str, Any]:
+        """
+        Write the arrays of a dataset to an entry directory.
+
+        :param entry: The entry directory.
+        :param dataset: The dataset.
+        :return: The description of the columns, stored in meta.json.
+        """
+        columns = []
+        if isinstance(dataset, ColumnarJsonDataContainer):
+            for position, (key, column) in enumerate(dataset.columns.items()):
+                parts = self._column_parts(column)
+                columns.append(
+                    {
+                        "name": key,
+                        "type": type(column).__name__,
+                        "parts": self._save_parts(entry, position, parts),
+                    }
+                )
+            return {"kind": "records", "length": dataset.length, "columns": columns}
+        if isinstance(dataset, pd.DataFrame):
+            for position, name in enumerate(dataset.columns):
+                series = dataset[name]
+                if series.dtype.kind in "biuf":
+                    parts = {"values": series.to_numpy()}
+                else:
+                    values = series.astype(object).where(series.notna(), None)
+                    parts = {"values": values.tolist()}
+                columns.append(
+                    {
+                        "name": name,
+                        "type": str(series.dtype),
+                        "parts": self._save_parts(entry, position, parts),
+                    }
+                )
+            return {"kind": "dataframe", "length": len(dataset), "columns": columns}
+        raise ValueError(f"Cannot cache datasets of type {type(dataset).__name__}")
+
+    def _read(
+        self, entry: str, meta: Dict[str, Any]
+    ) -> Union[ColumnarJsonDataContainer, pd.DataFrame]:
+        """
+        Read the dataset of an entry directory, memory-mapping its numeric arrays.
+
+        :param entry: The entry directory.
+        :param meta: The content of meta.json.
+        :return: The dataset.
+        """
+        if meta["kind"] == "records":
+            return ColumnarJsonDataContainer(
+                length=meta["length"],
+                columns={
+                    column["name"]: self._build_column(
+                        column["type"], self._load_parts(entry, column["parts"])
+                    )
+                    for column in meta["columns"]
+                },
+            )
+        frame = {}
+        for column in meta["columns"]:
+            values = self._load_parts(entry, column["parts"])["values"]
+            if isinstance(values, list):
+                series = pd.Series(values, dtype=object)
+                values = series.where(series.notna(), np.nan)
+            frame[column["name"]] = values
+        return pd.DataFrame(frame, copy=False)
+
+    @staticmethod
+    def _column_parts(column: Column) -> Dict[str, Any]:
+        """
+        Get the arrays of a column. Object arrays are converted to lists, stored as JSON.
+        """
+        if isinstance(column, StringColumn):
+            # str categories are stored as a fixed width unicode array
+            return {"codes": column.codes, "categories": column.categories.astype(str)}
+        if isinstance(column, ListColumn):
+            values = column.values
+            return {
+                "offsets": column.offsets,
+                "values": values.tolist() if values.dtype == object else values,
+                "present": column.present,
+            }
+        if isinstance(column, ObjectColumn):
+            return {"values": column.values.tolist(), "present": column.present}
+        return {"values": column.values, "present": column.present}
+
+    @staticmethod
+    def _build_column(type_name: str, parts: Dict[str, Any]) -> Column:
+        """
+        Rebuild a column from its arrays, the reverse of _column_parts.
+        """
+        if type_name == "StringColumn":
+            return StringColumn(parts["codes"], parts["categories"].astype(object))
+        if type_name == "ListColumn":
+            values = parts["values"]
+            if isinstance(values, list):
+                array = np.empty(len(values), dtype=object)
+                array[:] = values
+                values = array
+            return ListColumn(parts["offsets"], values, parts["present"])
+        if type_name == "ObjectColumn":
+            values = np.empty(len(parts["values"]), dtype=object)
+            values[:] = parts["values"]
+            return ObjectColumn(values, parts["present"])
+        if type_name == "BoolColumn":
+            return BoolColumn(parts["values"], parts["present"])
+        if type_name == "NumericColumn":
+            return NumericColumn(parts["values"], parts["present"])
+        raise ValueError(f"Unknown column type: {type_name}")
+
+    @staticmethod
+    def _save_parts(entry: str, position: int, parts: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Save the arrays of a column to .npy files, and keep lists inline.
+
+        :return: The .npy file name or the list of each part.
+        """
+        saved = {}
+        for name, part in parts.items():
+            if isinstance(part, list):
+                saved[name] = {"list": part}
+            else:
+                file_name = f"{position}.{name}.npy"
+                np.save(os.path.join(entry, file_name), part, allow_pickle=False)
+                saved[name] = {"file": file_name}
+        return saved
+
+    @staticmethod
+    def _load_parts(entry: str, parts: Dict[str, Any]) -> Dict[str, Any]:
+        # plain read-only ndarray views of the mapped files, so the np.memmap subclass
+        # does not leak into the results of every operation
+        return {
+            name: (
+                part["list"]
+                if "list" in part
+                else np.asarray(
+                    np.load(os.path.join(entry, part["file"]), mmap_mode="r")
+                )
+            )
+            for name, part in parts.items()
+        }
+
+    def __repr__(self):
+        return f"DatasetCache(directory={self.directory}, max_size={self.max_size})"
+
+    def __str__(self):
+        return f"DatasetCache @ {self.directory}"
@@ -2,6 +2,7 @@ from ..data_loader.base_data_loader import BaseDataLoader
 from ..data_loader.json_data_loader import JsonDataLoader
 from ..data_loader.csv_data_loader import CSVDataLoader
 from ..data_loader.xml_data_loader import XMLDataLoader
+from ..data_loader.yaml_data_loader import YamlDataLoader
 
 
 class Factory:
@@ -10,12 +11,28 @@ class Factory:
     """
 
     @staticmethod
-    def get_data_loader(loader_name: str, data_source: str) -> BaseDataLoader:
+    def get_data_loader(
+        loader_name: str,
+        data_source: str,
+        trusted: bool = False,
+        validation_sample_size: int = 100,
+        record_tag: str = None,
+    ) -> BaseDataLoader:
         if loader_name == "json":
-            return JsonDataLoader(data_source=data_source)
+            return JsonDataLoader(
+                data_source=data_source,
+                trusted=trusted,
+                validation_sample_size=validation_sample_size,
+            )
         elif loader_name == "csv":
             return CSVDataLoader(data_source=data_source)
         elif loader_name == "xml":
-            return XMLDataLoader(data_source=data_source)
+            return XMLDataLoader(data_source=data_source, record_tag=record_tag)
+        elif loader_name in ("yaml", "yml"):
+            return YamlDataLoader(
+                data_source=data_source,
+                trusted=trusted,
+                validation_sample_size=validation_sample_size,
+            )
         else:
             raise ValueError(f"Data source not supported: {data_source}")
@@ -1,5 +1,11 @@
 from .base_data_loader import BaseDataLoader
-from ..models.data_containers.json_data_container import JsonDataContainer
+from .json_stream_parser import JsonArrayStreamParser
+from .zone_map import refresh_zone_map
+from ..models.data_containers.json_data_container import JsonDataContainer, JsonDataItem
+from ..models.data_containers.columnar_json_data_container import (
+    ColumnarJsonDataContainer,
+)
+from typing import Iterator, List, Union
 import json, os, logging
 
 
@@ -9,23 +15,37 @@ class JsonDataLoader(BaseDataLoader):
 
     Attributes:
         data_source (str): The path to the JSON file to load data from or save data to.
+        trusted (bool): Skip the validation of each item, only validating a sample.
+        validation_sample_size (int): The number of items validated when trusted is set.
 
     Methods:
         load_data() -> JsonDataContainer:
             Loads data from the JSON file specified by data_source and returns it as a JsonDataContainer object.
 
+        load_columnar_data(keys: List[str] = None) -> ColumnarJsonDataContainer:
+            Loads data from the JSON file specified by data_source into typed columns.
+
+        iter_data(batch_size: int = None) -> Iterator[Union[JsonDataItem, JsonDataContainer]]:
+            Streams the items of the JSON file specified by data_source without loading the whole document.
+
         save_data(data: JsonDataContainer):
             Saves the given JsonDataContainer object to the JSON file specified by data_source.
     """
 
-    def __init__(self, data_source):
+    def __init__(
+        self, data_source, trusted: bool = False, validation_sample_size: int = 100
+    ):
         """
         Initializes the JsonDataLoader with the specified data source.
 
         Args:
             data_source (str): The path to the JSON file to load data from or save data to.
+            trusted (bool): Skip the validation of each item, only validating a sample.
+            validation_sample_size (int): The number of items validated when trusted is set.
         """
         super().__init__(data_source)
+        self.trusted = trusted
+        self.validation_sample_size = validation_sample_size
 
     def load_data(self) -> JsonDataContainer:
         """
@@ -40,9 +60,17 @@ class JsonDataLoader(BaseDataLoader):
         """
         try:
             with open(self.data_source, "r", encoding="utf-8") as file:
-                data = JsonDataContainer(data=json.load(file)["data"])
-                logging.info(f"Data loaded from {self.data_source}")
-                return data
+                raw_data = json.load(file)["data"]
+            if self.trusted:
+                data = JsonDataContainer.from_trusted(
+                    raw_data, validation_sample_size=self.validation_sample_size
+                )
+            else:
+                data = JsonDataContainer(data=raw_data)
+            if self.write_zone_maps:
+                refresh_zone_map(self.data_source, data)
+            logging.info(f"Data loaded from {self.data_source}")
+            return data
         except FileNotFoundError as e:
             logging.error(f"File not found: {e}")
             print(f"File not found: {e}")
@@ -50,6 +78,86 @@ class JsonDataLoader(BaseDataLoader):
             logging.error(f"Error loading data: {e}")
             print(f"Error loading data: {e}")
 
+    def load_columnar_data(self, keys: List[str] = None) -> ColumnarJsonDataContainer:
+        """
+        Loads data from the JSON file specified by data_source and returns it as a
+        ColumnarJsonDataContainer. Items are streamed into the columns, so the document
+        is never held in memory as a whole.
+
+        Args:
+            keys (List[str]): Only load these keys, all keys if None.
+
+        Returns:
+            ColumnarJsonDataContainer: The loaded data.
+
+        Raises:
+            FileNotFoundError: If the JSON file specified by data_source is not found.
+            Exception: If there is an error loading the data.
+        """
+        try:
+            data = ColumnarJsonDataContainer.from_records(
+                (item.item for item in self.iter_data()), keys=keys
+            )
+            if keys is None and self.write_zone_maps:
+                refresh_zone_map(self.data_source, data)
+            logging.info(f"Data loaded from {self.data_source}")
+            return data
+        except FileNotFoundError as e:
+            logging.error(f"File not found: {e}")
+            print(f"File not found: {e}")
+        except Exception as e:
+            logging.error(f"Error loading data: {e}")
+            print(f"Error loading data: {e}")
+
+    def iter_data(
+        self, batch_size: int = None
+    ) -> Iterator[Union[JsonDataItem, JsonDataContainer]]:
+        """
+        Streams the items of the "data" array of the JSON file specified by data_source.
+
+        Items are parsed one at a time, so peak memory stays bounded by the size of a
+        single item (or batch) instead of the size of the file.
+
+        Args:
+            batch_size (int): If given, items are grouped into JsonDataContainer objects
+                of at most batch_size items, which can be passed to the filters and stats.
+
+        Yields:
+            JsonDataItem | JsonDataContainer: The next item, or the next batch of items.
+
+        Raises:
+            FileNotFoundError: If the JSON file specified by data_source is not found.
+            Exception: If there is an error parsing the data.
+        """
+        if batch_size is not None and batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+        try:
+            with open(self.data_source, "r", encoding="utf-8") as file:
+                batch = []
+                for position, raw_item in enumerate(
+                    JsonArrayStreamParser(file, key="data")
+                ):
+                    if self.trusted and position >= self.validation_sample_size:
+                        item = JsonDataItem.model_construct(item=raw_item["item"])
+                    else:
+                        item = JsonDataItem.model_validate(raw_item)
+                    if batch_size is None:
+                        yield item
+                        continue
+                    batch.append(item)
+                    if len(batch) == batch_size:
+                        yield JsonDataContainer.model_construct(data=batch)
+                        batch = []
+                if batch:
+                    yield JsonDataContainer.model_construct(data=batch)
+            logging.info(f"Data streamed from {self.data_source}")
+        except FileNotFoundError as e:
+            logging.error(f"File not found: {e}")
+            raise
+        except Exception as e:
+            logging.error(f"Error streaming data: {e}")
+            raise
+
     def save_data(self, data: JsonDataContainer):
         """
         Saves the given JsonDataContainer object to the JSON file specified by data_source.
@@ -0,0 +1,223 @@
+import json
+from typing import Any, Iterator, Optional, TextIO
+
+
+class JsonArrayStreamParser:
+    """
+    Incrementally parses the items of a JSON array stored under a top-level key.
+
+    The file is read in chunks and each array item is decoded on its own, so only
+    the current item (plus one read chunk) is ever held in memory, regardless of
+    the size of the document.
+
+    The parser also tracks the byte offset of the end of the array, so that items
+    appended to it later can be parsed alone with iter_appended. Offsets are only exact
+    for files opened with encoding="utf-8" and newline="".
+
+    Attributes:
+        file (TextIO): The opened JSON file to parse.
+        key (str): The top-level key holding the array to stream.
+        chunk_size (int): The number of characters to read from the file at a time.
+        start_offset (int): The byte offset of the file position the parser starts at.
+        array_end_offset (int): The byte offset of the closing bracket of the array,
+            None until it is reached.
+    """
+
+    _WHITESPACE = " \t\n\r"
+    _NUMBER_CHARS = "0123456789.eE+-"
+
+    def __init__(
+        self,
+        file: TextIO,
+        key: str = "data",
+        chunk_size: int = 1 << 16,
+        start_offset: int = 0,
+    ):
+        """
+        Initializes the JsonArrayStreamParser.
+
+        Args:
+            file (TextIO): The opened JSON file to parse.
+            key (str): The top-level key holding the array to stream.
+            chunk_size (int): The number of characters to read from the file at a time.
+            start_offset (int): The byte offset of the file position the parser starts
+                at, when the file was opened past its start.
+        """
+        self.file = file
+        self.key = key
+        self.chunk_size = chunk_size
+        self.start_offset = start_offset
+        self.array_end_offset: Optional[int] = None
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        # bytes of the characters dropped from the buffer
+        self._dropped_bytes = 0
+
+    def __iter__(self) -> Iterator[Any]:
+        """
+        Yields the decoded items of the array one at a time.
+
+        Raises:
+            KeyError: If the top-level object has no such key.
+            json.JSONDecodeError: If the document is not valid JSON.
+        """
+        self._expect("{")
+        while True:
+            if self._peek() == "}":
+                raise KeyError(self.key)
+            name = self._decode_value()
+            self._expect(":")
+            if name == self.key:
+                yield from self._iter_array()
+                return
+            # values stored under other keys are decoded and dropped
+            self._decode_value()
+            if self._peek() == ",":
+                self._pos += 1
+
+    def _iter_array(self) -> Iterator[Any]:
+        """
+        Yields the items of the array starting at the current position.
+        """
+        self._expect("[")
+        yield from self._iter_items()
+
+    def iter_appended(self, after_item: bool = True) -> Iterator[Any]:
+        """
+        Yields the items of an array from a position inside it, e.g. the former end
+        of an array which items were appended to since it was parsed.
+
+        Args:
+            after_item (bool): Whether the position follows an item, so that a comma
+                separates it from the next item, rather than the opening bracket.
+
+        Raises:
+            json.JSONDecodeError: If the array is not valid JSON.
+        """
+        if after_item and self._peek() == ",":
+            self._pos += 1
+        elif after_item and self._peek() != "]":
+            raise self._error("Expecting ',' delimiter")
+        yield from self._iter_items()
+
+    def _iter_items(self) -> Iterator[Any]:
+        """
+        Yields the items of the array from the current position to its closing bracket.
+        """
+        if self._peek() == "]":
+            self._close_array()
+            return
+        while True:
+            yield self._decode_value()
+            separator = self._peek()
+            if separator == "]":
+                self._close_array()
+                return
+            self._pos += 1
+            if separator != ",":
+                raise self._error("Expecting ',' delimiter")
+
+    def _close_array(self):
+        """
+        Consumes the closing bracket of the array, recording its byte offset.
+        """
+        self.array_end_offset = (
+            self.start_offset
+            + self._dropped_bytes
+            + len(self._buffer[: self._pos].encode("utf-8"))
+        )
+        self._pos += 1
+
+    def _fill(self, size: int) -> bool:
+        """
+        Reads more characters from the file, dropping the already consumed part of the buffer.
+
+        Args:
+            size (int): The number of characters to read.
+
+        Returns:
+            bool: False if the end of the file was reached.
+        """
+        chunk = self.file.read(size)
+        self._dropped_bytes += len(self._buffer[: self._pos].encode("utf-8"))
+        self._buffer = self._buffer[self._pos :] + chunk
+        self._pos = 0
+        if not chunk:
+            self._eof = True
+        return bool(chunk)
+
+    def _peek(self) -> str:
+        """
+        Skips whitespace and returns the next character without consuming it.
+
+        Returns:
+            str: The next character, or an empty string at the end of the file.
+        """
+        while True:
+            while (
+                self._pos < len(self._buffer)
+                and self._buffer[self._pos] in self._WHITESPACE
+            ):
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill(self.chunk_size):
+                return ""
+
+    def _expect(self, char: str):
+        """
+        Consumes the next non-whitespace character, which must be `char`.
+
+        Args:
+            char (str): The expected character.
+        """
+        if self._peek() != char:
+            raise self._error(f"Expecting '{char}'")
+        self._pos += 1
+
+    def _decode_value(self) -> Any:
+        """
+        Decodes the JSON value starting at the current position.
+
+        When the value is cut by the end of the buffer, more characters are read and
+        decoding is retried. Reads grow with the buffer so that large values are
+        decoded in amortized linear time.
+
+        Returns:
+            Any: The decoded value.
+        """
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+                self._fill(max(self.chunk_size, len(self._buffer)))
+                continue
+            # a number may be truncated by the end of the buffer, also when the
+            # buffer ends in its fraction or exponent, e.g. "1." or "2e-"
+            if (
+                not self._eof
+                and isinstance(value, (int, float))
+                and not isinstance(value, bool)
+                and self._buffer[end:].strip(self._NUMBER_CHARS) == ""
+            ):
+                self._fill(max(self.chunk_size, len(self._buffer)))
+                continue
+            self._pos = end
+            return value
+
+    def _error(self, message: str) -> json.JSONDecodeError:
+        """
+        Builds a decode error pointing at the current position in the buffer.
+
+        Args:
+            message (str): The error message.
+
+        Returns:
+            json.JSONDecodeError: The error to raise.
+        """
+        return json.JSONDecodeError(message, self._buffer, self._pos)
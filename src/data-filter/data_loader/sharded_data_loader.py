@@ -0,0 +1,427 @@
+from .base_data_loader import BaseDataLoader
+from .factory import Factory
+from .zone_map import ZoneMap
+from ..filter.predicate import Predicate, parse_value
+from ..models.data_containers.json_data_container import JsonDataContainer
+from ..models.data_containers.columnar_json_data_container import (
+    ColumnarJsonDataContainer,
+)
+from ..models.data_containers.columns import build_column
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Union
+import glob, logging, os
+import pandas as pd
+
+DATA_FILE_TYPES = ("csv", "json", "xml", "yaml", "yml")
+
+
+def is_sharded(path: str) -> bool:
+    """
+    Whether a path names several data files: a directory or a glob pattern.
+
+    Args:
+        path (str): The path.
+
+    Returns:
+        bool: True for a directory or a glob pattern.
+    """
+    return glob.has_magic(path) or os.path.isdir(path)
+
+
+def list_data_files(path: str) -> List[str]:
+    """
+    Get the data files named by a path, without opening them.
+
+    Args:
+        path (str): A data file, a directory or a glob pattern such as
+            'exports/*.json' or 'exports/**/*.csv'. The files must all have the same type.
+
+    Returns:
+        List[str]: The paths of the data files, sorted.
+
+    Raises:
+        ValueError: If no data file matches, or the files have different types.
+    """
+    if not is_sharded(path):
+        return [path]
+    if os.path.isdir(path):
+        files = [entry.path for entry in os.scandir(path) if entry.is_file()]
+    else:
+        files = [
+            file for file in glob.glob(path, recursive=True) if os.path.isfile(file)
+        ]
+    files = sorted(file for file in files if file.split(".")[-1] in DATA_FILE_TYPES)
+    if not files:
+        raise ValueError(f"No data file matches {path}")
+    file_types = {
+        "yaml" if file.endswith(".yml") else file.split(".")[-1] for file in files
+    }
+    if len(file_types) > 1:
+        raise ValueError(
+            f"The files of {path} must have the same type, got: "
+            f"{', '.join(sorted(file_types))}"
+        )
+    return files
+
+
+def partition_values(path: str) -> Dict[str, Any]:
+    """
+    Get the partition values of a file from the key=value directories of its path, e.g.
+    {"region": "eu", "year": 2024} for exports/region=eu/year=2024/part-0.json.
+
+    Args:
+        path (str): The path of the data file.
+
+    Returns:
+        Dict[str, Any]: The partition values, converted like command line values.
+    """
+    values = {}
+    for part in os.path.dirname(os.path.normpath(path)).split(os.sep):
+        key, separator, value = part.partition("=")
+        if separator and key:
+            values[key] = parse_value(value)
+    return values
+
+
+def add_partition_columns(
+    data: Union[pd.DataFrame, ColumnarJsonDataContainer],
+    values: Dict[str, Any],
+    columns: List[str] = None,
+) -> Union[pd.DataFrame, ColumnarJsonDataContainer]:
+    """
+    Add the partition values of a file to its rows, as constant columns. Columns read
+    from the file take precedence.
+
+    Args:
+        data (pd.DataFrame | ColumnarJsonDataContainer): The rows of the file.
+        values (Dict[str, Any]): The partition values of the file.
+        columns (List[str]): The columns to keep, in this order, all columns if None.
+
+    Returns:
+        pd.DataFrame | ColumnarJsonDataContainer: The rows with the partition columns.
+    """
+    for key, value in values.items():
+        if columns is not None and key not in columns:
+            continue
+        if isinstance(data, pd.DataFrame):
+            if key not in data.columns:
+                data[key] = value
+        elif key not in data.columns:
+            data.columns[key] = build_column([value] * data.length)
+    if isinstance(data, pd.DataFrame) and columns is not None:
+        data = data[columns]
+    return data
+
+
+class Shard:
+    """
+    Lazy handle on one data file of a sharded dataset: the file is only opened when
+    the shard is loaded, its zone map sidecar when the shard is pruned.
+
+    Attributes:
+        path (str): The path of the data file.
+        file_type (str): The extension of the file, giving its loader.
+        partition_values (Dict[str, Any]): The values of the key=value directories of
+            the path, shared by every row of the file.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): The path of the data file.
+        """
+        self.path = path
+        self.file_type = path.split(".")[-1]
+        self.partition_values = partition_values(path)
+        self._header = None
+
+    def header(self) -> List[str]:
+        """
+        Get the columns of a CSV file, reading its header only once.
+
+        Returns:
+            List[str]: The columns of the file.
+        """
+        if self._header is None:
+            self._header = pd.read_csv(self.path, nrows=0).columns.tolist()
+        return self._header
+
+    def file_columns(self, columns: List[str] = None) -> List[str]:
+        """
+        Get the columns to read from the file: the partition keys are added to the rows
+        after loading, unless the file has a column of the same name.
+
+        Args:
+            columns (List[str]): The columns/keys to load, all columns if None.
+
+        Returns:
+            List[str]: The columns/keys to read from the file, all columns if None.
+        """
+        if columns is None:
+            return None
+        if self.file_type != "csv":
+            # keys missing from the records are left to the partition values
+            return list(columns)
+        header = self.header()
+        return [
+            column
+            for column in columns
+            if column in header or column not in self.partition_values
+        ]
+
+    def may_match(self, predicate: Predicate) -> bool:
+        """
+        Whether rows of the shard may match a predicate, judging from the partition
+        values and from the zone map of the file, when it is current.
+
+        Args:
+            predicate (Predicate): The predicate.
+
+        Returns:
+            bool: False if no row of the shard can match.
+        """
+        ranges = {key: (value, value) for key, value in self.partition_values.items()}
+        null_counts = {key: 0 for key in self.partition_values}
+        zone_map = ZoneMap.load(self.path)
+        if zone_map is None:
+            # the partition values only hold for the keys the file does not have,
+            # which only the header of a CSV file tells without parsing it
+            shadowed = self.header() if self.file_type == "csv" else ranges
+            for key in list(shadowed):
+                ranges.pop(key, None)
+                null_counts.pop(key, None)
+            return predicate.may_match(ranges, null_counts)
+        if zone_map.row_count == 0:
+            return False
+        # columns read from the file take precedence over the partition values
+        for column in zone_map.columns:
+            ranges.pop(column, None)
+            null_counts.pop(column, None)
+        ranges.update(zone_map.ranges())
+        null_counts.update(zone_map.null_counts())
+        return predicate.may_match(ranges, null_counts)
+
+    def load(
+        self,
+        columns: List[str] = None,
+        trusted: bool = False,
+        record_tag: str = None,
+        predicate: Predicate = None,
+    ) -> Union[pd.DataFrame, ColumnarJsonDataContainer]:
+        """
+        Open and parse the file.
+
+        Args:
+            columns (List[str]): The columns/keys to load, all columns if None.
+            trusted (bool): Whether to skip the validation of each JSON item.
+            record_tag (str): The tag of the XML record elements.
+            predicate (Predicate): The predicate used to skip the row groups of a CSV
+                file, the rows themselves are not filtered.
+
+        Returns:
+            pd.DataFrame | ColumnarJsonDataContainer: A DataFrame for CSV files, a
+                columnar container for the other files.
+
+        Raises:
+            ValueError: If the file cannot be loaded.
+        """
+        file_columns = self.file_columns(columns)
+        data_loader = Factory.get_data_loader(
+            loader_name=self.file_type,
+            data_source=self.path,
+            trusted=trusted,
+            record_tag=record_tag,
+        )
+        if self.file_type == "csv":
+            data = data_loader.load_data(usecols=file_columns, predicate=predicate)
+        else:
+            data = data_loader.load_columnar_data(keys=file_columns)
+        if data is None:
+            raise ValueError(f"Could not load {self.path}")
+        return add_partition_columns(data, self.partition_values, columns)
+
+    def empty_frame(self, columns: List[str] = None) -> pd.DataFrame:
+        """
+        Get an empty DataFrame with the columns of the CSV file, reading its header
+        only, for results where every shard was pruned.
+
+        Args:
+            columns (List[str]): The columns to keep, all columns if None.
+
+        Returns:
+            pd.DataFrame: The empty DataFrame.
+        """
+        if columns is None:
+            columns = list(self.header())
+            columns += [key for key in self.partition_values if key not in columns]
+        return pd.DataFrame(columns=columns)
+
+    def __repr__(self):
+        return f"Shard({self.path})"
+
+
+class ShardedDataLoader(BaseDataLoader):
+    """
+    ShardedDataLoader loads a dataset made of many data files of the same type, named by
+    a glob pattern such as 'exports/*.json' or by a directory.
+
+    Files are only listed when the loader is created. They are read and parsed by a
+    thread pool, with at most max_workers files in flight, and only the shards whose
+    partition values (the key=value directories of their path, e.g.
+    exports/date=2024-01-01/part-0.json) and zone maps (see zone_map.py) may match the
+    filter are ever opened.
+
+    Attributes:
+        data_source (str): The glob pattern or directory of the data files.
+        trusted (bool): Skip the validation of each JSON item, only validating a sample.
+        record_tag (str): The tag of the XML record elements.
+        max_workers (int): The number of files read and parsed at the same time.
+
+    Methods:
+        load_data(usecols: List[str] = None, predicate: Predicate = None) -> pd.DataFrame | JsonDataContainer:
+            Loads the shards that may match the predicate.
+
+        load_columnar_data(keys: List[str] = None, predicate: Predicate = None) -> ColumnarJsonDataContainer:
+            Loads the record shards that may match the predicate into typed columns.
+
+        iter_shard_data(columns: List[str] = None, predicate: Predicate = None) -> Iterator:
+            Streams the data of the shards that may match the predicate, one shard at a time.
+    """
+
+    def __init__(
+        self,
+        data_source: str,
+        trusted: bool = False,
+        record_tag: str = None,
+        max_workers: int = 8,
+    ):
+        """
+        Initializes the ShardedDataLoader with the specified data source.
+
+        Args:
+            data_source (str): The glob pattern or directory of the data files.
+            trusted (bool): Skip the validation of each JSON item, only validating a sample.
+            record_tag (str): The tag of the XML record elements, required for XML files.
+            max_workers (int): The number of files read and parsed at the same time.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be a positive integer")
+        super().__init__(data_source)
+        self.trusted = trusted
+        self.record_tag = record_tag
+        self.max_workers = max_workers
+        self.shards = [Shard(path) for path in list_data_files(data_source)]
+        self.file_type = self.shards[0].file_type
+        if self.file_type == "xml" and record_tag is None:
+            raise ValueError("A record tag is required to load XML records")
+
+    def prune(self, predicate: Predicate = None) -> List[Shard]:
+        """
+        Get the shards that may hold rows matching a predicate, from their partition
+        values and zone maps, without opening any data file.
+
+        Args:
+            predicate (Predicate): The predicate, every shard is kept if None.
+
+        Returns:
+            List[Shard]: The shards to read, in path order.
+        """
+        if predicate is None:
+            return list(self.shards)
+        return [shard for shard in self.shards if shard.may_match(predicate)]
+
+    def iter_shard_data(
+        self, columns: List[str] = None, predicate: Predicate = None
+    ) -> Iterator[Union[pd.DataFrame, ColumnarJsonDataContainer]]:
+        """
+        Stream the data of the shards that may match the predicate, in path order. The
+        rows themselves are not filtered.
+
+        Args:
+            columns (List[str]): The columns/keys to load, all columns if None.
+            predicate (Predicate): The predicate used to prune the shards.
+
+        Yields:
+            pd.DataFrame | ColumnarJsonDataContainer: The data of the next shard.
+        """
+        shards = self.prune(predicate)
+        logging.info(
+            f"Reading {len(shards)} of {len(self.shards)} shards of {self.data_source}"
+        )
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # at most max_workers shards are parsed ahead of the consumer
+            pending = deque()
+            for shard in shards:
+                pending.append(
+                    executor.submit(
+                        shard.load, columns, self.trusted, self.record_tag, predicate
+                    )
+                )
+                if len(pending) >= self.max_workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def load_data(
+        self, usecols: List[str] = None, predicate: Predicate = None
+    ) -> Union[pd.DataFrame, JsonDataContainer]:
+        """
+        Loads the shards that may match the predicate.
+
+        Args:
+            usecols (List[str]): Only load these columns/keys, all columns if None.
+            predicate (Predicate): The predicate used to prune the shards.
+
+        Returns:
+            pd.DataFrame | JsonDataContainer: A DataFrame for CSV files, indexed by
+                the position of the rows among the loaded shards, a JsonDataContainer
+                for the other files.
+        """
+        if self.file_type != "csv":
+            data = self.load_columnar_data(keys=usecols, predicate=predicate)
+            return data.to_json_container() if data is not None else None
+        try:
+            frames = list(self.iter_shard_data(usecols, predicate))
+            if not frames:
+                return self.shards[0].empty_frame(usecols)
+            # empty frames would only add their dtypes to the result
+            kept = [frame for frame in frames if len(frame)] or frames[:1]
+            data = pd.concat(kept, ignore_index=True)
+            logging.info(f"Data loaded from {self.data_source}")
+            return data
+        except Exception as e:
+            logging.error(f"Error loading data: {e}")
+            print(f"Error loading data: {e}")
+
+    def load_columnar_data(
+        self, keys: List[str] = None, predicate: Predicate = None
+    ) -> ColumnarJsonDataContainer:
+        """
+        Loads the record shards that may match the predicate into a
+        ColumnarJsonDataContainer.
+
+        Args:
+            keys (List[str]): Only load these keys, all keys if None.
+            predicate (Predicate): The predicate used to prune the shards.
+
+        Returns:
+            ColumnarJsonDataContainer: The loaded data.
+        """
+        if self.file_type == "csv":
+            raise ValueError("CSV shards are loaded as a DataFrame with load_data")
+        try:
+            data = ColumnarJsonDataContainer.concat(
+                list(self.iter_shard_data(keys, predicate))
+            )
+            logging.info(f"Data loaded from {self.data_source}")
+            return data
+        except Exception as e:
+            logging.error(f"Error loading data: {e}")
+            print(f"Error loading data: {e}")
+
+    def __repr__(self):
+        return f"ShardedDataLoader(data_source={self.data_source}, shards={len(self.shards)})"
+
+    def __str__(self):
+        return f"{len(self.shards)} shards @ {self.data_source}"
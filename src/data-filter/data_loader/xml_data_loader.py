@@ -1,17 +1,45 @@
 from .base_data_loader import BaseDataLoader
+from .zone_map import refresh_zone_map
 from ..models.data_containers.xml_data_container import XMLDataContainer
+from ..models.data_containers.json_data_container import JsonDataContainer, JsonDataItem
+from ..models.data_containers.columnar_json_data_container import (
+    ColumnarJsonDataContainer,
+)
+from typing import Any, Dict, Iterable, Iterator, List, Union
 import logging, os
 
 
 class XMLDataLoader(BaseDataLoader):
+    """
+    XMLDataLoader loads and saves XML data from/to a specified file.
 
-    def __init__(self, data_source):
+    Without a record tag, the document is loaded as nested dicts. With a record tag,
+    every element having that tag (e.g. "flower") is streamed as a flat record and the
+    records are loaded into the same containers as JSON items, so the JSON filters,
+    sorters and stats apply to them.
+
+    Attributes:
+        data_source (str): The path to the XML file to load data from or save data to.
+        record_tag (str): The tag of the repeated record elements.
+        coerce_types (bool): Convert numeric and boolean text of the records to int,
+            float and bool values once, at load time.
+    """
+
+    def __init__(self, data_source, record_tag: str = None, coerce_types: bool = True):
         super().__init__(data_source)
+        self.record_tag = record_tag
+        self.coerce_types = coerce_types
 
-    def load_data(self) -> dict:
+    def load_data(self) -> Union[dict, JsonDataContainer]:
 
         try:
-            data = XMLDataContainer._as_py_dict(xml_file_path=self.data_source)
+            if self.record_tag is not None:
+                data = JsonDataContainer.model_construct(data=list(self.iter_data()))
+            else:
+                data = XMLDataContainer._as_py_dict(xml_file_path=self.data_source)
+            if self.record_tag is not None and self.write_zone_maps:
+                # a plain dict has no rows to map
+                refresh_zone_map(self.data_source, data)
             logging.info(f"Data loaded from {self.data_source}")
             return data
         except FileNotFoundError as e:
@@ -21,6 +49,85 @@ class XMLDataLoader(BaseDataLoader):
             logging.error(f"Error loading data: {e}")
             print(f"Error loading data: {e}")
 
+    def load_columnar_data(self, keys: List[str] = None) -> ColumnarJsonDataContainer:
+        """
+        Loads the records of the XML file into a ColumnarJsonDataContainer, streaming
+        them into the columns.
+
+        Args:
+            keys (List[str]): Only load these keys, all keys if None.
+
+        Returns:
+            ColumnarJsonDataContainer: The loaded records.
+        """
+        try:
+            data = ColumnarJsonDataContainer.from_records(
+                self.iter_records(), keys=keys
+            )
+            if keys is None and self.write_zone_maps:
+                refresh_zone_map(self.data_source, data)
+            logging.info(f"Data loaded from {self.data_source}")
+            return data
+        except FileNotFoundError as e:
+            logging.error(f"File not found: {e}")
+            print(f"File not found: {e}")
+        except Exception as e:
+            logging.error(f"Error loading data: {e}")
+            print(f"Error loading data: {e}")
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """
+        Streams the records of the XML file as flat dicts.
+
+        Yields:
+            dict: The next record.
+
+        Raises:
+            ValueError: If the loader has no record tag.
+        """
+        if self.record_tag is None:
+            raise ValueError("A record tag is required to stream XML records")
+        yield from XMLDataContainer._iter_records(
+            self.data_source, self.record_tag, coerce_types=self.coerce_types
+        )
+
+    def iter_data(
+        self, batch_size: int = None
+    ) -> Iterator[Union[JsonDataItem, JsonDataContainer]]:
+        """
+        Streams the records of the XML file like JsonDataLoader.iter_data.
+
+        Args:
+            batch_size (int): If given, records are grouped into JsonDataContainer
+                objects of at most batch_size items.
+
+        Yields:
+            JsonDataItem | JsonDataContainer: The next record, or the next batch.
+        """
+        if batch_size is not None and batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+        try:
+            batch = []
+            for record in self.iter_records():
+                # records only hold str, int, float or bool values or lists of them
+                item = JsonDataItem.model_construct(item=record)
+                if batch_size is None:
+                    yield item
+                    continue
+                batch.append(item)
+                if len(batch) == batch_size:
+                    yield JsonDataContainer.model_construct(data=batch)
+                    batch = []
+            if batch:
+                yield JsonDataContainer.model_construct(data=batch)
+            logging.info(f"Data streamed from {self.data_source}")
+        except FileNotFoundError as e:
+            logging.error(f"File not found: {e}")
+            raise
+        except Exception as e:
+            logging.error(f"Error streaming data: {e}")
+            raise
+
     def save_data(self, data: dict):
         if not isinstance(data, dict):
             raise ValueError("Data must be a dictionary")
@@ -33,6 +140,41 @@ class XMLDataLoader(BaseDataLoader):
             logging.error(f"Error saving data: {e}")
             print(f"Error saving data: {e}")
 
+    def save_records(
+        self,
+        records: Iterable[Union[Dict[str, Any], JsonDataItem]],
+        root_tag: str = "data",
+    ) -> int:
+        """
+        Streams records to the XML file, each record being written as soon as it is
+        produced, e.g. the items of a filtered JsonDataView.
+
+        Args:
+            records (Iterable): The record dicts or JsonDataItem objects.
+            root_tag (str): The tag of the root element wrapping the records.
+
+        Returns:
+            int: The number of records written.
+
+        Raises:
+            ValueError: If the loader has no record tag.
+        """
+        if self.record_tag is None:
+            raise ValueError("A record tag is required to save XML records")
+        records = (
+            record.item if isinstance(record, JsonDataItem) else record
+            for record in records
+        )
+        try:
+            count = XMLDataContainer._write_records(
+                records, self.data_source, self.record_tag, root_tag=root_tag
+            )
+            logging.info(f"Data saved to {self.data_source}")
+            return count
+        except Exception as e:
+            logging.error(f"Error saving data: {e}")
+            print(f"Error saving data: {e}")
+
     def __repr__(self):
         return f"Data @ {self.data_source})"
 
@@ -0,0 +1,266 @@
+from .base_data_loader import BaseDataLoader
+from .zone_map import refresh_zone_map
+from ..models.data_containers.json_data_container import JsonDataContainer, JsonDataItem
+from ..models.data_containers.columnar_json_data_container import (
+    ColumnarJsonDataContainer,
+)
+from typing import Any, Dict, Iterator, List, Union
+import logging, os
+import yaml
+
+try:
+    # libyaml bindings, several times faster than the pure Python loader
+    from yaml import CSafeDumper as SafeDumper, CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeDumper, SafeLoader
+
+
+class YamlDataLoader(BaseDataLoader):
+    """
+    YamlDataLoader is responsible for loading and saving YAML data from/to a specified file.
+
+    A file is a stream of documents, each holding one record, either as a mapping or
+    as a JSON item ({"item": {...}}). A document can also hold a whole JSON-like
+    {"data": [...]} list of items. Records are loaded into the same containers as JSON
+    items, so the JSON filters, sorters and stats apply to them.
+
+    Attributes:
+        data_source (str): The path to the YAML file to load data from or save data to.
+        trusted (bool): Skip the validation of each item, only validating a sample.
+        validation_sample_size (int): The number of items validated when trusted is set.
+
+    Methods:
+        load_data() -> JsonDataContainer:
+            Loads the records of the YAML file specified by data_source as a JsonDataContainer object.
+
+        load_columnar_data(keys: List[str] = None) -> ColumnarJsonDataContainer:
+            Loads the records of the YAML file specified by data_source into typed columns.
+
+        iter_data(batch_size: int = None) -> Iterator[Union[JsonDataItem, JsonDataContainer]]:
+            Streams the records of the YAML file, parsing one document at a time.
+
+        save_data(data: JsonDataContainer):
+            Saves the given JsonDataContainer object to the YAML file, one document per item.
+    """
+
+    def __init__(
+        self, data_source, trusted: bool = False, validation_sample_size: int = 100
+    ):
+        """
+        Initializes the YamlDataLoader with the specified data source.
+
+        Args:
+            data_source (str): The path to the YAML file to load data from or save data to.
+            trusted (bool): Skip the validation of each item, only validating a sample.
+            validation_sample_size (int): The number of items validated when trusted is set.
+        """
+        super().__init__(data_source)
+        self.trusted = trusted
+        self.validation_sample_size = validation_sample_size
+
+    def load_data(self) -> JsonDataContainer:
+        """
+        Loads the records of the YAML file specified by data_source and returns them as a
+        JsonDataContainer object.
+
+        Returns:
+            JsonDataContainer: The loaded data.
+
+        Raises:
+            FileNotFoundError: If the YAML file specified by data_source is not found.
+            Exception: If there is an error loading the data.
+        """
+        try:
+            data = JsonDataContainer.model_construct(data=list(self.iter_data()))
+            if self.write_zone_maps:
+                refresh_zone_map(self.data_source, data)
+            logging.info(f"Data loaded from {self.data_source}")
+            return data
+        except FileNotFoundError as e:
+            logging.error(f"File not found: {e}")
+            print(f"File not found: {e}")
+        except Exception as e:
+            logging.error(f"Error loading data: {e}")
+            print(f"Error loading data: {e}")
+
+    def load_columnar_data(self, keys: List[str] = None) -> ColumnarJsonDataContainer:
+        """
+        Loads the records of the YAML file specified by data_source into a
+        ColumnarJsonDataContainer, streaming them into the columns.
+
+        Args:
+            keys (List[str]): Only load these keys, all keys if None.
+
+        Returns:
+            ColumnarJsonDataContainer: The loaded data.
+
+        Raises:
+            FileNotFoundError: If the YAML file specified by data_source is not found.
+            Exception: If there is an error loading the data.
+        """
+        try:
+            data = ColumnarJsonDataContainer.from_records(
+                (item.item for item in self.iter_data()), keys=keys
+            )
+            if keys is None and self.write_zone_maps:
+                refresh_zone_map(self.data_source, data)
+            logging.info(f"Data loaded from {self.data_source}")
+            return data
+        except FileNotFoundError as e:
+            logging.error(f"File not found: {e}")
+            print(f"File not found: {e}")
+        except Exception as e:
+            logging.error(f"Error loading data: {e}")
+            print(f"Error loading data: {e}")
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """
+        Streams the raw items of the YAML file, as {"item": {...}} dicts. Documents are
+        parsed lazily, one at a time.
+
+        Yields:
+            dict: The next raw item.
+
+        Raises:
+            ValueError: If a document is neither a record nor a list of items.
+        """
+        with open(self.data_source, "r", encoding="utf-8") as file:
+            for document in yaml.load_all(file, Loader=SafeLoader):
+                if document is None:
+                    # empty document, e.g. a trailing "---"
+                    continue
+                if not isinstance(document, dict):
+                    raise ValueError(
+                        f"YAML documents must be mappings, got: {type(document).__name__}"
+                    )
+                if list(document) == ["data"] and isinstance(document["data"], list):
+                    yield from document["data"]
+                elif list(document) == ["item"] and isinstance(document["item"], dict):
+                    yield document
+                else:
+                    yield {"item": document}
+
+    def iter_data(
+        self, batch_size: int = None
+    ) -> Iterator[Union[JsonDataItem, JsonDataContainer]]:
+        """
+        Streams the records of the YAML file specified by data_source, like
+        JsonDataLoader.iter_data.
+
+        Args:
+            batch_size (int): If given, records are grouped into JsonDataContainer objects
+                of at most batch_size items.
+
+        Yields:
+            JsonDataItem | JsonDataContainer: The next record, or the next batch of records.
+
+        Raises:
+            FileNotFoundError: If the YAML file specified by data_source is not found.
+            Exception: If there is an error parsing the data.
+        """
+        if batch_size is not None and batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+        try:
+            batch = []
+            for position, raw_item in enumerate(self.iter_records()):
+                if self.trusted and position >= self.validation_sample_size:
+                    item = JsonDataItem.model_construct(item=raw_item["item"])
+                else:
+                    item = JsonDataItem.model_validate(raw_item)
+                if batch_size is None:
+                    yield item
+                    continue
+                batch.append(item)
+                if len(batch) == batch_size:
+                    yield JsonDataContainer.model_construct(data=batch)
+                    batch = []
+            if batch:
+                yield JsonDataContainer.model_construct(data=batch)
+            logging.info(f"Data streamed from {self.data_source}")
+        except FileNotFoundError as e:
+            logging.error(f"File not found: {e}")
+            raise
+        except Exception as e:
+            logging.error(f"Error streaming data: {e}")
+            raise
+
+    def save_data(self, data: JsonDataContainer):
+        """
+        Saves the given JsonDataContainer object to the YAML file specified by data_source,
+        one document per item.
+
+        Args:
+            data (JsonDataContainer): The data to save.
+
+        Raises:
+            ValueError: If the data is not a JsonDataContainer object.
+            FileNotFoundError: If the YAML file specified by data_source is not found.
+            Exception: If there is an error saving the data.
+        """
+        if not isinstance(data, JsonDataContainer):
+            raise ValueError("Data must be a JsonDataContainer object")
+        if not os.path.exists(self.data_source):
+            raise FileNotFoundError(f"File not found: {self.data_source}")
+        try:
+            with open(self.data_source, "w", encoding="utf-8") as file:
+                yaml.dump_all(
+                    (item.item for item in data.data),
+                    file,
+                    Dumper=SafeDumper,
+                    explicit_start=True,
+                    sort_keys=False,
+                )
+            logging.info(f"Data saved to {self.data_source}")
+        except Exception as e:
+            logging.error(f"Error saving data: {e}")
+            print(f"Error saving data: {e}")
+
+    def __repr__(self):
+        """
+        Returns a string representation of the YamlDataLoader object.
+
+        Returns:
+            str: A string representation of the YamlDataLoader object.
+        """
+        return f"Data @ {self.data_source})"
+
+    def __str__(self):
+        """
+        Returns a string representation of the YamlDataLoader object.
+
+        Returns:
+            str: A string representation of the YamlDataLoader object.
+        """
+        return f"Data @ {self.data_source}"
+
+    def _get_data_source(self):
+        """
+        Gets the data source.
+
+        Returns:
+            str: The data source.
+        """
+        return self._data_source
+
+    def _set_data_source(self, data_source):
+        """
+        Sets the data source.
+
+        Args:
+            data_source (str): The path to the YAML file to load data from or save data to.
+
+        Raises:
+            ValueError: If the data source is not a string path to a YAML file.
+            FileNotFoundError: If the YAML file specified by data_source is not found.
+        """
+        if not isinstance(data_source, str):
+            raise ValueError("Data source must be a string path to a YAML file")
+        # make sure the path exists
+        if not os.path.exists(data_source):
+            raise FileNotFoundError(f"File not found: {data_source}")
+        # make sure it is a yaml file
+        if not data_source.endswith((".yaml", ".yml")):
+            raise ValueError("Only YAML files are supported for the yaml data loader")
+        self._data_source = data_source
+
+    data_source = property(_get_data_source, _set_data_source)
@@ -0,0 +1,398 @@
+from ..filter.predicate import Predicate
+from ..models.data_containers.json_data_container import JsonDataContainer
+from ..models.data_containers.columnar_json_data_container import (
+    ColumnarJsonDataContainer,
+)
+from ..models.data_containers.columns import NumericColumn, ObjectColumn, StringColumn
+from typing import Any, Dict, List, Optional, Tuple, Union
+import json, logging, os, stat, tempfile
+import numpy as np
+import pandas as pd
+
+"""
+Zone maps: the row count of a data file and the min/max and null count of each of its
+columns, stored as JSON in a "<data file>.zonemap" sidecar. The sidecar extension is not
+a data file type, so that sidecars are never listed as shards of a dataset.
+
+Loaders write the sidecar the first time they fully load a file. Filters then check
+their predicate against the ranges of the sidecar with Predicate.may_match, so that a
+file whose ranges cannot match is skipped without being parsed. CSV zone maps also hold
+the ranges and byte offsets of row groups, so that only the row groups which may match
+are read from a file that does. A sidecar older than its data file is ignored.
+"""
+
+
+ZONE_MAP_SUFFIX = ".zonemap"
+DEFAULT_ROW_GROUP_SIZE = 100_000
+
+# size of the blocks scanned for line breaks
+_SCAN_BLOCK_SIZE = 16 * 1024 * 1024
+
+
+def zone_map_path(data_source: str) -> str:
+    return f"{data_source}{ZONE_MAP_SUFFIX}"
+
+
+class ZoneMap:
+    """
+    Row count and per-column min/max and null count of a data file, and for CSV files
+    of its row groups.
+    """
+
+    def __init__(
+        self,
+        row_count: int,
+        columns: Dict[str, Dict[str, Any]],
+        row_groups: List[Dict[str, Any]] = None,
+        dtypes: Dict[str, str] = None,
+    ):
+        """
+        :param row_count: The number of rows of the file.
+        :param columns: The {"min", "max", "null_count"} stats of each column, min and
+            max being left out for columns without comparable values.
+        :param row_groups: The {"start", "end", "first_row", "row_count", "columns"}
+            byte range, position and column stats of each row group of a CSV file.
+        :param dtypes: The dtypes of the columns of a CSV file, used to parse row
+            groups the way the whole file is parsed.
+        """
+        self.row_count = row_count
+        self.columns = columns
+        self.row_groups = row_groups or []
+        self.dtypes = dtypes or {}
+
+    @classmethod
+    def build(
+        cls,
+        data: Union[pd.DataFrame, ColumnarJsonDataContainer, JsonDataContainer],
+        data_source: str = None,
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    ) -> "ZoneMap":
+        """
+        Compute the zone map of the data of a file.
+
+        :param data: The whole data of the file.
+        :param data_source: The path of a CSV file, to locate its row groups.
+        :param row_group_size: The number of rows of a CSV row group.
+        :return: The zone map.
+        """
+        if isinstance(data, ColumnarJsonDataContainer):
+            return cls(data.length, _container_stats(data))
+        if isinstance(data, JsonDataContainer):
+            return cls(len(data.data), _record_stats(item.item for item in data.data))
+        zone_map = cls(
+            len(data),
+            _frame_stats(data),
+            dtypes={column: _parse_dtype(data[column]) for column in data.columns},
+        )
+        if data_source is not None:
+            zone_map.row_groups = _csv_row_groups(data_source, data, row_group_size)
+        return zone_map
+
+    def ranges(self, columns: Dict[str, Dict[str, Any]] = None) -> Dict[str, Tuple]:
+        """
+        Get the (min, max) range of the columns having one.
+
+        :param columns: The column stats, those of the whole file if None.
+        :return: The ranges, as expected by Predicate.may_match.
+        """
+        columns = self.columns if columns is None else columns
+        return {
+            column: (stats["min"], stats["max"])
+            for column, stats in columns.items()
+            if "min" in stats
+        }
+
+    def null_counts(self, columns: Dict[str, Dict[str, Any]] = None) -> Dict[str, int]:
+        """
+        Get the number of missing values of the columns.
+
+        :param columns: The column stats, those of the whole file if None.
+        :return: The null counts, as expected by Predicate.may_match.
+        """
+        columns = self.columns if columns is None else columns
+        return {column: stats["null_count"] for column, stats in columns.items()}
+
+    def may_match(self, predicate: Predicate) -> bool:
+        """
+        Whether rows of the file may match a predicate.
+
+        :param predicate: The predicate.
+        :return: False if no row of the file can match.
+        """
+        return self.row_count > 0 and predicate.may_match(
+            self.ranges(), self.null_counts()
+        )
+
+    def matching_row_groups(self, predicate: Predicate) -> List[Dict[str, Any]]:
+        """
+        Get the row groups of a CSV file which may hold rows matching a predicate.
+
+        :param predicate: The predicate.
+        :return: The row groups, in file order.
+        """
+        return [
+            group
+            for group in self.row_groups
+            if predicate.may_match(
+                self.ranges(group["columns"]), self.null_counts(group["columns"])
+            )
+        ]
+
+    def save(self, data_source: str):
+        """
+        Write the zone map to the sidecar of a file, with the modification time and size
+        of the file.
+
+        :param data_source: The path of the data file.
+        """
+        status = os.stat(data_source)
+        content = {
+            "source": {"mtime_ns": status.st_mtime_ns, "size": status.st_size},
+            "row_count": self.row_count,
+            "columns": self.columns,
+            "row_groups": self.row_groups,
+            "dtypes": self.dtypes,
+        }
+        path = zone_map_path(data_source)
+        # written under another name first, so that readers never see a partial file
+        with tempfile.NamedTemporaryFile(
+            "w",
+            encoding="utf-8",
+            dir=os.path.dirname(os.path.abspath(path)),
+            prefix=".zonemap-",
+            delete=False,
+        ) as file:
+            try:
+                json.dump(content, file)
+            except Exception:
+                file.close()
+                os.remove(file.name)
+                raise
+        # NamedTemporaryFile creates the file readable by its owner only, the sidecar
+        # gets the permissions of the data file
+        os.chmod(file.name, stat.S_IMODE(status.st_mode))
+        os.replace(file.name, path)
+
+    @classmethod
+    def load(cls, data_source: str) -> Optional["ZoneMap"]:
+        """
+        Read the sidecar of a file.
+
+        :param data_source: The path of the data file.
+        :return: The zone map, or None if the sidecar is missing, unreadable or older
+            than the file.
+        """
+        try:
+            with open(zone_map_path(data_source), "r", encoding="utf-8") as file:
+                content = json.load(file)
+            status = os.stat(data_source)
+            if content["source"] != {
+                "mtime_ns": status.st_mtime_ns,
+                "size": status.st_size,
+            }:
+                return None
+            return cls(
+                content["row_count"],
+                content["columns"],
+                content["row_groups"],
+                content["dtypes"],
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def __repr__(self):
+        return (
+            f"ZoneMap(row_count={self.row_count}, columns={len(self.columns)}, "
+            f"row_groups={len(self.row_groups)})"
+        )
+
+
+def refresh_zone_map(
+    data_source: str,
+    data: Union[pd.DataFrame, ColumnarJsonDataContainer, JsonDataContainer],
+) -> Optional[ZoneMap]:
+    """
+    Write the sidecar of a file just loaded, unless it is current or its directory is
+    not writable. Other failures are logged and ignored.
+
+    :param data_source: The path of the data file.
+    :param data: The whole data of the file.
+    :return: The zone map, None if it could not be written.
+    """
+    zone_map = ZoneMap.load(data_source)
+    if zone_map is not None:
+        return zone_map
+    if not os.access(os.path.dirname(os.path.abspath(data_source)), os.W_OK):
+        return None
+    try:
+        zone_map = ZoneMap.build(
+            data, data_source if isinstance(data, pd.DataFrame) else None
+        )
+        zone_map.save(data_source)
+        return zone_map
+    except Exception as e:
+        logging.warning(f"Could not write the zone map of {data_source}: {e}")
+        return None
+
+
+def _range(values: Any) -> Dict[str, Any]:
+    """
+    Get the min and max of non-empty comparable values, as JSON values.
+    """
+    low, high = min(values), max(values)
+    return {
+        "min": low.item() if hasattr(low, "item") else low,
+        "max": high.item() if hasattr(high, "item") else high,
+    }
+
+
+def _frame_stats(dataframe: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+    stats = {}
+    for column in dataframe.columns:
+        series = dataframe[column]
+        values = series.dropna()
+        column_stats = {"null_count": int(len(series) - len(values))}
+        if len(values) and (
+            pd.api.types.is_numeric_dtype(series.dtype)
+            or pd.api.types.is_bool_dtype(series.dtype)
+        ):
+            column_stats.update(_range(values.to_numpy()))
+        elif len(values) and all(isinstance(value, str) for value in values):
+            column_stats.update(_range(values))
+        stats[column] = column_stats
+    return stats
+
+
+def _parse_dtype(series: pd.Series) -> str:
+    if series.dtype == object:
+        values = series.dropna()
+        if len(values) and all(isinstance(value, (bool, np.bool_)) for value in values):
+            # bools with missing values, parsed as "boolean" then restored to object
+            return "boolean"
+    return str(series.dtype)
+
+
+def _container_stats(
+    data_container: ColumnarJsonDataContainer,
+) -> Dict[str, Dict[str, Any]]:
+    stats = {}
+    for key, column in data_container.columns.items():
+        present = int(np.count_nonzero(column.present))
+        column_stats = {"null_count": data_container.length - present}
+        if present and isinstance(column, NumericColumn):
+            values = column.values[column.present]
+            if values.dtype.kind == "f":
+                # NaN never matches a comparison
+                values = values[~np.isnan(values)]
+            if len(values):
+                column_stats.update(_range(values))
+        elif present and isinstance(column, StringColumn):
+            used = np.unique(column.codes[column.present])
+            column_stats.update(_range(column.categories[used].tolist()))
+        elif present and isinstance(column, ObjectColumn):
+            # e.g. ints mixed with floats, ranged like the values of records
+            bounds = _record_stats(
+                {key: value} for value in column.values[column.present]
+            ).get(key, {})
+            column_stats.update(
+                {name: bound for name, bound in bounds.items() if name != "null_count"}
+            )
+        stats[key] = column_stats
+    return stats
+
+
+def _record_stats(records) -> Dict[str, Dict[str, Any]]:
+    """
+    Stats of record dicts in one pass. Numbers (bools included) and strings get a
+    range, keys mixing both or holding other values only a null count.
+    """
+    length = 0
+    counts: Dict[str, int] = {}
+    ranges: Dict[str, Optional[List[Any]]] = {}
+    for record in records:
+        length += 1
+        for key, value in record.items():
+            if value is None:
+                continue
+            counts[key] = counts.get(key, 0) + 1
+            bounds = ranges.get(key, [])
+            if bounds is None:
+                continue
+            number = isinstance(value, (int, float))
+            if number and value != value:
+                # NaN never matches a comparison
+                continue
+            if not number and not isinstance(value, str):
+                ranges[key] = None
+            elif not bounds:
+                ranges[key] = [value, value, number]
+            elif bounds[2] != number:
+                ranges[key] = None
+            elif value < bounds[0]:
+                bounds[0] = value
+            elif value > bounds[1]:
+                bounds[1] = value
+    stats = {}
+    for key, count in counts.items():
+        stats[key] = {"null_count": length - count}
+        if ranges.get(key):
+            stats[key].update({"min": ranges[key][0], "max": ranges[key][1]})
+    return stats
+
+
+def _csv_row_groups(
+    data_source: str, dataframe: pd.DataFrame, row_group_size: int
+) -> List[Dict[str, Any]]:
+    """
+    Locate the row groups of a CSV file and compute their stats.
+
+    Row groups start every row_group_size lines. They are only located when every line
+    after the header holds exactly one row of the DataFrame: files with quoted line
+    breaks or blank lines get no row groups.
+
+    :param data_source: The path of the CSV file.
+    :param dataframe: The whole data of the file.
+    :param row_group_size: The number of rows of a row group.
+    :return: The row groups.
+    """
+    # offsets of the line breaks ending the lines just before a row group starts,
+    # the header line being line 0
+    boundaries = []
+    line_breaks = 0
+    size = os.path.getsize(data_source)
+    last_byte = b""
+    with open(data_source, "rb") as file:
+        offset = 0
+        while True:
+            block = file.read(_SCAN_BLOCK_SIZE)
+            if not block:
+                break
+            positions = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == 10)
+            lines = np.arange(line_breaks, line_breaks + len(positions))
+            boundaries.extend(
+                (positions[lines % row_group_size == 0] + offset).tolist()
+            )
+            line_breaks += len(positions)
+            offset += len(block)
+            last_byte = block[-1:]
+    rows = line_breaks - 1 if last_byte == b"\n" else line_breaks
+    if rows != len(dataframe):
+        return []
+
+    row_groups = []
+    for position, start in enumerate(boundaries):
+        first_row = position * row_group_size
+        if first_row >= len(dataframe):
+            break
+        end = boundaries[position + 1] + 1 if position + 1 < len(boundaries) else size
+        group = dataframe.iloc[first_row : first_row + row_group_size]
+        row_groups.append(
+            {
+                "start": start + 1,
+                "end": end,
+                "first_row": first_row,
+                "row_count": len(group),
+                "columns": _frame_stats(group),
+            }
+        )
+    return row_groups
@@ -1,12 +1,37 @@
+import numpy as np
 import pandas as pd
 from typing import Any, List
+from ..models.data_containers.columns import ListColumn, compare_array
+from ..models.index import build_index, get_frame_index_cache
 from .base_filter import BaseFilter
+from .predicate import Predicate
 
 
 class CSVFilter(BaseFilter):
 
-    def __init__(self, dataframe: pd.DataFrame):
+    def __init__(self, dataframe: pd.DataFrame, use_index: bool = False):
         self.dataframe = dataframe
+        # answer filter_by_column with secondary indexes cached on the DataFrame
+        self.use_index = use_index
+
+    @property
+    def dataframe(self) -> pd.DataFrame:
+        """
+        The filtered rows. The filters only narrow a selection vector over the original
+        DataFrame, which is copied once when the filtered rows are accessed.
+        """
+        if self._frame is None:
+            self._frame = self._base.iloc[self._positions]
+        return self._frame
+
+    @dataframe.setter
+    def dataframe(self, dataframe: pd.DataFrame):
+        self._base = dataframe
+        self._frame = dataframe
+        # positions of the selected rows in the original DataFrame
+        self._positions = np.arange(len(dataframe))
+        # flattened list columns, kept in sync with the selected rows
+        self._list_columns = {}
 
     def filter_by_column(self, column: str, value: Any, comparison: str = "eq"):
         """
@@ -19,12 +44,35 @@ class CSVFilter(BaseFilter):
         if comparison not in ["eq", "lt", "gt"]:
             raise ValueError("Comparison must be 'eq', 'lt', or 'gt'")
 
+        if self.use_index:
+            positions = self._index_lookup(column, value, comparison)
+            if positions is not None:
+                self._keep_positions(positions)
+                return
+
+        series = self._column(column)
         if comparison == "eq":
-            self.dataframe = self.dataframe[self.dataframe[column] == value]
+            self._keep_rows(series == value)
         elif comparison == "lt":
-            self.dataframe = self.dataframe[self.dataframe[column] < value]
+            self._keep_rows(series < value)
         elif comparison == "gt":
-            self.dataframe = self.dataframe[self.dataframe[column] > value]
+            self._keep_rows(series > value)
+
+    def filter_by_predicate(self, predicate: Predicate):
+        """
+        Filter the DataFrame by a predicate expression, combining every condition into
+        a single boolean mask.
+
+        :param predicate: The predicate, e.g. built with predicate.parse_expression.
+        """
+        columns = [
+            column for column in self._base.columns if column in predicate.columns()
+        ]
+        if self._frame is None:
+            frame = self._base[columns].iloc[self._positions]
+        else:
+            frame = self._frame[columns]
+        self._keep_rows(predicate.mask(frame))
 
     def filter_by_string_contains(self, column: str, substring: str):
         """
@@ -33,9 +81,7 @@ class CSVFilter(BaseFilter):
         :param column: The column to filter by.
         :param substring: The substring to check for.
         """
-        self.dataframe = self.dataframe[
-            self.dataframe[column].str.contains(substring, na=False)
-        ]
+        self._keep_rows(self._column(column).str.contains(substring, na=False))
 
     def filter_by_string_startswith(self, column: str, prefix: str):
         """
@@ -44,9 +90,7 @@ class CSVFilter(BaseFilter):
         :param column: The column to filter by.
         :param prefix: The prefix to check for.
         """
-        self.dataframe = self.dataframe[
-            self.dataframe[column].str.startswith(prefix, na=False)
-        ]
+        self._keep_rows(self._column(column).str.startswith(prefix, na=False))
 
     def filter_by_string_endswith(self, column: str, suffix: str):
         """
@@ -55,9 +99,7 @@ class CSVFilter(BaseFilter):
         :param column: The column to filter by.
         :param suffix: The suffix to check for.
         """
-        self.dataframe = self.dataframe[
-            self.dataframe[column].str.endswith(suffix, na=False)
-        ]
+        self._keep_rows(self._column(column).str.endswith(suffix, na=False))
 
     def filter_by_list_all_elements(self, column: str, elements: List[Any]):
         """
@@ -66,9 +108,7 @@ class CSVFilter(BaseFilter):
         :param column: The column to filter by.
         :param elements: The elements to check for.
         """
-        self.dataframe = self.dataframe[
-            self.dataframe[column].apply(lambda x: all(elem in x for elem in elements))
-        ]
+        self._keep_rows(self._list_column(column).contains_all(elements))
 
     def filter_by_list_min(self, column: str, min_value: Any):
         """
@@ -77,9 +117,8 @@ class CSVFilter(BaseFilter):
         :param column: The column to filter by.
         :param min_value: The minimum value to compare against.
         """
-        self.dataframe = self.dataframe[
-            self.dataframe[column].apply(lambda x: min(x) >= min_value)
-        ]
+        minimums, non_empty = self._list_column(column).reduce(np.minimum)
+        self._keep_rows(non_empty & (minimums >= min_value))
 
     def filter_by_list_max(self, column: str, max_value: Any):
         """
@@ -88,9 +127,8 @@ class CSVFilter(BaseFilter):
         :param column: The column to filter by.
         :param max_value: The maximum value to compare against.
         """
-        self.dataframe = self.dataframe[
-            self.dataframe[column].apply(lambda x: max(x) <= max_value)
-        ]
+        maximums, non_empty = self._list_column(column).reduce(np.maximum)
+        self._keep_rows(non_empty & (maximums <= max_value))
 
     def filter_by_list_average(
         self, column: str, avg_value: float, comparison: str = "eq"
@@ -105,18 +143,91 @@ class CSVFilter(BaseFilter):
         if comparison not in ["eq", "lt", "gt"]:
             raise ValueError("Comparison must be 'eq', 'lt', or 'gt'")
 
-        if comparison == "eq":
-            self.dataframe = self.dataframe[
-                self.dataframe[column].apply(lambda x: sum(x) / len(x) == avg_value)
-            ]
-        elif comparison == "lt":
-            self.dataframe = self.dataframe[
-                self.dataframe[column].apply(lambda x: sum(x) / len(x) < avg_value)
-            ]
-        elif comparison == "gt":
-            self.dataframe = self.dataframe[
-                self.dataframe[column].apply(lambda x: sum(x) / len(x) > avg_value)
-            ]
+        averages, non_empty = self._list_column(column).mean()
+        self._keep_rows(non_empty & compare_array(averages, avg_value, comparison))
+
+    def _column(self, column: str) -> pd.Series:
+        """
+        Get the selected rows of a column, without copying the other columns.
+
+        :param column: The column.
+        :return: The values of the selected rows.
+        """
+        if self._frame is not None:
+            return self._frame[column]
+        return self._base[column].iloc[self._positions]
+
+    def _list_column(self, column: str) -> ListColumn:
+        """
+        Get the flattened values plus row offsets representation of a list column, so
+        that list filters run as vectorized NumPy reductions. It is built once and
+        follows the rows kept by the next filters.
+
+        :param column: The list column.
+        :return: The flattened column.
+        """
+        list_column = self._list_columns.get(column)
+        if list_column is None:
+            list_column = ListColumn.from_sequences(self._column(column).tolist())
+            self._list_columns[column] = list_column
+        return list_column
+
+    def _index_lookup(self, column: str, value: Any, comparison: str) -> np.ndarray:
+        """
+        Find the matching rows with a secondary index of the DataFrame.
+
+        :param column: The column to filter by.
+        :param value: The value to compare against.
+        :param comparison: The type of comparison ('eq', 'lt', 'gt').
+        :return: The positions of the matching rows, or None if the column cannot be indexed.
+        """
+        if isinstance(value, list) or value is None:
+            return None
+        kind = "hash" if comparison == "eq" else "sorted"
+        series = self._base[column]
+        values = series.to_numpy()
+        index = get_frame_index_cache(self._base).get(
+            column,
+            kind,
+            lambda: build_index(series.tolist(), kind),
+            # a column replaced by another array gets a new index
+            fingerprint=(len(values), values.__array_interface__["data"][0]),
+        )
+        if index is None:
+            return None
+        if kind == "hash":
+            positions = index.lookup(value)
+        else:
+            positions = index.range(value, comparison)
+            if positions is None:
+                # the value cannot be compared with the indexed ones, let the scan raise
+                return None
+        if len(self._positions) == len(self._base):
+            return positions
+        # the index covers the original DataFrame, map its rows to the selected ones
+        return np.flatnonzero(np.isin(self._positions, positions))
+
+    def _keep_rows(self, mask: np.ndarray):
+        """
+        Keep the rows selected by the mask, along with their flattened list columns.
+
+        :param mask: The boolean mask over the selected rows.
+        """
+        self._keep_positions(np.flatnonzero(np.asarray(mask, dtype=bool)))
+
+    def _keep_positions(self, positions: np.ndarray):
+        """
+        Keep the rows at the given positions, along with their flattened list columns.
+        Only the selection vector is narrowed, the rows are not copied.
+
+        :param positions: The positions of the rows to keep among the selected rows.
+        """
+        self._positions = self._positions[positions]
+        self._frame = None
+        self._list_columns = {
+            column: list_column.take(positions)
+            for column, list_column in self._list_columns.items()
+        }
 
     def get_filtered_dataframe(self) -> pd.DataFrame:
         """
@@ -130,7 +241,7 @@ class CSVFilter(BaseFilter):
         return f"CSVFilter(dataframe={self.dataframe})"
 
     def __str__(self):
-        return f"CSVFilter with {len(self.dataframe)} rows"
+        return f"CSVFilter with {len(self._positions)} rows"
 
 
 if __name__ == "__main__":
@@ -1,12 +1,28 @@
 from ..models.data_containers.json_data_container import JsonDataContainer
-from typing import Any, List
+from ..models.data_containers.columnar_json_data_container import (
+    ColumnarJsonDataContainer,
+)
+from ..models.data_containers.columns import ListColumn, StringColumn, compare_array
+from ..models.data_containers.json_data_view import JsonDataView
+from typing import Any, Callable, Dict, List, Union
+import numpy as np
 from .base_filter import BaseFilter
+from .predicate import Predicate
 
 
 class JSONFilter(BaseFilter):
 
-    def __init__(self, data_container: JsonDataContainer):
-        self.data_container = data_container
+    def __init__(
+        self,
+        data_container: Union[
+            JsonDataContainer, ColumnarJsonDataContainer, JsonDataView
+        ],
+        use_index: bool = False,
+    ):
+        # the filters narrow a view of the container, the container itself is never modified
+        self.data_container = JsonDataView.of(data_container)
+        # answer filter_by_key with secondary indexes built on the data container
+        self.use_index = use_index
 
     def filter_by_key(self, key: str, value: Any, comparison: str = "eq"):
         """
@@ -19,13 +35,39 @@ class JSONFilter(BaseFilter):
         if comparison not in ["eq", "lt", "gt"]:
             raise ValueError("Comparison must be 'eq', 'lt', or 'gt'")
 
-        filtered_data = []
-        for item in self.data_container.data:
-            item_value = item.item.get(key)
-            if self._compare(item_value, value, comparison):
-                filtered_data.append(item)
+        if self.use_index:
+            positions = self._index_lookup(key, value, comparison)
+            if positions is not None:
+                self._keep_base_positions(positions)
+                return
+
+        if self.data_container.is_columnar:
+            column = self.data_container.column(key)
+            if column is not None:
+                self._keep_rows(column.compare(value, comparison))
+            else:
+                self._keep_rows(
+                    np.full(
+                        len(self.data_container), value is None and comparison == "eq"
+                    )
+                )
+            return
+
+        self._keep_items(lambda item: self._compare(item.get(key), value, comparison))
+
+    def filter_by_predicate(self, predicate: Predicate):
+        """
+        Filter the data container by a predicate expression, evaluating every condition
+        in a single pass over the items.
 
-        self.data_container.data = filtered_data
+        :param predicate: The predicate, e.g. built with predicate.parse_expression.
+        """
+        if self.data_container.is_columnar:
+            columns = self.data_container.to_container(keys=predicate.columns())
+            self._keep_rows(predicate.mask_columnar(columns))
+            return
+
+        self._keep_items(predicate.compile())
 
     def filter_by_string_contains(self, key: str, substring: str):
         """
@@ -34,12 +76,10 @@ class JSONFilter(BaseFilter):
         :param key: The key to filter by.
         :param substring: The substring to check for.
         """
-        filtered_data = [
-            item
-            for item in self.data_container.data
-            if substring in item.item.get(key, "")
-        ]
-        self.data_container.data = filtered_data
+        if self._filter_string_column(key, lambda string: substring in string):
+            return
+
+        self._keep_items(lambda item: substring in item.get(key, ""))
 
     def filter_by_string_startswith(self, key: str, prefix: str):
         """
@@ -48,12 +88,10 @@ class JSONFilter(BaseFilter):
         :param key: The key to filter by.
         :param prefix: The prefix to check for.
         """
-        filtered_data = [
-            item
-            for item in self.data_container.data
-            if item.item.get(key, "").startswith(prefix)
-        ]
-        self.data_container.data = filtered_data
+        if self._filter_string_column(key, lambda string: string.startswith(prefix)):
+            return
+
+        self._keep_items(lambda item: item.get(key, "").startswith(prefix))
 
     def filter_by_string_endswith(self, key: str, suffix: str):
         """
@@ -62,12 +100,10 @@ class JSONFilter(BaseFilter):
         :param key: The key to filter by.
         :param suffix: The suffix to check for.
         """
-        filtered_data = [
-            item
-            for item in self.data_container.data
-            if item.item.get(key, "").endswith(suffix)
-        ]
-        self.data_container.data = filtered_data
+        if self._filter_string_column(key, lambda string: string.endswith(suffix)):
+            return
+
+        self._keep_items(lambda item: item.get(key, "").endswith(suffix))
 
     def filter_by_list_all_elements(self, key: str, elements: List[Any]):
         """
@@ -76,12 +112,14 @@ class JSONFilter(BaseFilter):
         :param key: The key to filter by.
         :param elements: The elements to check for.
         """
-        filtered_data = [
-            item
-            for item in self.data_container.data
-            if all(elem in item.item.get(key, []) for elem in elements)
-        ]
-        self.data_container.data = filtered_data
+        column = self._list_column(key)
+        if column is not None:
+            self._keep_rows(column.contains_all(elements))
+            return
+
+        self._keep_items(
+            lambda item: all(elem in item.get(key, []) for elem in elements)
+        )
 
     def filter_by_list_min(self, key: str, min_value: Any):
         """
@@ -90,12 +128,13 @@ class JSONFilter(BaseFilter):
         :param key: The key to filter by.
         :param min_value: The minimum value to compare against.
         """
-        filtered_data = [
-            item
-            for item in self.data_container.data
-            if min(item.item.get(key, [])) >= min_value
-        ]
-        self.data_container.data = filtered_data
+        column = self._list_column(key, numeric=True)
+        if column is not None:
+            minimums, non_empty = column.reduce(np.minimum)
+            self._keep_rows(non_empty & (minimums >= min_value))
+            return
+
+        self._keep_items(lambda item: min(item.get(key, [])) >= min_value)
 
     def filter_by_list_max(self, key: str, max_value: Any):
         """
@@ -104,12 +143,13 @@ class JSONFilter(BaseFilter):
         :param key: The key to filter by.
         :param max_value: The maximum value to compare against.
         """
-        filtered_data = [
-            item
-            for item in self.data_container.data
-            if max(item.item.get(key, [])) <= max_value
-        ]
-        self.data_container.data = filtered_data
+        column = self._list_column(key, numeric=True)
+        if column is not None:
+            maximums, non_empty = column.reduce(np.maximum)
+            self._keep_rows(non_empty & (maximums <= max_value))
+            return
+
+        self._keep_items(lambda item: max(item.get(key, [])) <= max_value)
 
     def filter_by_list_average(
         self, key: str, avg_value: float, comparison: str = "eq"
@@ -121,15 +161,115 @@ class JSONFilter(BaseFilter):
         :param avg_value: The average value to compare against.
         :param comparison: The type of comparison ('eq', 'lt', 'gt').
         """
-        filtered_data = []
-        for item in self.data_container.data:
-            list_value = item.item.get(key, [])
-            if list_value:
-                avg = sum(list_value) / len(list_value)
-                if self._compare(avg, avg_value, comparison):
-                    filtered_data.append(item)
+        column = self._list_column(key, numeric=True)
+        if column is not None:
+            averages, non_empty = column.mean()
+            self._keep_rows(non_empty & compare_array(averages, avg_value, comparison))
+            return
+
+        def matches(item):
+            list_value = item.get(key, [])
+            if not list_value:
+                return False
+            avg = sum(list_value) / len(list_value)
+            return self._compare(avg, avg_value, comparison)
+
+        self._keep_items(matches)
+
+    def _keep_rows(self, mask: np.ndarray):
+        """
+        Narrow the view to the rows selected by the mask.
+
+        :param mask: The boolean mask over the rows of the view.
+        """
+        self.data_container = self.data_container.select(np.flatnonzero(mask))
+
+    def _keep_items(self, predicate: Callable[[Dict[str, Any]], bool]):
+        """
+        Narrow the view to the items matching the predicate, evaluated item by item.
+
+        :param predicate: The predicate to evaluate on the item dicts.
+        """
+        view = self.data_container
+        self._keep_rows(
+            np.fromiter(
+                (bool(predicate(item)) for item in view.items()),
+                dtype=bool,
+                count=len(view),
+            )
+        )
+
+    def _keep_base_positions(self, positions: np.ndarray):
+        """
+        Narrow the view to the rows found at the given positions of the base container.
+
+        :param positions: The positions of the rows in the base container, in ascending order.
+        """
+        view = self.data_container
+        if view.is_full:
+            self.data_container = view.select(positions)
+        else:
+            self._keep_rows(np.isin(view.indices, positions))
+
+    def _index_lookup(self, key: str, value: Any, comparison: str) -> np.ndarray:
+        """
+        Find the matching rows with a secondary index of the data container.
+
+        :param key: The key to filter by.
+        :param value: The value to compare against.
+        :param comparison: The type of comparison ('eq', 'lt', 'gt').
+        :return: The positions of the matching rows, or None if the key cannot be indexed.
+        """
+        if isinstance(value, list):
+            value = len(value)
+        if comparison == "eq":
+            index = self.data_container.base.get_index(key, "hash")
+            return index.lookup(value) if index is not None else None
+        index = self.data_container.base.get_index(key, "sorted")
+        if index is None or value is None:
+            return None
+        return index.range(value, comparison)
+
+    def _list_column(self, key: str, numeric: bool = False) -> ListColumn:
+        """
+        Get the list column of a columnar data container, if the vectorized list filters apply.
 
-        self.data_container.data = filtered_data
+        :param key: The key of the column.
+        :param numeric: Whether the list elements must be numeric.
+        :return: The list column, or None to use the item by item filters.
+        """
+        if not self.data_container.is_columnar:
+            return None
+        column = self.data_container.base.columns.get(key)
+        if not isinstance(column, ListColumn):
+            return None
+        if numeric and not column.is_numeric():
+            return None
+        return self.data_container.column(key)
+
+    def _filter_string_column(self, key: str, predicate: Callable[[str], bool]) -> bool:
+        """
+        Filter a str column of a columnar data container, evaluating the predicate once
+        per distinct string. Missing values are treated as "".
+
+        :param key: The key to filter by.
+        :param predicate: The predicate to evaluate on the string values.
+        :return: False if the item by item filters must be used instead.
+        """
+        if not self.data_container.is_columnar:
+            return False
+        column = self.data_container.base.columns.get(key)
+        if column is None:
+            self._keep_rows(np.full(len(self.data_container), predicate("")))
+            return True
+        if not isinstance(column, StringColumn):
+            return False
+        column = self.data_container.column(key)
+        mask = column.match(predicate)
+        if predicate(""):
+            mask |= ~column.present
+        self._keep_rows(mask)
+        return True
 
     def _compare(self, item_value: Any, value: Any, comparison: str) -> bool:
         """
@@ -138,8 +278,11 @@ class JSONFilter(BaseFilter):
         :param item_value: The value from the item.
         :param value: The value to compare against.
         :param comparison: The type of comparison ('eq', 'lt', 'gt').
-        :return: The result of the comparison.
+        :return: The result of the comparison, False for lt and gt when the item does
+            not hold the key, as in the columnar path.
         """
+        if item_value is None and comparison != "eq":
+            return False
         if isinstance(item_value, list):
             item_value = len(item_value)
         if isinstance(value, list):
@@ -152,11 +295,12 @@ class JSONFilter(BaseFilter):
         elif comparison == "gt":
             return item_value > value
 
-    def get_filtered_data(self) -> JsonDataContainer:
+    def get_filtered_data(self) -> JsonDataView:
         """
-        Get the filtered data container.
+        Get the filtered data, as a view over the rows of the original data container.
+        Use JsonDataView.to_container to materialize it.
 
-        :return: The filtered JsonDataContainer.
+        :return: The filtered JsonDataView.
         """
         return self.data_container
 
@@ -0,0 +1,517 @@
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+import operator, re
+import numpy as np
+import pandas as pd
+from ..models.data_containers.columnar_json_data_container import (
+    ColumnarJsonDataContainer,
+)
+from ..models.data_containers.columns import (
+    Column,
+    ListColumn,
+    StringColumn,
+    compare_array,
+)
+
+"""
+Predicate expressions combining filter conditions with and/or/not.
+
+A predicate is compiled once, then evaluated in a single pass over JSON items, or as
+one combined boolean mask over a DataFrame or a columnar JSON container.
+"""
+
+
+COMPARISONS = {"eq": operator.eq, "lt": operator.lt, "gt": operator.gt}
+
+OPERATORS = {
+    "eq",
+    "lt",
+    "gt",
+    "contains",
+    "startswith",
+    "endswith",
+    "has_all",
+    "list_min",
+    "list_max",
+    "avg_eq",
+    "avg_lt",
+    "avg_gt",
+}
+
+OPERATOR_ALIASES = {"=": "eq", "==": "eq", "<": "lt", ">": "gt"}
+
+STRING_OPERATORS = {"contains", "startswith", "endswith"}
+
+
+def parse_value(raw: str):
+    """
+    Convert a command line value to an integer, float, or boolean when possible.
+
+    Args:
+        raw (str): The value as typed by the user.
+
+    Returns:
+        The converted value, or the original string.
+    """
+    try:
+        return int(raw)
+    except ValueError:
+        try:
+            return float(raw)
+        except ValueError:
+            if raw.lower() == "true":
+                return True
+            elif raw.lower() == "false":
+                return False
+            return raw
+
+
+class Predicate(ABC):
+    """
+    Base class of the predicate expression nodes. Predicates combine with &, | and ~.
+    """
+
+    @abstractmethod
+    def compile(self) -> Callable[[Dict[str, Any]], bool]:
+        """
+        Compile the predicate into a function evaluating one JSON item dict.
+
+        :return: The compiled function.
+        """
+        pass
+
+    @abstractmethod
+    def mask(self, dataframe: pd.DataFrame) -> np.ndarray:
+        """
+        Evaluate the predicate over a DataFrame.
+
+        :param dataframe: The DataFrame to evaluate.
+        :return: The boolean mask of the matching rows.
+        """
+        pass
+
+    @abstractmethod
+    def mask_columnar(self, data_container: ColumnarJsonDataContainer) -> np.ndarray:
+        """
+        Evaluate the predicate over the columns of a columnar JSON container.
+
+        :param data_container: The container to evaluate.
+        :return: The boolean mask of the matching rows.
+        """
+        pass
+
+    @abstractmethod
+    def columns(self) -> Set[str]:
+        """
+        Get the columns/keys the predicate reads.
+
+        :return: The set of column names.
+        """
+        pass
+
+    @abstractmethod
+    def may_match(
+        self,
+        ranges: Dict[str, Tuple[Any, Any]],
+        null_counts: Dict[str, int] = None,
+    ) -> bool:
+        """
+        Decide, without reading the rows, whether some rows of a group, e.g. a file, may
+        match the predicate, knowing the (min, max) range of the values of some columns
+        in the group. Columns without a range can hold anything.
+
+        :param ranges: The (min, max) range of the non-missing values of each known
+            column, min equal to max for a column holding a single value.
+        :param null_counts: The number of missing values of the known columns. A column
+            without a count may have missing values, e.g. when it is absent from the
+            rows, and a missing value may match a negated condition.
+        :return: False only if no row of the group can match.
+        """
+        pass
+
+    def __and__(self, other: "Predicate") -> "Predicate":
+        return And(self, other)
+
+    def __or__(self, other: "Predicate") -> "Predicate":
+        return Or(self, other)
+
+    def __invert__(self) -> "Predicate":
+        return Not(self)
+
+
+class Condition(Predicate):
+    """
+    A single condition `column operator value`, with the semantics of the matching
+    JSONFilter/CSVFilter method.
+    """
+
+    def __init__(self, column: str, op: str, value: Any):
+        op = OPERATOR_ALIASES.get(op, op)
+        if op not in OPERATORS:
+            raise ValueError(
+                f"Unknown operator: {op}. Expected one of {', '.join(sorted(OPERATORS))}"
+            )
+        if op in STRING_OPERATORS and not isinstance(value, str):
+            raise ValueError(
+                f"The value of {op} must be a string, got {value!r}. Quote it, e.g. "
+                f'{column} {op} "{value}"'
+            )
+        if op == "has_all" and not isinstance(value, list):
+            value = [value]
+        self.column = column
+        self.op = op
+        self.value = value
+
+    def compile(self) -> Callable[[Dict[str, Any]], bool]:
+        key, value = self.column, self.value
+        if self.op in COMPARISONS:
+            compare = COMPARISONS[self.op]
+            value = len(value) if isinstance(value, list) else value
+
+            def evaluate(item):
+                item_value = item.get(key)
+                if item_value is None:
+                    # missing keys only match eq None, as in Column.compare
+                    return self.op == "eq" and value is None
+                if isinstance(item_value, list):
+                    item_value = len(item_value)
+                return compare(item_value, value)
+
+            return evaluate
+        if self.op == "contains":
+            return lambda item: value in item.get(key, "")
+        if self.op == "startswith":
+            return lambda item: item.get(key, "").startswith(value)
+        if self.op == "endswith":
+            return lambda item: item.get(key, "").endswith(value)
+        if self.op == "has_all":
+            return lambda item: all(elem in item.get(key, []) for elem in value)
+        if self.op == "list_min":
+            return lambda item: bool(item.get(key)) and min(item[key]) >= value
+        if self.op == "list_max":
+            return lambda item: bool(item.get(key)) and max(item[key]) <= value
+        compare = COMPARISONS[self.op[len("avg_") :]]
+        return lambda item: bool(item.get(key)) and compare(
+            sum(item[key]) / len(item[key]), value
+        )
+
+    def mask(self, dataframe: pd.DataFrame) -> np.ndarray:
+        series = dataframe[self.column]
+        if self.op in COMPARISONS:
+            return np.asarray(COMPARISONS[self.op](series, self.value), dtype=bool)
+        if self.op == "contains":
+            return series.str.contains(self.value, na=False).to_numpy(dtype=bool)
+        if self.op == "startswith":
+            return series.str.startswith(self.value, na=False).to_numpy(dtype=bool)
+        if self.op == "endswith":
+            return series.str.endswith(self.value, na=False).to_numpy(dtype=bool)
+        return self._list_mask(ListColumn.from_sequences(series.tolist()))
+
+    def mask_columnar(self, data_container: ColumnarJsonDataContainer) -> np.ndarray:
+        column = data_container.columns.get(self.column)
+        mask = self._column_mask(column) if column is not None else None
+        if mask is None:
+            evaluate = self.compile()
+            mask = np.fromiter(
+                (evaluate(data_container[i]) for i in range(len(data_container))),
+                dtype=bool,
+                count=len(data_container),
+            )
+        return mask
+
+    def _column_mask(self, column: Column) -> np.ndarray:
+        """
+        Evaluate the condition with NumPy over a typed column.
+
+        :param column: The column to evaluate.
+        :return: The boolean mask, or None when the column type has no vectorized path.
+        """
+        if self.op in COMPARISONS:
+            return column.compare(self.value, self.op)
+        if self.op in STRING_OPERATORS:
+            if not isinstance(column, StringColumn):
+                return None
+            predicate = {
+                "contains": lambda string: self.value in string,
+                "startswith": lambda string: string.startswith(self.value),
+                "endswith": lambda string: string.endswith(self.value),
+            }[self.op]
+            mask = column.match(predicate)
+            if predicate(""):
+                mask |= ~column.present
+            return mask
+        if not isinstance(column, ListColumn):
+            return None
+        if self.op != "has_all" and not column.is_numeric():
+            return None
+        return self._list_mask(column)
+
+    def _list_mask(self, column: ListColumn) -> np.ndarray:
+        """
+        Evaluate a list operator over a flattened list column.
+
+        :param column: The list column.
+        :return: The boolean mask of the matching rows.
+        """
+        if self.op == "has_all":
+            return column.contains_all(self.value)
+        if self.op == "list_min":
+            minimums, non_empty = column.reduce(np.minimum)
+            return non_empty & (minimums >= self.value)
+        if self.op == "list_max":
+            maximums, non_empty = column.reduce(np.maximum)
+            return non_empty & (maximums <= self.value)
+        averages, non_empty = column.mean()
+        return non_empty & compare_array(averages, self.value, self.op[len("avg_") :])
+
+    def columns(self) -> Set[str]:
+        return {self.column}
+
+    def may_match(
+        self,
+        ranges: Dict[str, Tuple[Any, Any]],
+        null_counts: Dict[str, int] = None,
+    ) -> bool:
+        if self.column not in ranges:
+            return True
+        low, high = ranges[self.column]
+        try:
+            if self.op in COMPARISONS and not isinstance(self.value, list):
+                if self.value is None:
+                    return True
+                if self.op == "eq":
+                    return low <= self.value <= high
+                if self.op == "lt":
+                    return low < self.value
+                return high > self.value
+            if low == high and _has_no_nulls(self.column, null_counts):
+                # a single value, evaluated exactly. Missing values, e.g. "" for
+                # "contains", may match the string and list operators
+                return self.compile()({self.column: low})
+        except TypeError:
+            # values of different types, left to the filter
+            pass
+        return True
+
+    def __repr__(self):
+        return f"Condition({self.column!r} {self.op} {self.value!r})"
+
+
+class And(Predicate):
+    """
+    Matches when every operand matches.
+    """
+
+    def __init__(self, *operands: Predicate):
+        self.operands = operands
+
+    def compile(self) -> Callable[[Dict[str, Any]], bool]:
+        compiled = [operand.compile() for operand in self.operands]
+        return lambda item: all(evaluate(item) for evaluate in compiled)
+
+    def mask(self, dataframe: pd.DataFrame) -> np.ndarray:
+        return np.logical_and.reduce([op.mask(dataframe) for op in self.operands])
+
+    def mask_columnar(self, data_container: ColumnarJsonDataContainer) -> np.ndarray:
+        return np.logical_and.reduce(
+            [op.mask_columnar(data_container) for op in self.operands]
+        )
+
+    def columns(self) -> Set[str]:
+        return set().union(*(operand.columns() for operand in self.operands))
+
+    def may_match(
+        self,
+        ranges: Dict[str, Tuple[Any, Any]],
+        null_counts: Dict[str, int] = None,
+    ) -> bool:
+        return all(operand.may_match(ranges, null_counts) for operand in self.operands)
+
+    def __repr__(self):
+        return f"And{self.operands!r}"
+
+
+class Or(Predicate):
+    """
+    Matches when any operand matches.
+    """
+
+    def __init__(self, *operands: Predicate):
+        self.operands = operands
+
+    def compile(self) -> Callable[[Dict[str, Any]], bool]:
+        compiled = [operand.compile() for operand in self.operands]
+        return lambda item: any(evaluate(item) for evaluate in compiled)
+
+    def mask(self, dataframe: pd.DataFrame) -> np.ndarray:
+        return np.logical_or.reduce([op.mask(dataframe) for op in self.operands])
+
+    def mask_columnar(self, data_container: ColumnarJsonDataContainer) -> np.ndarray:
+        return np.logical_or.reduce(
+            [op.mask_columnar(data_container) for op in self.operands]
+        )
+
+    def columns(self) -> Set[str]:
+        return set().union(*(operand.columns() for operand in self.operands))
+
+    def may_match(
+        self,
+        ranges: Dict[str, Tuple[Any, Any]],
+        null_counts: Dict[str, int] = None,
+    ) -> bool:
+        return any(operand.may_match(ranges, null_counts) for operand in self.operands)
+
+    def __repr__(self):
+        return f"Or{self.operands!r}"
+
+
+class Not(Predicate):
+    """
+    Matches when the operand does not match.
+    """
+
+    def __init__(self, operand: Predicate):
+        self.operand = operand
+
+    def compile(self) -> Callable[[Dict[str, Any]], bool]:
+        evaluate = self.operand.compile()
+        return lambda item: not evaluate(item)
+
+    def mask(self, dataframe: pd.DataFrame) -> np.ndarray:
+        return ~self.operand.mask(dataframe)
+
+    def mask_columnar(self, data_container: ColumnarJsonDataContainer) -> np.ndarray:
+        return ~self.operand.mask_columnar(data_container)
+
+    def columns(self) -> Set[str]:
+        return self.operand.columns()
+
+    def may_match(
+        self,
+        ranges: Dict[str, Tuple[Any, Any]],
+        null_counts: Dict[str, int] = None,
+    ) -> bool:
+        # only a group holding a single known value and no missing value in every
+        # column read by the operand can be excluded: a missing value does not match
+        # the operand, so it matches the negation
+        item = {}
+        for column in self.operand.columns():
+            low, high = ranges.get(column, (None, None))
+            if low is None or low != high or not _has_no_nulls(column, null_counts):
+                return True
+            item[column] = low
+        try:
+            return not self.operand.compile()(item)
+        except TypeError:
+            return True
+
+    def __repr__(self):
+        return f"Not({self.operand!r})"
+
+
+def _has_no_nulls(column: str, null_counts: Optional[Dict[str, int]]) -> bool:
+    """
+    Whether a column is known to have no missing value in a group.
+    """
+    return null_counts is not None and null_counts.get(column, 1) == 0
+
+
+_TOKEN = re.compile(
+    r"""\s*(?:(?P<paren>[()])|(?P<quoted>"[^"]*"|'[^']*')|(?P<list>\[[^\]]*\])|(?P<word>[^\s()]+))"""
+)
+
+
+def _parse_literal(token: str) -> Any:
+    """
+    Convert a value token: quoted strings are kept as is, lists are split on commas.
+    """
+    if token[0] in "\"'":
+        return token[1:-1]
+    if token.startswith("["):
+        inner = token[1:-1].strip()
+        if not inner:
+            return []
+        return [_parse_literal(part.strip()) for part in inner.split(",")]
+    return parse_value(token)
+
+
+def parse_expression(expression: str) -> Predicate:
+    """
+    Parse a filter expression into a predicate.
+
+    The grammar is `condition (and|or condition)*` where conditions can be negated with
+    `not` and grouped with parentheses, and a condition is `column operator value`, e.g.
+    `field2 gt 5 and not (field1 eq "value 2" or field5 has_all [2,3])`.
+
+    :param expression: The expression to parse.
+    :return: The compiled predicate.
+    """
+    tokens = []
+    position = 0
+    expression = expression.strip()
+    while position < len(expression):
+        match = _TOKEN.match(expression, position)
+        if match is None:
+            raise ValueError(f"Invalid expression at: {expression[position:]}")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        position = match.end()
+
+    def peek(offset=0):
+        index = cursor[0] + offset
+        return tokens[index] if index < len(tokens) else (None, None)
+
+    def take():
+        token = peek()
+        if token[0] is None:
+            raise ValueError("Unexpected end of expression")
+        cursor[0] += 1
+        return token
+
+    def keyword(word):
+        kind, text = peek()
+        return kind == "word" and text.lower() == word
+
+    def parse_or():
+        operands = [parse_and()]
+        while keyword("or"):
+            take()
+            operands.append(parse_and())
+        return operands[0] if len(operands) == 1 else Or(*operands)
+
+    def parse_and():
+        operands = [parse_not()]
+        while keyword("and"):
+            take()
+            operands.append(parse_not())
+        return operands[0] if len(operands) == 1 else And(*operands)
+
+    def parse_not():
+        if keyword("not"):
+            take()
+            return Not(parse_not())
+        if peek() == ("paren", "("):
+            take()
+            predicate = parse_or()
+            if take() != ("paren", ")"):
+                raise ValueError("Expected ')'")
+            return predicate
+        _, column = take()
+        kind, op = take()
+        if kind != "word":
+            raise ValueError(f"Expected an operator after {column}")
+        kind, value = take()
+        if kind == "paren":
+            raise ValueError(f"Expected a value after {column} {op}")
+        if column[0] in "\"'":
+            column = column[1:-1]
+        if kind == "word" and OPERATOR_ALIASES.get(op, op) in STRING_OPERATORS:
+            # the string operators take the unquoted token as is, e.g. contains 3
+            return Condition(column, op, value)
+        return Condition(column, op, _parse_literal(value))
+
+    cursor = [0]
+    predicate = parse_or()
+    if cursor[0] != len(tokens):
+        raise ValueError(f"Unexpected token: {tokens[cursor[0]][1]}")
+    return predicate
@@ -1,6 +1,9 @@
-from . import create_cli
-
+import sys
+from . import create_cli, run_cli
 
 if __name__ == "__main__":
 
+    if len(sys.argv) > 1:
+        # non-interactive mode, e.g. `run data.json --sort field2 --out sorted.json`
+        sys.exit(run_cli(sys.argv[1:]))
     create_cli()
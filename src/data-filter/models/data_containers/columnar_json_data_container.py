@@ -0,0 +1,176 @@
+from pydantic import BaseModel, ConfigDict, PrivateAttr
+from typing import Any, Dict, Iterable, List
+import numpy as np
+from ..index import IndexCache, build_index
+from .columns import Column, MISSING, build_column, concat_columns
+from .json_data_container import JsonDataContainer, JsonDataItem
+
+
+class ColumnarJsonDataContainer(BaseModel):
+    """
+    Class to represent JSON data items column by column.
+
+    Every key is stored in a typed column (see columns.py): NumPy arrays for numeric and
+    bool keys, offsets plus values arrays for list keys and dictionary encoded arrays for
+    str keys. Rows are rebuilt as dicts on access, so the container can be used wherever
+    a JsonDataContainer is expected, while filters, sorters and stats work on the columns.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    length: int
+    columns: Dict[str, Column]
+    _indexes: IndexCache = PrivateAttr(default_factory=IndexCache)
+
+    @classmethod
+    def from_records(
+        cls, records: Iterable[Dict[str, Any]], keys: Iterable[str] = None
+    ) -> "ColumnarJsonDataContainer":
+        """
+        Build the container from an iterable of record dicts.
+
+        :param records: The records, e.g. the `item` dicts of JsonDataItem objects.
+        :param keys: Only build the columns of these keys, all keys if None.
+        :return: The columnar container.
+        """
+        keys = set(keys) if keys is not None else None
+        values: Dict[str, List[Any]] = {}
+        length = 0
+        for record in records:
+            for key, value in record.items():
+                if keys is not None and key not in keys:
+                    continue
+                column = values.get(key)
+                if column is None:
+                    column = values[key] = [MISSING] * length
+                column.append(value)
+            length += 1
+            for column in values.values():
+                if len(column) < length:
+                    column.append(MISSING)
+        return cls(
+            length=length,
+            columns={key: build_column(column) for key, column in values.items()},
+        )
+
+    @classmethod
+    def concat(
+        cls, containers: List["ColumnarJsonDataContainer"]
+    ) -> "ColumnarJsonDataContainer":
+        """
+        Concatenate the rows of several containers, e.g. the partitions of a dataset
+        processed separately. Keys missing from some containers are missing in their rows.
+
+        :param containers: The containers, in row order.
+        :return: The columnar container holding every row.
+        """
+        lengths = [container.length for container in containers]
+        keys = {}
+        for container in containers:
+            keys.update(dict.fromkeys(container.columns))
+        return cls(
+            length=sum(lengths),
+            columns={
+                key: concat_columns(
+                    [container.columns.get(key) for container in containers], lengths
+                )
+                for key in keys
+            },
+        )
+
+    @classmethod
+    def from_json_container(
+        cls, data_container: JsonDataContainer
+    ) -> "ColumnarJsonDataContainer":
+        """
+        Build the container from a JsonDataContainer.
+
+        :param data_container: The container to convert.
+        :return: The columnar container.
+        """
+        return cls.from_records(item.item for item in data_container.data)
+
+    def to_json_container(self) -> JsonDataContainer:
+        """
+        Convert the container back to a JsonDataContainer.
+
+        :return: The JsonDataContainer holding the same records.
+        """
+        return JsonDataContainer.model_construct(data=self.data)
+
+    def take(self, indices: np.ndarray) -> "ColumnarJsonDataContainer":
+        """
+        Build a new container holding the given rows, in the given order.
+
+        :param indices: The positions of the rows to keep.
+        :return: The new container.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        return ColumnarJsonDataContainer(
+            length=len(indices),
+            columns={key: column.take(indices) for key, column in self.columns.items()},
+        )
+
+    def get_index(self, key: str, kind: str):
+        """
+        Get a secondary index over a key, built on first use.
+
+        :param key: The indexed key.
+        :param kind: 'hash' for eq lookups, 'sorted' for lt/gt lookups.
+        :return: The index, or None if the values of the key cannot be indexed.
+        """
+        column = self.columns.get(key)
+        if column is None:
+            return None
+        return self._indexes.get(
+            key, kind, lambda: build_index(column.to_list(), kind), fingerprint=column
+        )
+
+    def invalidate_indexes(self):
+        """
+        Drop the secondary indexes, called whenever the columns change.
+        """
+        self._indexes.clear()
+
+    def __setattr__(self, name: str, value: Any):
+        if name in ("length", "columns"):
+            self.invalidate_indexes()
+        super().__setattr__(name, value)
+
+    @property
+    def data(self) -> List[JsonDataItem]:
+        """
+        The rows as JsonDataItem objects, built on access.
+        """
+        return [JsonDataItem.model_construct(item=self[i]) for i in range(self.length)]
+
+    @data.setter
+    def data(self, items: List[JsonDataItem]):
+        rebuilt = ColumnarJsonDataContainer.from_records(item.item for item in items)
+        self.length = rebuilt.length
+        self.columns = rebuilt.columns
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        """
+        Method to get the i-th record using the [] notation.
+
+        :param index: The index of the record to retrieve.
+        :return: The record at the specified index.
+        """
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("index out of range")
+        return {
+            key: column.get(index)
+            for key, column in self.columns.items()
+            if column.present[index]
+        }
+
+    def __len__(self):
+        """
+        Method to get the length of the data container.
+
+        :return: The length of the data container.
+        """
+        return self.length
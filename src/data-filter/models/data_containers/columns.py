@@ -0,0 +1,468 @@
+from abc import ABC, abstractmethod
+from itertools import chain
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+import operator, sys
+import numpy as np
+
+"""
+Typed columns backing the ColumnarJsonDataContainer.
+
+Every column keeps a `present` mask telling which rows actually hold the key, so
+records with missing keys round-trip unchanged.
+"""
+
+
+MISSING = object()
+
+_OPERATORS = {"eq": operator.eq, "lt": operator.lt, "gt": operator.gt}
+
+
+def _as_comparable(value: Any) -> Any:
+    """
+    Lists are compared by their length, as in JSONFilter._compare.
+    """
+    return len(value) if isinstance(value, list) else value
+
+
+def compare_array(values: np.ndarray, value: Any, comparison: str) -> np.ndarray:
+    """
+    Compare an array against a scalar value.
+
+    :param values: The array to compare.
+    :param value: The value to compare against.
+    :param comparison: The type of comparison ('eq', 'lt', 'gt').
+    :return: The boolean mask of the comparison.
+    """
+    if comparison not in _OPERATORS:
+        raise ValueError("Comparison must be 'eq', 'lt', or 'gt'")
+    if comparison == "eq" and isinstance(value, str) and values.dtype != object:
+        return np.zeros(len(values), dtype=bool)
+    return np.asarray(_OPERATORS[comparison](values, value), dtype=bool)
+
+
+def infer_array(values: List[Any]) -> np.ndarray:
+    """
+    Build the narrowest NumPy array able to hold the given Python values.
+
+    bool values become a bool array, int values an int64 array, float values a float64
+    array, anything else an object array. Mixed int and float values are kept in an
+    object array: a float64 array would return 1 as 1.0 and round ints above 2**53.
+
+    :param values: The values to convert.
+    :return: The typed array.
+    """
+    types = set(map(type, values))
+    try:
+        if types == {bool}:
+            return np.array(values, dtype=bool)
+        if types == {int}:
+            return np.array(values, dtype=np.int64)
+        if types == {float}:
+            return np.array(values, dtype=np.float64)
+    except OverflowError:
+        pass
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+class Column(ABC):
+    """
+    Base class for a typed column.
+    """
+
+    def __init__(self, present: np.ndarray):
+        self.present = present
+
+    def __len__(self):
+        return len(self.present)
+
+    @abstractmethod
+    def get(self, index: int) -> Any:
+        """
+        Get the Python value stored at the given row. The row must be present.
+
+        :param index: The row to read.
+        :return: The value at the given row.
+        """
+        pass
+
+    @abstractmethod
+    def take(self, indices: np.ndarray) -> "Column":
+        """
+        Build a new column holding the given rows, in the given order.
+
+        :param indices: The positions of the rows to keep.
+        :return: The new column.
+        """
+        pass
+
+    @abstractmethod
+    def _compare_present(self, value: Any, comparison: str) -> np.ndarray:
+        pass
+
+    def compare(self, value: Any, comparison: str = "eq") -> np.ndarray:
+        """
+        Compare every row against a value, with the semantics of JSONFilter._compare.
+        Missing rows only match an equality test against None.
+
+        :param value: The value to compare against.
+        :param comparison: The type of comparison ('eq', 'lt', 'gt').
+        :return: The boolean mask of the matching rows.
+        """
+        if comparison not in ["eq", "lt", "gt"]:
+            raise ValueError("Comparison must be 'eq', 'lt', or 'gt'")
+        if value is None and comparison == "eq":
+            return ~self.present
+        return self._compare_present(_as_comparable(value), comparison) & self.present
+
+    def sort_keys(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Get the keys used to sort the rows, with the semantics of JsonSorter._get_sort_key.
+
+        :return: The sort keys and the mask of the rows having one, or None if the
+            column cannot be sorted with NumPy.
+        """
+        return None
+
+    def to_list(self) -> List[Any]:
+        """
+        Get the Python values of the column, None for missing rows.
+
+        :return: The list of values.
+        """
+        return [self.get(i) if self.present[i] else None for i in range(len(self))]
+
+    def __repr__(self):
+        return f"{type(self).__name__}(rows={len(self)})"
+
+
+class NumericColumn(Column):
+    """
+    Column of int64 or float64 values.
+    """
+
+    def __init__(self, values: np.ndarray, present: np.ndarray):
+        super().__init__(present)
+        self.values = values
+
+    def get(self, index: int) -> Any:
+        return self.values[index].item()
+
+    def take(self, indices: np.ndarray) -> "NumericColumn":
+        return NumericColumn(self.values[indices], self.present[indices])
+
+    def _compare_present(self, value: Any, comparison: str) -> np.ndarray:
+        return compare_array(self.values, value, comparison)
+
+    def sort_keys(self) -> Tuple[np.ndarray, np.ndarray]:
+        return self.values, self.present
+
+
+class BoolColumn(NumericColumn):
+    """
+    Column of bool values.
+    """
+
+    def take(self, indices: np.ndarray) -> "BoolColumn":
+        return BoolColumn(self.values[indices], self.present[indices])
+
+    def sort_keys(self) -> Tuple[np.ndarray, np.ndarray]:
+        return self.values.astype(np.int8), self.present
+
+
+class StringColumn(Column):
+    """
+    Dictionary encoded column of str values: every distinct string is interned once in
+    `categories` and rows store its code. Missing rows have the code -1.
+    """
+
+    def __init__(self, codes: np.ndarray, categories: np.ndarray):
+        super().__init__(codes >= 0)
+        self.codes = codes
+        self.categories = categories
+        self._lookup = None
+
+    @classmethod
+    def from_values(cls, values: List[Any]) -> "StringColumn":
+        """
+        Build the column from a list of str values, MISSING for missing rows.
+
+        :param values: The values of the column.
+        :return: The new column.
+        """
+        lookup = {}
+        codes = np.fromiter(
+            (
+                -1 if value is MISSING else lookup.setdefault(value, len(lookup))
+                for value in values
+            ),
+            dtype=np.int32,
+            count=len(values),
+        )
+        categories = np.empty(len(lookup), dtype=object)
+        categories[:] = [sys.intern(value) for value in lookup]
+        return cls(codes, categories)
+
+    def get(self, index: int) -> str:
+        return self.categories[self.codes[index]]
+
+    def take(self, indices: np.ndarray) -> "StringColumn":
+        return StringColumn(self.codes[indices], self.categories)
+
+    def match(self, predicate: Callable[[str], bool]) -> np.ndarray:
+        """
+        Evaluate a predicate once per distinct string and broadcast it to the rows.
+
+        :param predicate: The predicate to evaluate.
+        :return: The boolean mask of the matching rows.
+        """
+        matches = np.fromiter(
+            map(predicate, self.categories), dtype=bool, count=len(self.categories)
+        )
+        # append a False entry so that the -1 code of missing rows maps to it
+        return np.append(matches, False)[self.codes]
+
+    def _compare_present(self, value: Any, comparison: str) -> np.ndarray:
+        if comparison == "eq":
+            if self._lookup is None:
+                self._lookup = {
+                    category: code for code, category in enumerate(self.categories)
+                }
+            code = self._lookup.get(value) if isinstance(value, str) else None
+            if code is None:
+                return np.zeros(len(self), dtype=bool)
+            return self.codes == code
+        return np.append(compare_array(self.categories, value, comparison), False)[
+            self.codes
+        ]
+
+    def sort_keys(self) -> Tuple[np.ndarray, np.ndarray]:
+        ranks = np.empty(len(self.categories), dtype=np.int64)
+        ranks[np.argsort(self.categories.astype(str), kind="stable")] = np.arange(
+            len(self.categories)
+        )
+        return np.append(ranks, -1)[self.codes], self.present
+
+
+class ListColumn(Column):
+    """
+    Column of lists stored as a flat `values` array plus row `offsets`: the list of row
+    i is values[offsets[i]:offsets[i + 1]].
+    """
+
+    def __init__(self, offsets: np.ndarray, values: np.ndarray, present: np.ndarray):
+        super().__init__(present)
+        self.offsets = offsets
+        self.values = values
+
+    @classmethod
+    def from_sequences(
+        cls, sequences: Iterable[Any], present: np.ndarray = None
+    ) -> "ListColumn":
+        """
+        Build the column from a sequence of lists, MISSING for missing rows.
+
+        :param sequences: The lists of the column.
+        :param present: The mask of the present rows, inferred from MISSING if None.
+        :return: The new column.
+        """
+        sequences = [[] if seq is MISSING else seq for seq in sequences]
+        if present is None:
+            present = np.ones(len(sequences), dtype=bool)
+        offsets = np.zeros(len(sequences) + 1, dtype=np.int64)
+        np.cumsum(
+            np.fromiter(map(len, sequences), dtype=np.int64, count=len(sequences)),
+            out=offsets[1:],
+        )
+        values = infer_array(list(chain.from_iterable(sequences)))
+        return cls(offsets, values, present)
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def get(self, index: int) -> List[Any]:
+        return self.values[self.offsets[index] : self.offsets[index + 1]].tolist()
+
+    def take(self, indices: np.ndarray) -> "ListColumn":
+        starts = self.offsets[:-1][indices]
+        lengths = self.lengths[indices]
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        positions = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])
+        return ListColumn(offsets, self.values[positions], self.present[indices])
+
+    def is_numeric(self) -> bool:
+        """
+        Whether the elements of the lists are all bools, all ints or all floats.
+        """
+        return self.values.dtype != object or len(self.values) == 0
+
+    def reduce(self, ufunc: np.ufunc) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Reduce every non empty list with a NumPy ufunc, e.g. np.minimum or np.add.
+
+        :param ufunc: The ufunc to reduce with.
+        :return: The reduced value of each row and the mask of the non empty rows.
+        """
+        lengths = self.lengths
+        non_empty = lengths > 0
+        result = np.zeros(len(self), dtype=self.values.dtype)
+        if non_empty.any():
+            result[non_empty] = ufunc.reduceat(
+                self.values, self.offsets[:-1][non_empty]
+            )
+        return result, non_empty
+
+    def mean(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Average every non empty list.
+
+        :return: The average of each row and the mask of the non empty rows.
+        """
+        totals, non_empty = self.reduce(np.add)
+        lengths = self.lengths
+        means = np.zeros(len(self), dtype=np.float64)
+        means[non_empty] = totals[non_empty] / lengths[non_empty]
+        return means, non_empty
+
+    def contains_all(self, elements: List[Any]) -> np.ndarray:
+        """
+        Check which lists contain every element.
+
+        :param elements: The elements to look for.
+        :return: The boolean mask of the matching rows.
+        """
+        result = np.ones(len(self), dtype=bool)
+        non_empty = self.lengths > 0
+        starts = self.offsets[:-1][non_empty]
+        for element in elements:
+            hits = np.asarray(self.values == element, dtype=np.int64)
+            found = np.zeros(len(self), dtype=bool)
+            if len(starts):
+                found[non_empty] = np.add.reduceat(hits, starts) > 0
+            result &= found
+        return result
+
+    def _compare_present(self, value: Any, comparison: str) -> np.ndarray:
+        return compare_array(self.lengths, value, comparison)
+
+    def sort_keys(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        if self.values.dtype == object:
+            return None
+        non_empty = self.lengths > 0
+        firsts = np.zeros(len(self), dtype=self.values.dtype)
+        firsts[non_empty] = self.values[self.offsets[:-1][non_empty]]
+        return firsts, self.present & non_empty
+
+
+class ObjectColumn(Column):
+    """
+    Fallback column of Python objects, used for keys holding mixed types.
+    """
+
+    def __init__(self, values: np.ndarray, present: np.ndarray):
+        super().__init__(present)
+        self.values = values
+
+    def get(self, index: int) -> Any:
+        return self.values[index]
+
+    def take(self, indices: np.ndarray) -> "ObjectColumn":
+        return ObjectColumn(self.values[indices], self.present[indices])
+
+    def _compare_present(self, value: Any, comparison: str) -> np.ndarray:
+        compare = _OPERATORS[comparison]
+        mask = np.zeros(len(self), dtype=bool)
+        for i in np.flatnonzero(self.present):
+            mask[i] = compare(_as_comparable(self.values[i]), value)
+        return mask
+
+
+def build_column(values: List[Any]) -> Column:
+    """
+    Build the narrowest column able to hold the values of one key.
+
+    :param values: The values of the key for every row, MISSING for missing rows.
+    :return: The typed column.
+    """
+    present = np.fromiter(
+        (value is not MISSING for value in values), dtype=bool, count=len(values)
+    )
+    types = {type(value) for value in values if value is not MISSING}
+
+    if types == {str}:
+        return StringColumn.from_values(values)
+    if types == {list}:
+        return ListColumn.from_sequences(values, present=present)
+
+    if types == {bool}:
+        filled = [False if value is MISSING else value for value in values]
+    else:
+        filled = [0 if value is MISSING else value for value in values]
+    array = infer_array(filled) if types else None
+    if types == {bool}:
+        return BoolColumn(array, present)
+    if array is not None and array.dtype != object:
+        return NumericColumn(array, present)
+
+    array = np.empty(len(values), dtype=object)
+    array[:] = [None if value is MISSING else value for value in values]
+    return ObjectColumn(array, present)
+
+
+def concat_columns(columns: List[Optional[Column]], lengths: List[int]) -> Column:
+    """
+    Concatenate the columns of one key taken from consecutive parts of a dataset.
+
+    Numeric columns of one dtype, bool and str columns are concatenated array by array.
+    Other columns, or columns of different types, e.g. int64 and float64, are rebuilt from their values with build_column, so the
+    result is the column a single load of all the rows would have built.
+
+    :param columns: The column of each part, None for parts not holding the key.
+    :param lengths: The number of rows of each part.
+    :return: The concatenated column.
+    """
+    types = {type(column) for column in columns if column is not None}
+    if types == {StringColumn}:
+        lookup = {}
+        codes = []
+        for column, length in zip(columns, lengths):
+            if column is None:
+                codes.append(np.full(length, -1, dtype=np.int32))
+                continue
+            mapping = np.fromiter(
+                (lookup.setdefault(value, len(lookup)) for value in column.categories),
+                dtype=np.int32,
+                count=len(column.categories),
+            )
+            # missing rows keep the code -1
+            codes.append(np.append(mapping, -1).astype(np.int32)[column.codes])
+        categories = np.empty(len(lookup), dtype=object)
+        categories[:] = list(lookup)
+        return StringColumn(np.concatenate(codes), categories)
+    dtypes = {column.values.dtype for column in columns if column is not None}
+    if types == {BoolColumn} or (types == {NumericColumn} and len(dtypes) == 1):
+        dtype = dtypes.pop()
+        values, present = [], []
+        for column, length in zip(columns, lengths):
+            if column is None:
+                values.append(np.zeros(length, dtype=dtype))
+                present.append(np.zeros(length, dtype=bool))
+            else:
+                values.append(column.values)
+                present.append(column.present)
+        return types.pop()(
+            np.concatenate(values).astype(dtype), np.concatenate(present)
+        )
+
+    values = []
+    for column, length in zip(columns, lengths):
+        if column is None:
+            values.extend([MISSING] * length)
+        else:
+            values.extend(
+                column.get(i) if column.present[i] else MISSING for i in range(length)
+            )
+    return build_column(values)
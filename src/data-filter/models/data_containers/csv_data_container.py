@@ -1,6 +1,13 @@
 from pydantic import BaseModel, field_validator
+from io import BytesIO
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+import json, os, shutil, tempfile
+import numpy as np
 import pandas as pd
 
+# manifest of the .npy columns written by _convert_to_npy
+_NPY_MANIFEST = "columns.json"
+
 
 class CSVDataContainer(BaseModel):
     """
@@ -8,5 +15,324 @@ class CSVDataContainer(BaseModel):
     """
 
     @staticmethod
-    def _as_pandas_data_frame(data_source: str) -> pd.DataFrame:
-        return pd.read_csv(data_source)
+    def _as_pandas_data_frame(
+        data_source: str, usecols: List[str] = None
+    ) -> pd.DataFrame:
+        data = pd.read_csv(data_source, usecols=usecols)
+        if usecols is not None:
+            # read_csv keeps the file order of the columns
+            data = data[list(usecols)]
+        return data
+
+    @staticmethod
+    def _read_byte_ranges(
+        data_source: str,
+        ranges: List[Tuple[int, int, int]],
+        usecols: List[str] = None,
+        dtype: Dict[str, str] = None,
+    ) -> pd.DataFrame:
+        """
+        Parse some byte ranges of the CSV file, each holding whole lines, e.g. its row
+        groups, without reading the rest of the file.
+
+        :param data_source: The path to the CSV file.
+        :param ranges: The (start, end, first_row) of each range: its byte offsets and
+            the position of its first row in the file, used as index.
+        :param usecols: Only parse these columns, in this order.
+        :param dtype: dtype hints per column, to parse the ranges as the whole file.
+        :return: The rows of the ranges, in the given order.
+        """
+        header = pd.read_csv(data_source, nrows=0).columns.tolist()
+        if dtype is not None:
+            dtype = {
+                column: column_dtype
+                for column, column_dtype in dtype.items()
+                if usecols is None or column in usecols
+            }
+        frames = []
+        with open(data_source, "rb") as file:
+            for start, end, first_row in ranges:
+                file.seek(start)
+                frame = pd.read_csv(
+                    BytesIO(file.read(end - start)),
+                    header=None,
+                    names=header,
+                    usecols=usecols,
+                    dtype=dtype,
+                )
+                frame.index = pd.RangeIndex(first_row, first_row + len(frame))
+                frames.append(CSVDataContainer._restore_bools(frame))
+        if not frames:
+            data = CSVDataContainer._restore_bools(
+                pd.DataFrame(columns=header).astype(dtype or {})
+            )
+        else:
+            data = pd.concat(frames) if len(frames) > 1 else frames[0]
+        if usecols is not None:
+            data = data[list(usecols)]
+        return data
+
+    @staticmethod
+    def _iter_pandas_chunks(
+        data_source: str,
+        chunksize: int = 100_000,
+        usecols: List[str] = None,
+        dtype: Dict[str, str] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Reads the CSV file as a sequence of DataFrames of at most chunksize rows.
+
+        :param data_source: The path to the CSV file.
+        :param chunksize: The number of rows per chunk.
+        :param usecols: Only parse these columns.
+        :param dtype: dtype hints per column, skipping type inference for them.
+        :return: An iterator over the chunks.
+        """
+        with pd.read_csv(
+            data_source, chunksize=chunksize, usecols=usecols, dtype=dtype
+        ) as reader:
+            for chunk in reader:
+                yield CSVDataContainer._restore_bools(chunk)
+
+    @staticmethod
+    def _restore_bools(data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Turn the columns parsed with the "boolean" dtype hint back into object columns
+        of bools and NaN, as read_csv infers them for bools with missing values.
+
+        :param data: The parsed rows.
+        :return: The rows, with the "boolean" columns restored.
+        """
+        for column, dtype in data.dtypes.items():
+            if dtype == "boolean":
+                values = data[column]
+                data[column] = values.astype(object).where(values.notna(), np.nan)
+        return data
+
+    @staticmethod
+    def _value_dtypes(data: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Get the dtypes of the columns of a part of a CSV file, as read_csv inferred
+        them for the part. Object columns holding only bools and missing values are
+        reported as "boolean", columns with only missing values as None: they are
+        parsed as floats whatever the rest of the file holds.
+
+        :param data: The rows of the part.
+        :return: The dtype of each column.
+        """
+        dtypes = {}
+        for column, dtype in data.dtypes.items():
+            values = data[column].dropna()
+            if not len(values):
+                dtypes[column] = None
+            elif dtype == object and all(
+                isinstance(value, (bool, np.bool_)) for value in values
+            ):
+                dtypes[column] = "boolean"
+            else:
+                dtypes[column] = dtype
+        return dtypes
+
+    @staticmethod
+    def _conflicting_columns(part_dtypes: Iterable[Dict[str, Any]]) -> Dict[str, str]:
+        """
+        Find the columns the parts of a CSV file disagree on, with the dtype hint to
+        parse them again like read_csv does for the whole file:
+
+        - "object" for columns parsed as numbers in some parts and as text or bools
+          in others, read_csv parses them as text;
+        - "boolean" for columns parsed as bools in some parts and holding missing
+          values in others, read_csv parses them as objects holding bools and NaN.
+
+        :param part_dtypes: The dtypes of the parts, as returned by _value_dtypes.
+        :return: The dtype hint of each conflicting column.
+        """
+        kinds: Dict[str, set] = {}
+        for dtypes in part_dtypes:
+            for column, dtype in dtypes.items():
+                if dtype is None:
+                    kind = None
+                elif isinstance(dtype, str):
+                    kind = dtype
+                else:
+                    kind = dtype.kind
+                kinds.setdefault(column, set()).add(kind)
+        conflicts = {}
+        for column, column_kinds in kinds.items():
+            values = column_kinds - {None}
+            if values & set("iuf") and values - set("iuf"):
+                conflicts[column] = "object"
+            elif "b" in values and values <= {"b", "boolean"} and len(column_kinds) > 1:
+                conflicts[column] = "boolean"
+        return conflicts
+
+    @staticmethod
+    def _convert_to_npy(
+        data_source: str, output_dir: str, chunksize: int = 100_000
+    ) -> List[str]:
+        """
+        Writes the numeric columns of the CSV file to raw .npy files, one per column, so
+        that they can be memory-mapped by _load_npy instead of parsed again.
+
+        The file is parsed once, in chunks: every chunk is appended to a scratch file per
+        column, then the chunks are copied into the .npy files with the dtype of the
+        whole column (int64 chunks of a column having NaN become float64). Columns
+        holding text in any chunk are skipped.
+
+        :param data_source: The path to the CSV file.
+        :param output_dir: The directory of the .npy files, replaced if it exists.
+        :param chunksize: The number of rows parsed at a time.
+        :return: The names of the converted columns.
+        """
+        status = os.stat(data_source)
+        os.makedirs(os.path.dirname(os.path.abspath(output_dir)), exist_ok=True)
+        scratch = tempfile.mkdtemp(
+            prefix=".csv-npy-", dir=os.path.dirname(os.path.abspath(output_dir))
+        )
+        try:
+            columns = None
+            # dtypes of the chunks of every column, None once a chunk is not numeric
+            chunk_dtypes: Dict[str, List[np.dtype]] = {}
+            rows = 0
+            for chunk in CSVDataContainer._iter_pandas_chunks(
+                data_source, chunksize=chunksize
+            ):
+                if columns is None:
+                    columns = list(chunk.columns)
+                    chunk_dtypes = {column: [] for column in columns}
+                for position, column in enumerate(columns):
+                    dtypes = chunk_dtypes[column]
+                    if dtypes is None:
+                        continue
+                    values = chunk[column].to_numpy()
+                    if values.dtype.kind not in "biuf":
+                        chunk_dtypes[column] = None
+                        continue
+                    with open(os.path.join(scratch, f"{position}.raw"), "ab") as file:
+                        file.write(np.ascontiguousarray(values).tobytes())
+                    dtypes.append((values.dtype, len(values)))
+                rows += len(chunk)
+
+            manifest = []
+            for position, column in enumerate(columns or []):
+                dtypes = chunk_dtypes[column]
+                if not dtypes:
+                    continue
+                kinds = {dtype.kind for dtype, _ in dtypes}
+                if "b" in kinds and kinds != {"b"}:
+                    # bool and numbers, read_csv would have parsed it as text
+                    continue
+                dtype = np.result_type(*(dtype for dtype, _ in dtypes))
+                file_name = f"{position}.npy"
+                array = np.lib.format.open_memmap(
+                    os.path.join(scratch, file_name),
+                    mode="w+",
+                    dtype=dtype,
+                    shape=(rows,),
+                )
+                offset = 0
+                with open(os.path.join(scratch, f"{position}.raw"), "rb") as file:
+                    for chunk_dtype, length in dtypes:
+                        data = file.read(chunk_dtype.itemsize * length)
+                        array[offset : offset + length] = np.frombuffer(
+                            data, dtype=chunk_dtype
+                        )
+                        offset += length
+                array.flush()
+                del array
+                os.remove(os.path.join(scratch, f"{position}.raw"))
+                manifest.append({"name": column, "file": file_name, "dtype": dtype.str})
+            for name in os.listdir(scratch):
+                if name.endswith(".raw"):
+                    os.remove(os.path.join(scratch, name))
+
+            with open(
+                os.path.join(scratch, _NPY_MANIFEST), "w", encoding="utf-8"
+            ) as file:
+                json.dump(
+                    {
+                        "source": os.path.abspath(data_source),
+                        "source_mtime_ns": status.st_mtime_ns,
+                        "source_size": status.st_size,
+                        "rows": rows,
+                        "columns": manifest,
+                        "skipped": [
+                            column
+                            for column in columns or []
+                            if column not in {entry["name"] for entry in manifest}
+                        ],
+                    },
+                    file,
+                )
+            shutil.rmtree(output_dir, ignore_errors=True)
+            os.rename(scratch, output_dir)
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+        return [column["name"] for column in manifest]
+
+    @staticmethod
+    def _is_npy_current(data_source: str, output_dir: str) -> bool:
+        """
+        Checks whether the .npy columns were converted from the current CSV file.
+
+        :param data_source: The path to the CSV file.
+        :param output_dir: The directory of the .npy files.
+        :return: Whether the directory holds the columns of the unchanged CSV file.
+        """
+        try:
+            with open(
+                os.path.join(output_dir, _NPY_MANIFEST), "r", encoding="utf-8"
+            ) as file:
+                manifest = json.load(file)
+        except (OSError, ValueError):
+            return False
+        status = os.stat(data_source)
+        return (
+            manifest.get("source_mtime_ns") == status.st_mtime_ns
+            and manifest.get("source_size") == status.st_size
+        )
+
+    @staticmethod
+    def _skipped_npy_columns(output_dir: str) -> List[str]:
+        """
+        Get the columns of the CSV file that _convert_to_npy left out, e.g. text columns.
+
+        :param output_dir: The directory of the .npy files.
+        :return: The names of the skipped columns, in file order.
+        """
+        with open(
+            os.path.join(output_dir, _NPY_MANIFEST), "r", encoding="utf-8"
+        ) as file:
+            return json.load(file).get("skipped", [])
+
+    @staticmethod
+    def _load_npy(output_dir: str, usecols: List[str] = None) -> pd.DataFrame:
+        """
+        Opens the .npy columns written by _convert_to_npy as a DataFrame backed by
+        read-only memory-mapped arrays: pages are only read from disk when accessed.
+
+        :param output_dir: The directory of the .npy files.
+        :param usecols: Only open these columns, all the converted columns if None.
+        :return: The DataFrame of the numeric columns.
+        """
+        with open(
+            os.path.join(output_dir, _NPY_MANIFEST), "r", encoding="utf-8"
+        ) as file:
+            manifest = json.load(file)
+        columns = manifest["columns"]
+        if usecols is not None:
+            missing = set(usecols) - {column["name"] for column in columns}
+            if missing:
+                raise KeyError(
+                    "Non-numeric or unknown columns, not converted to .npy: "
+                    f"{', '.join(sorted(missing))}"
+                )
+            columns = [column for column in columns if column["name"] in usecols]
+        frame = {
+            column["name"]: np.asarray(
+                np.load(os.path.join(output_dir, column["file"]), mmap_mode="r")
+            )
+            for column in columns
+        }
+        # copy=False keeps one block per column, backed by its mapped file
+        return pd.DataFrame(frame, index=pd.RangeIndex(manifest["rows"]), copy=False)
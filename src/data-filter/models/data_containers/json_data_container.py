@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import List, Dict, Union
+from pydantic import BaseModel, PrivateAttr
+from typing import Any, List, Dict, Union
+from ..index import IndexCache, build_index
 
 
 class JsonDataItem(BaseModel):
@@ -17,6 +18,62 @@ class JsonDataContainer(BaseModel):
     """
 
     data: List[JsonDataItem]
+    _indexes: IndexCache = PrivateAttr(default_factory=IndexCache)
+
+    @classmethod
+    def from_trusted(
+        cls, data: List[Dict[str, Any]], validation_sample_size: int = 0
+    ) -> "JsonDataContainer":
+        """
+        Build the container from trusted raw items without validating each of them.
+
+        The first validation_sample_size items are still validated, which catches a wrong
+        schema early, the others are wrapped with model_construct.
+
+        :param data: The raw items, dicts holding an "item" dict.
+        :param validation_sample_size: The number of items to validate.
+        :return: The JsonDataContainer.
+        """
+        sample = [
+            JsonDataItem.model_validate(raw_item)
+            for raw_item in data[:validation_sample_size]
+        ]
+        return cls.model_construct(
+            data=sample
+            + [
+                JsonDataItem.model_construct(item=raw_item["item"])
+                for raw_item in data[validation_sample_size:]
+            ]
+        )
+
+    def get_index(self, key: str, kind: str):
+        """
+        Get a secondary index over a key, built on first use. Items edited in place
+        are not detected, invalidate_indexes must be called after such edits.
+
+        :param key: The indexed key.
+        :param kind: 'hash' for eq lookups, 'sorted' for lt/gt lookups.
+        :return: The index, or None if the values of the key cannot be indexed.
+        """
+        return self._indexes.get(
+            key,
+            kind,
+            lambda: build_index([item.item.get(key) for item in self.data], kind),
+            # catches a new list and in-place changes of its length, not item edits
+            fingerprint=(id(self.data), len(self.data)),
+        )
+
+    def invalidate_indexes(self):
+        """
+        Drop the secondary indexes, called when the items are replaced, and to be
+        called after editing items in place.
+        """
+        self._indexes.clear()
+
+    def __setattr__(self, name: str, value: Any):
+        if name == "data":
+            self.invalidate_indexes()
+        super().__setattr__(name, value)
 
     def __getitem__(self, index: int) -> JsonDataItem:
         """
@@ -34,6 +91,7 @@ class JsonDataContainer(BaseModel):
         :param index: The index of the element to set.
         :param value: The JsonDataItem to set at the specified index.
         """
+        self.invalidate_indexes()
         self.data[index].item = value
 
     def __len__(self):
@@ -0,0 +1,135 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Any, Dict, Iterable, Iterator, List, Union
+import numpy as np
+from .columnar_json_data_container import ColumnarJsonDataContainer
+from .columns import Column
+from .json_data_container import JsonDataContainer, JsonDataItem
+
+
+class JsonDataView(BaseModel):
+    """
+    Class to represent a selection of the rows of a data container, in a given order.
+
+    Filters and sorters return views instead of copying or mutating the container they
+    were given: a view only holds the positions of its rows in the base container, and
+    views of views share the same base.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    base: Union[JsonDataContainer, ColumnarJsonDataContainer]
+    indices: np.ndarray
+    # whether the view holds every row of the base, in order
+    is_full: bool = False
+
+    @classmethod
+    def of(
+        cls,
+        data_container: Union[
+            JsonDataContainer, ColumnarJsonDataContainer, "JsonDataView"
+        ],
+    ) -> "JsonDataView":
+        """
+        Get a view of every row of a data container. Views are returned as is.
+
+        :param data_container: The data container.
+        :return: The view.
+        """
+        if isinstance(data_container, JsonDataView):
+            return data_container
+        return cls(
+            base=data_container,
+            indices=np.arange(len(data_container), dtype=np.int64),
+            is_full=True,
+        )
+
+    def select(self, positions: np.ndarray) -> "JsonDataView":
+        """
+        Get a view of some of the rows of this view.
+
+        :param positions: The positions of the rows in this view, in the new order.
+        :return: The new view, sharing the same base.
+        """
+        return JsonDataView(
+            base=self.base, indices=self.indices[np.asarray(positions, dtype=np.int64)]
+        )
+
+    @property
+    def is_columnar(self) -> bool:
+        return isinstance(self.base, ColumnarJsonDataContainer)
+
+    def column(self, key: str) -> Column:
+        """
+        Get the rows of the view of a column of a columnar base.
+
+        :param key: The key of the column.
+        :return: The column, or None if the base has no such column.
+        """
+        column = self.base.columns.get(key)
+        if column is None or self.is_full:
+            return column
+        return column.take(self.indices)
+
+    def items(self) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the item dicts of the view.
+
+        :return: An iterator over the items.
+        """
+        if self.is_columnar:
+            return (self.base[index] for index in self.indices)
+        data = self.base.data
+        return (data[index].item for index in self.indices)
+
+    @property
+    def data(self) -> List[JsonDataItem]:
+        """
+        The rows of the view as JsonDataItem objects, shared with the base container.
+        """
+        if self.is_columnar:
+            return [
+                JsonDataItem.model_construct(item=self.base[index])
+                for index in self.indices
+            ]
+        data = self.base.data
+        return [data[index] for index in self.indices]
+
+    def to_container(
+        self, keys: Iterable[str] = None
+    ) -> Union[JsonDataContainer, ColumnarJsonDataContainer]:
+        """
+        Materialize the view as a container of the same kind as its base. Items are
+        shared with the base container, only the columns of a columnar base are copied.
+
+        :param keys: The columns to keep for a columnar base, all columns if None.
+        :return: The container holding the rows of the view.
+        """
+        if self.is_columnar and keys is not None:
+            return ColumnarJsonDataContainer(
+                length=len(self),
+                columns={
+                    key: self.column(key) for key in keys if key in self.base.columns
+                },
+            )
+        if self.is_full:
+            return self.base
+        if self.is_columnar:
+            return self.base.take(self.indices)
+        return JsonDataContainer.model_construct(data=self.data)
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        """
+        Method to get the i-th item of the view using the [] notation.
+
+        :param index: The index of the item to retrieve.
+        :return: The item dict at the specified index.
+        """
+        return self.base[int(self.indices[index])]
+
+    def __len__(self):
+        """
+        Method to get the number of rows of the view.
+
+        :return: The number of rows.
+        """
+        return len(self.indices)
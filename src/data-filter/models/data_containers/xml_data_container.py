@@ -1,44 +1,264 @@
 from pydantic import BaseModel
 from collections import defaultdict
+from typing import Any, Dict, Iterable, Iterator, Union
+import re
 import xml.etree.ElementTree as ET
+from .xml_writer import XMLWriter
+
+# numbers with a leading zero, like zip codes, are kept as text
+_INT_TEXT = re.compile(r"[+-]?(?:0|[1-9][0-9]*)")
+_FLOAT_TEXT = re.compile(
+    r"[+-]?(?:(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?|\.[0-9]+)"
+)
 
 
 class XMLDataContainer(BaseModel):
 
     @staticmethod
     def _as_py_dict(xml_file_path) -> dict:
+        """
+        Convert an XML document to nested dicts: leaf elements become their text and
+        repeated tags become lists.
+
+        The dicts are built while the document is parsed with iterparse, without
+        recursion, and every element is cleared once converted, so the element tree is
+        never held in memory next to its dict copy.
+        """
+        # children of the open elements, by tag
+        stack = []
+        value = None
+        for event, element in ET.iterparse(xml_file_path, events=("start", "end")):
+            if event == "start":
+                stack.append(defaultdict(list))
+                continue
+            children = stack.pop()
+            if children:
+                value = {k: v if len(v) > 1 else v[0] for k, v in children.items()}
+            else:
+                value = element.text
+            if stack:
+                stack[-1][element.tag].append(value)
+            root_tag = element.tag
+            element.clear()
+
+        return {root_tag: value}
 
-        def xml_to_dict(element):
-            if len(element) == 0:
-                return element.text
-            result = defaultdict(list)
-            for child in element:
-                result[child.tag].append(xml_to_dict(child))
-            return {k: v if len(v) > 1 else v[0] for k, v in result.items()}
+    @staticmethod
+    def _iter_records(
+        xml_file_path, record_tag: str, coerce_types: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the elements of an XML document having the record tag as flat record
+        dicts, the same shape as the items of a JsonDataItem.
 
-        tree = ET.parse(xml_file_path)
-        root = tree.getroot()
-        xml_dict = {root.tag: xml_to_dict(root)}
+        Records are parsed with iterparse and removed from the tree once converted, so
+        memory stays bounded by the size of a single record. An element having the
+        record tag that wraps other such elements is a container, not a record.
 
-        return xml_dict
+        :param xml_file_path: The path to the XML file.
+        :param record_tag: The tag of the repeated record elements.
+        :param coerce_types: Whether to convert numeric and boolean text to int, float
+            and bool values.
+        :return: An iterator over the record dicts.
+        """
+        # open elements, and for each open record whether it wraps other records
+        parents = []
+        wraps_records = []
+        for event, element in ET.iterparse(xml_file_path, events=("start", "end")):
+            if event == "start":
+                if element.tag == record_tag:
+                    if wraps_records:
+                        wraps_records[-1] = True
+                    wraps_records.append(False)
+                parents.append(element)
+                continue
+            parents.pop()
+            if element.tag != record_tag:
+                continue
+            if not wraps_records.pop():
+                yield XMLDataContainer._record_to_dict(element, coerce_types)
+            if parents:
+                parents[-1].remove(element)
 
     @staticmethod
-    def _from_py_dict(data: dict, xml_file_path):
-        def dict_to_xml(tag, d):
-            elem = ET.Element(tag)
-            if isinstance(d, dict):
-                for key, val in d.items():
-                    child = dict_to_xml(key, val)
-                    elem.append(child)
-            elif isinstance(d, list):
-                for item in d:
-                    child = dict_to_xml(tag, item)
-                    elem.append(child)
+    def _record_to_dict(
+        record: ET.Element, coerce_types: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Flatten a record element: leaf descendants are keyed by their tag path relative
+        to the record (e.g. "address.city"), attributes by "@name" and repeated keys
+        hold a list of values. Empty elements have the value "", or are left out when
+        types are coerced so that numeric keys stay numeric.
+
+        :param record: The record element.
+        :param coerce_types: Whether to convert numeric and boolean text.
+        :return: The record dict.
+        """
+        convert = XMLDataContainer._coerce_text if coerce_types else lambda text: text
+        if len(record) == 0 and not record.attrib:
+            return {record.tag: convert(record.text or "")}
+
+        result = {}
+
+        def add(key, text):
+            if coerce_types and text == "":
+                return
+            value = convert(text)
+            if key not in result:
+                result[key] = value
+            elif isinstance(result[key], list):
+                result[key].append(value)
             else:
-                elem.text = str(d)
-            return elem
+                result[key] = [result[key], value]
+
+        for name, value in record.attrib.items():
+            add(f"@{name}", value)
+        # depth first walk in document order, without recursion
+        stack = [(child, "") for child in reversed(record)]
+        while stack:
+            element, prefix = stack.pop()
+            path = prefix + element.tag
+            for name, value in element.attrib.items():
+                add(f"{path}.@{name}", value)
+            if len(element):
+                stack.extend((child, path + ".") for child in reversed(element))
+            elif not element.attrib or element.text:
+                add(path, element.text or "")
+        return result
+
+    @staticmethod
+    def _coerce_text(text: str) -> Union[str, int, float, bool]:
+        """
+        Convert the text of an element to an int, float or bool when it spells one.
+
+        :param text: The text.
+        :return: The converted value, or the text itself.
+        """
+        if _INT_TEXT.fullmatch(text):
+            return int(text)
+        if _FLOAT_TEXT.fullmatch(text):
+            return float(text)
+        if text == "true":
+            return True
+        if text == "false":
+            return False
+        return text
+
+    @staticmethod
+    def _from_py_dict(data: dict, xml_file_path):
+        """
+        Write nested dicts as an XML document, the reverse of _as_py_dict: dict values
+        become child elements, list values repeated elements and other values text.
 
+        Elements are streamed to the file with an XMLWriter while the dicts are walked,
+        without recursion, instead of building the element tree first.
+        """
         root_tag = list(data.keys())[0]
-        root_element = dict_to_xml(root_tag, data[root_tag])
-        tree = ET.ElementTree(root_element)
-        tree.write(xml_file_path, encoding="utf-8", xml_declaration=True)
+        with XMLWriter(xml_file_path) as writer:
+            # elements left to write, as (tag, value), with None marking an end tag
+            stack = [(root_tag, data[root_tag])]
+            while stack:
+                entry = stack.pop()
+                if entry is None:
+                    writer.end()
+                    continue
+                tag, value = entry
+                writer.start(tag)
+                stack.append(None)
+                if isinstance(value, dict):
+                    stack.extend(reversed(list(value.items())))
+                elif isinstance(value, list):
+                    stack.extend((tag, item) for item in reversed(value))
+                else:
+                    writer.text(str(value))
+
+    @staticmethod
+    def _write_records(
+        records: Iterable[Dict[str, Any]],
+        xml_file_path,
+        record_tag: str,
+        root_tag: str = "data",
+    ) -> int:
+        """
+        Stream flat record dicts to an XML document, the reverse of _iter_records: each
+        record is written as soon as it is produced, so filter results can go straight
+        to disk.
+
+        :param records: The record dicts, keyed like the output of _record_to_dict.
+        :param xml_file_path: The path of the XML file to write.
+        :param record_tag: The tag of the record elements.
+        :param root_tag: The tag of the root element wrapping the records.
+        :return: The number of records written.
+        """
+        count = 0
+        with XMLWriter(xml_file_path) as writer:
+            writer.start(root_tag)
+            for record in records:
+                XMLDataContainer._write_record(writer, record, record_tag)
+                count += 1
+            writer.end()
+        return count
+
+    @staticmethod
+    def _write_record(writer: XMLWriter, record: Dict[str, Any], record_tag: str):
+        """
+        Write one flat record dict as a record element: "a.b" keys become nested
+        elements, "@name" keys attributes and list values repeated elements.
+
+        :param writer: The writer of the document.
+        :param record: The record dict.
+        :param record_tag: The tag of the record element.
+        """
+        if len(record) == 1 and record_tag in record:
+            # leaf record, e.g. <flower>Lily</flower>
+            writer.element(
+                record_tag, XMLDataContainer._format_value(record[record_tag])
+            )
+            return
+
+        # the record as a tree of nodes holding attributes, texts and child nodes
+        def new_node():
+            return {"attrib": {}, "texts": [], "children": {}}
+
+        root = new_node()
+        for key, value in record.items():
+            *path, name = key.split(".")
+            node = root
+            for tag in path:
+                node = node["children"].setdefault(tag, new_node())
+            values = value if isinstance(value, list) else [value]
+            if name.startswith("@"):
+                node["attrib"][name[1:]] = XMLDataContainer._format_value(values[0])
+            else:
+                child = node["children"].setdefault(name, new_node())
+                child["texts"].extend(
+                    XMLDataContainer._format_value(value) for value in values
+                )
+
+        def write_node(tag, node):
+            if node["children"]:
+                writer.start(tag, node["attrib"])
+                for child_tag, child in node["children"].items():
+                    write_node(child_tag, child)
+                writer.end()
+            elif node["texts"]:
+                # repeated keys hold one text per repeated element
+                for position, text in enumerate(node["texts"]):
+                    writer.element(tag, text, node["attrib"] if position == 0 else None)
+            else:
+                writer.element(tag, attrib=node["attrib"])
+
+        # record paths are a few levels deep at most, recursion is bounded
+        write_node(record_tag, root)
+
+    @staticmethod
+    def _format_value(value: Any) -> str:
+        """
+        Format a record value as element text, booleans the way _coerce_text reads them.
+
+        :param value: The value.
+        :return: The text.
+        """
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        return str(value)
@@ -0,0 +1,105 @@
+from typing import Dict, List, TextIO
+from xml.sax.saxutils import escape
+
+# characters escaped in attribute values, on top of &, < and >, like ElementTree
+_ATTRIBUTE_ENTITIES = {'"': "&quot;", "\n": "&#10;", "\r": "&#13;", "\t": "&#09;"}
+
+
+class XMLWriter:
+    """
+    Incremental XML serializer: elements are written to the file as they are started
+    and ended, so a document is never held in memory as an element tree.
+
+    The output is the same as ElementTree.write with an XML declaration: empty elements
+    are written as "<tag />" and text and attributes are escaped the same way.
+
+    Usage:
+        with XMLWriter(path) as writer:
+            writer.start("flowerShop")
+            writer.element("flower", "Lily")
+            writer.end()
+    """
+
+    def __init__(self, xml_file_path: str, buffer_size: int = 1024 * 1024):
+        """
+        :param xml_file_path: The path of the XML file to write.
+        :param buffer_size: The size in bytes of the write buffer.
+        """
+        self.xml_file_path = xml_file_path
+        self.buffer_size = buffer_size
+        self._file: TextIO = None
+        # tags of the open elements
+        self._open: List[str] = []
+        # whether the start tag of the last open element is still unterminated, so
+        # that it can be written as an empty element
+        self._pending = False
+
+    def __enter__(self) -> "XMLWriter":
+        self._file = open(
+            self.xml_file_path, "w", encoding="utf-8", buffering=self.buffer_size
+        )
+        self._file.write("<?xml version='1.0' encoding='utf-8'?>\n")
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None and self._open:
+                raise ValueError(f"Unclosed XML elements: {', '.join(self._open)}")
+        finally:
+            self._file.close()
+
+    def start(self, tag: str, attrib: Dict[str, str] = None):
+        """
+        Write the start tag of an element.
+
+        :param tag: The tag of the element.
+        :param attrib: The attributes of the element.
+        """
+        self._terminate_start_tag()
+        self._file.write(f"<{tag}")
+        if attrib:
+            for name, value in attrib.items():
+                self._file.write(f' {name}="{escape(str(value), _ATTRIBUTE_ENTITIES)}"')
+        self._open.append(tag)
+        self._pending = True
+
+    def text(self, text: str):
+        """
+        Write text inside the current element.
+
+        :param text: The text, escaped when written.
+        """
+        if text:
+            self._terminate_start_tag()
+            self._file.write(escape(text))
+
+    def end(self):
+        """
+        Write the end tag of the current element.
+        """
+        if not self._open:
+            raise ValueError("No open XML element to end")
+        tag = self._open.pop()
+        if self._pending:
+            self._file.write(" />")
+            self._pending = False
+        else:
+            self._file.write(f"</{tag}>")
+
+    def element(self, tag: str, text: str = None, attrib: Dict[str, str] = None):
+        """
+        Write a whole leaf element.
+
+        :param tag: The tag of the element.
+        :param text: The text of the element.
+        :param attrib: The attributes of the element.
+        """
+        self.start(tag, attrib)
+        if text is not None:
+            self.text(text)
+        self.end()
+
+    def _terminate_start_tag(self):
+        if self._pending:
+            self._file.write(">")
+            self._pending = False
@@ -0,0 +1,215 @@
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+import math, weakref
+import numpy as np
+import pandas as pd
+
+"""
+Secondary indexes answering repeated `eq`, `lt` and `gt` filters without a full scan.
+
+Indexes are built lazily, on the first filter that needs them, and kept in an
+IndexCache owned by the data they index. The cache is cleared when the container
+replaces its rows or columns, and a fingerprint of the indexed data catches a list or
+column being swapped. Rows edited in place are not detected: code editing the values
+of indexed rows, e.g. item.item[key] = value, must call invalidate_indexes of the
+container (invalidate_frame_indexes for a DataFrame).
+"""
+
+_INT64_MIN = int(np.iinfo(np.int64).min)
+_INT64_MAX = int(np.iinfo(np.int64).max)
+# integers above this are not all exactly represented as float64
+_FLOAT64_EXACT = 2**53
+
+
+class HashIndex:
+    """
+    Maps every distinct value to the positions of the rows holding it: `eq` lookups
+    cost O(1) plus the size of the result.
+    """
+
+    def __init__(self, values: List[Any]):
+        positions: Dict[Hashable, List[int]] = {}
+        for position, value in enumerate(values):
+            positions.setdefault(value, []).append(position)
+        self._positions = {
+            value: np.array(rows, dtype=np.int64) for value, rows in positions.items()
+        }
+
+    def lookup(self, value: Any) -> np.ndarray:
+        """
+        Get the positions of the rows equal to the value.
+
+        :param value: The value to look up.
+        :return: The positions, in ascending order.
+        """
+        if value != value:
+            # NaN is equal to nothing, although dict lookups match it by identity
+            return np.empty(0, dtype=np.int64)
+        try:
+            return self._positions.get(value, np.empty(0, dtype=np.int64))
+        except TypeError:
+            # unhashable values cannot be equal to any indexed value
+            return np.empty(0, dtype=np.int64)
+
+
+class SortedIndex:
+    """
+    Keeps the positions of the rows sorted by value: `lt` and `gt` lookups cost
+    O(log n) plus the size of the result.
+
+    Numbers are kept as int64 when every value is an integer, so large integers are
+    compared exactly, else as float64. A lookup with a value of another type than the
+    indexed values returns None, the full scan then raising the TypeError of Python.
+    """
+
+    def __init__(self, values: np.ndarray):
+        values = np.asarray(values)
+        rows = np.arange(len(values))
+        if values.dtype.kind == "f":
+            # NaN never compares lower or greater than a value
+            rows = rows[~np.isnan(values)]
+        order = np.argsort(values[rows], kind="stable")
+        self._order = rows[order]
+        self._sorted_values = values[self._order]
+
+    def range(self, value: Any, comparison: str) -> Optional[np.ndarray]:
+        """
+        Get the positions of the rows lower or greater than the value.
+
+        :param value: The value to compare against.
+        :param comparison: The type of comparison ('lt', 'gt').
+        :return: The positions, in ascending order, or None if the value cannot be
+            compared with the indexed values.
+        """
+        if comparison not in ("lt", "gt"):
+            raise ValueError("Comparison must be 'lt' or 'gt'")
+        kind = self._sorted_values.dtype.kind
+        if kind == "O":
+            if not isinstance(value, str):
+                return None
+        elif not isinstance(value, (bool, int, float)):
+            return None
+        elif value != value:
+            # nothing is lower or greater than NaN
+            return np.empty(0, dtype=np.int64)
+        elif kind == "i":
+            if isinstance(value, float) and not math.isinf(value):
+                # the same integers are lower than 2.5 and than 3, not rounded to float
+                value = math.ceil(value) if comparison == "lt" else math.floor(value)
+            if not _INT64_MIN <= value <= _INT64_MAX:
+                # every row is on the same side of the value
+                if (value > 0) == (comparison == "lt"):
+                    return np.sort(self._order)
+                return np.empty(0, dtype=np.int64)
+            value = int(value)
+        if comparison == "lt":
+            end = np.searchsorted(self._sorted_values, value, side="left")
+            return np.sort(self._order[:end])
+        start = np.searchsorted(self._sorted_values, value, side="right")
+        return np.sort(self._order[start:])
+
+
+class IndexCache:
+    """
+    Lazily built indexes of one dataset, keyed by column and index kind.
+
+    An optional fingerprint of the indexed data is stored with each index, a lookup
+    with a different fingerprint drops the stale index and builds a new one.
+    """
+
+    def __init__(self):
+        self._indexes: Dict[Tuple[str, str], Tuple[Any, Any]] = {}
+
+    def get(
+        self,
+        column: str,
+        kind: str,
+        build: Callable[[], Any],
+        fingerprint: Any = None,
+    ) -> Any:
+        """
+        Get an index, building it on first use.
+
+        :param column: The indexed column.
+        :param kind: The kind of index ('hash' or 'sorted').
+        :param build: Builds the index, returns None if the column cannot be indexed.
+        :param fingerprint: Identifies the state of the indexed data.
+        :return: The index, or None if the column cannot be indexed.
+        """
+        cached = self._indexes.get((column, kind))
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        index = build()
+        self._indexes[(column, kind)] = (fingerprint, index)
+        return index
+
+    def clear(self):
+        """
+        Drop every index.
+        """
+        self._indexes.clear()
+
+
+def build_index(values: List[Any], kind: str) -> Any:
+    """
+    Build an index over Python values, lists being indexed by their length as in
+    JSONFilter._compare.
+
+    :param values: The value of every row, None for missing rows.
+    :param kind: The kind of index ('hash' or 'sorted').
+    :return: The index, or None if the values cannot be indexed.
+    """
+    values = [len(value) if isinstance(value, list) else value for value in values]
+    if kind == "hash":
+        try:
+            return HashIndex(values)
+        except TypeError:
+            return None
+    if any(value is None for value in values):
+        # comparing missing values raises, let the full scan report it
+        return None
+    types = set(map(type, values))
+    if types <= {bool, int}:
+        try:
+            return SortedIndex(np.array(values, dtype=np.int64))
+        except OverflowError:
+            return None
+    if types <= {bool, int, float}:
+        if any(type(value) is int and abs(value) > _FLOAT64_EXACT for value in values):
+            # mixed with floats, these integers would be rounded
+            return None
+        return SortedIndex(np.array(values, dtype=np.float64))
+    if types == {str}:
+        array = np.empty(len(values), dtype=object)
+        array[:] = values
+        return SortedIndex(array)
+    return None
+
+
+_FRAME_INDEXES: Dict[int, IndexCache] = {}
+
+
+def get_frame_index_cache(dataframe: pd.DataFrame) -> IndexCache:
+    """
+    Get the index cache of a DataFrame, created on first use and dropped along with
+    the DataFrame. In-place edits of the DataFrame must call invalidate_frame_indexes.
+
+    :param dataframe: The indexed DataFrame.
+    :return: The index cache of the DataFrame.
+    """
+    key = id(dataframe)
+    cache = _FRAME_INDEXES.get(key)
+    if cache is None:
+        cache = _FRAME_INDEXES[key] = IndexCache()
+        weakref.finalize(dataframe, _FRAME_INDEXES.pop, key, None)
+    return cache
+
+
+def invalidate_frame_indexes(dataframe: pd.DataFrame):
+    """
+    Drop the indexes built over a DataFrame.
+
+    :param dataframe: The indexed DataFrame.
+    """
+    cache = _FRAME_INDEXES.get(id(dataframe))
+    if cache is not None:
+        cache.clear()
@@ -0,0 +1,429 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from io import BytesIO
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+import os
+import pandas as pd
+from .data_loader.sharded_data_loader import (
+    DATA_FILE_TYPES,
+    Shard,
+    add_partition_columns,
+    list_data_files,
+)
+from .data_loader.zone_map import ZoneMap
+from .filter.csv_filter import CSVFilter
+from .filter.json_filter import JSONFilter
+from .filter.predicate import Predicate
+from .models.data_containers.columnar_json_data_container import (
+    ColumnarJsonDataContainer,
+)
+from .models.data_containers.csv_data_container import CSVDataContainer
+from .models.data_containers.json_data_view import JsonDataView
+from .stats.accumulators import FrameStatsAccumulator, StatsAccumulator
+from .stats.sketches import SketchAccumulator
+
+"""
+Parallel filter and stats over the partitions of a dataset.
+
+A dataset is a data file, or data files of the same type named by a directory or a
+glob pattern. Files whose partition values or zone maps cannot match the filter are
+pruned without being opened. The others are split into partitions: one per file, and
+CSV files larger than the partition size are further split into byte ranges ending at
+line boundaries. Each partition is loaded, filtered and aggregated by a separate worker
+process, so parsing, which dominates, runs on every core. The results are merged in
+partition order: filtered rows are concatenated and stats accumulators merged, giving
+the same result as a single process over the whole dataset.
+"""
+
+
+DEFAULT_PARTITION_SIZE = 64 * 1024 * 1024
+
+Rows = Union[pd.DataFrame, JsonDataView]
+
+
+class Partition:
+    """
+    A part of a dataset: a whole shard, or the rows of a CSV shard between two byte
+    offsets.
+    """
+
+    def __init__(
+        self,
+        shard: Shard,
+        start: int = None,
+        end: int = None,
+        dtype: Dict[str, str] = None,
+    ):
+        """
+        :param shard: The lazy handle on the data file.
+        :param start: The offset of the first byte of the part, the whole file if None.
+        :param end: The offset just past the last byte of the part.
+        :param dtype: The dtypes of the columns of a CSV file, so that its byte ranges
+            are parsed the way the whole file is.
+        """
+        self.shard = shard
+        self.start = start
+        self.end = end
+        self.dtype = dtype
+
+    @property
+    def path(self) -> str:
+        return self.shard.path
+
+    @property
+    def file_type(self) -> str:
+        return self.shard.file_type
+
+    def __repr__(self):
+        if self.start is None:
+            return f"Partition({self.path})"
+        return f"Partition({self.path}, bytes {self.start}-{self.end})"
+
+
+def split_csv_file(shard: Shard, partition_size: int) -> List[Partition]:
+    """
+    Split a CSV file into byte ranges of about partition_size bytes, each ending at a
+    line boundary. The header line is left out of every range.
+
+    Quoted values spanning several lines are not supported: such a file must be kept
+    whole, with a partition size larger than the file.
+
+    :param shard: The CSV file.
+    :param partition_size: The target size of a range, in bytes.
+    :return: The partitions of the file.
+    """
+    size = os.path.getsize(shard.path)
+    with open(shard.path, "rb") as file:
+        file.readline()
+        start = file.tell()
+        if size - start <= partition_size:
+            return [Partition(shard)]
+        partitions = []
+        while start < size:
+            file.seek(min(start + partition_size, size))
+            # move the end of the range past the current line
+            file.readline()
+            end = min(file.tell(), size)
+            partitions.append(Partition(shard, start, end))
+            start = end
+    return partitions
+
+
+class ParallelExecutor:
+    """
+    Runs filters and stats over the partitions of a dataset in a ProcessPoolExecutor.
+
+    Usage:
+        executor = ParallelExecutor(workers=8)
+        rows = executor.filter("exports/", parse_expression("field2 gt 5"))
+        stats = executor.stats("exports/", parse_expression("field2 gt 5"))
+    """
+
+    def __init__(
+        self,
+        workers: int = None,
+        partition_size: int = DEFAULT_PARTITION_SIZE,
+        trusted: bool = False,
+        record_tag: str = None,
+    ):
+        """
+        :param workers: The number of worker processes, the number of CPUs if None.
+            With 1 worker the partitions are processed in the calling process.
+        :param partition_size: The size in bytes above which CSV files are split.
+        :param trusted: Whether to skip the validation of each JSON item.
+        :param record_tag: The tag of the XML record elements.
+        """
+        workers = workers if workers is not None else os.cpu_count() or 1
+        if workers < 1:
+            raise ValueError("workers must be a positive integer")
+        if partition_size < 1:
+            raise ValueError("partition_size must be a positive number of bytes")
+        self.workers = workers
+        self.partition_size = partition_size
+        self.trusted = trusted
+        self.record_tag = record_tag
+
+    def partitions(self, path: str, predicate: Predicate = None) -> List[Partition]:
+        """
+        Split a dataset into partitions, leaving out the files whose partition values
+        or zone maps cannot match the predicate.
+
+        :param path: A data file, a directory or a glob pattern of data files of the
+            same type.
+        :param predicate: The predicate used to prune the files, None to keep them all.
+        :return: The partitions, in row order.
+        """
+        partitions = []
+        for file in list_data_files(path):
+            shard = Shard(file)
+            if shard.file_type not in DATA_FILE_TYPES:
+                raise ValueError(f"Unsupported file type: {shard.file_type}")
+            if shard.file_type == "xml" and self.record_tag is None:
+                raise ValueError("A record tag is required to load XML records")
+            if predicate is not None and not shard.may_match(predicate):
+                continue
+            if shard.file_type == "csv":
+                zone_map = ZoneMap.load(file)
+                for partition in split_csv_file(shard, self.partition_size):
+                    if partition.start is not None and zone_map is not None:
+                        partition.dtype = zone_map.dtypes or None
+                    partitions.append(partition)
+            else:
+                partitions.append(Partition(shard))
+        return partitions
+
+    def filter(
+        self, path: str, predicate: Predicate = None, columns: List[str] = None
+    ) -> Rows:
+        """
+        Load the rows of a dataset matching a predicate.
+
+        :param path: A data file, a directory or a glob pattern of data files of the
+            same type.
+        :param predicate: The predicate, all rows are kept if None.
+        :param columns: The columns/keys to load, all columns if None.
+        :return: A DataFrame for CSV files, indexed by the position of the rows among
+            the loaded files, a JsonDataView over a columnar container for the other
+            files.
+        """
+        partitions = self.partitions(path, predicate)
+        results = self._map_partitions(
+            partial(
+                _filter_partition,
+                predicate=predicate,
+                columns=columns,
+                options=self._options(),
+            ),
+            partitions,
+        )
+        if Shard(list_data_files(path)[0]).file_type != "csv":
+            return JsonDataView.of(
+                ColumnarJsonDataContainer.concat([rows for rows, _ in results])
+            )
+
+        frames = []
+        offset = 0
+        for rows, length in results:
+            rows.index = rows.index + offset
+            offset += length
+            frames.append(rows)
+        if not frames:
+            return Shard(list_data_files(path)[0]).empty_frame(columns)
+        # empty frames would only add their dtypes to the result
+        kept = [frame for frame in frames if len(frame)] or frames[:1]
+        return pd.concat(kept) if len(kept) > 1 else kept[0]
+
+    def stats(
+        self,
+        path: str,
+        predicate: Predicate = None,
+        columns: List[str] = None,
+        select: List[str] = None,
+        sketch: Dict[str, Any] = None,
+    ) -> Dict[str, Any]:
+        """
+        Compute the stats of the rows of a dataset matching a predicate. Each worker
+        returns the accumulator of its partition, so rows never leave the workers.
+        Approximate stats are computed the same way, with sketches of bounded size, and
+        with 1 worker only one partition is in memory at a time.
+
+        :param path: A data file, a directory or a glob pattern of data files of the
+            same type.
+        :param predicate: The predicate, all rows are counted if None.
+        :param columns: The columns/keys to load, all columns if None.
+        :param select: The columns/keys to compute the stats of, all loaded columns if
+            None.
+        :param sketch: The error bounds of the approximate stats, as SketchAccumulator
+            arguments, None for the exact stats.
+        :return: The stats, as returned by CSVStats and JSONStats.get_all_stats, or by
+            SketchAccumulator.get_all_stats.
+        """
+        partitions = self.partitions(path, predicate)
+        if sketch is not None:
+            accumulator = SketchAccumulator(**sketch)
+        elif Shard(list_data_files(path)[0]).file_type == "csv":
+            accumulator = FrameStatsAccumulator()
+        else:
+            accumulator = StatsAccumulator()
+        for partial_accumulator in self._map_partitions(
+            partial(
+                _stats_partition,
+                predicate=predicate,
+                columns=columns,
+                select=select,
+                sketch=sketch,
+                options=self._options(),
+            ),
+            partitions,
+        ):
+            accumulator.merge(partial_accumulator)
+        return accumulator.get_all_stats()
+
+    def _options(self) -> Dict[str, Any]:
+        return {"trusted": self.trusted, "record_tag": self.record_tag}
+
+    def _map_partitions(
+        self, function: Callable[[Partition], Any], partitions: List[Partition]
+    ) -> List[Any]:
+        """
+        Apply a function returning a result and the dtypes of the partition to every
+        partition. The byte ranges of a CSV file are parsed separately, so read_csv may
+        parse a column as numbers in one range and as text in another: the ranges of
+        such a file are processed again with the column parsed like read_csv does for
+        the whole file.
+
+        :return: The results, in partition order.
+        """
+        results = list(self._map(function, partitions))
+        dtypes_by_path: Dict[str, List[Dict[str, Any]]] = {}
+        for partition, (_, dtypes) in zip(partitions, results):
+            if dtypes is not None:
+                dtypes_by_path.setdefault(partition.path, []).append(dtypes)
+        conflicts = {
+            path: CSVDataContainer._conflicting_columns(dtypes)
+            for path, dtypes in dtypes_by_path.items()
+        }
+        again = [
+            position
+            for position, partition in enumerate(partitions)
+            if conflicts.get(partition.path)
+        ]
+        for position in again:
+            partition = partitions[position]
+            partition.dtype = {
+                **(partition.dtype or {}),
+                **conflicts[partition.path],
+            }
+        for position, result in zip(
+            again, self._map(function, [partitions[i] for i in again])
+        ):
+            results[position] = result
+        return [result for result, _ in results]
+
+    def _map(
+        self, function: Callable[[Partition], Any], partitions: List[Partition]
+    ) -> Iterator[Any]:
+        """
+        Apply a function to every partition, yielding the results in partition order.
+        """
+        workers = min(self.workers, len(partitions))
+        if workers <= 1:
+            yield from map(function, partitions)
+            return
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(function, partitions)
+
+    def __repr__(self):
+        return (
+            f"ParallelExecutor(workers={self.workers}, "
+            f"partition_size={self.partition_size})"
+        )
+
+
+def _load_partition(
+    partition: Partition, columns: Optional[List[str]], options: Dict[str, Any]
+) -> Rows:
+    """
+    Load the rows of a partition, in a worker process.
+    """
+    values = partition.shard.partition_values
+    if partition.start is None:
+        data = partition.shard.load(columns, options["trusted"], options["record_tag"])
+        return data if partition.file_type == "csv" else JsonDataView.of(data)
+
+    header = partition.shard.header()
+    with open(partition.path, "rb") as file:
+        file.seek(partition.start)
+        chunk = file.read(partition.end - partition.start)
+    file_columns = partition.shard.file_columns(columns)
+    dtype = partition.dtype
+    if dtype is not None:
+        parsed = file_columns if file_columns is not None else header
+        dtype = {
+            column: column_dtype
+            for column, column_dtype in dtype.items()
+            if column in parsed
+        }
+    data = pd.read_csv(
+        BytesIO(chunk), header=None, names=header, usecols=file_columns, dtype=dtype
+    )
+    return add_partition_columns(CSVDataContainer._restore_bools(data), values, columns)
+
+
+def _apply_predicate(rows: Rows, predicate: Optional[Predicate]) -> Rows:
+    if predicate is None:
+        return rows
+    if isinstance(rows, pd.DataFrame):
+        filterer = CSVFilter(rows)
+        filterer.filter_by_predicate(predicate)
+        return filterer.get_filtered_dataframe()
+    filterer = JSONFilter(rows)
+    filterer.filter_by_predicate(predicate)
+    return filterer.get_filtered_data()
+
+
+def _filter_partition(
+    partition: Partition,
+    predicate: Optional[Predicate],
+    columns: Optional[List[str]],
+    options: Dict[str, Any],
+) -> Tuple[Union[pd.DataFrame, ColumnarJsonDataContainer], int]:
+    """
+    Filter the rows of a partition, in a worker process.
+
+    :return: The kept rows and the number of rows of the partition, and the dtypes
+        of a CSV byte range.
+    """
+    rows = _load_partition(partition, columns, options)
+    length = len(rows)
+    dtypes = _range_dtypes(partition, rows)
+    kept = _apply_predicate(rows, predicate)
+    if isinstance(kept, pd.DataFrame):
+        return (kept, length), dtypes
+    # columnar containers are sent back as a few arrays per column
+    return (kept.to_container(), length), dtypes
+
+
+def _stats_partition(
+    partition: Partition,
+    predicate: Optional[Predicate],
+    columns: Optional[List[str]],
+    select: Optional[List[str]],
+    sketch: Optional[Dict[str, Any]],
+    options: Dict[str, Any],
+) -> Union[FrameStatsAccumulator, StatsAccumulator, SketchAccumulator]:
+    """
+    Accumulate the stats of the rows of a partition matching the predicate, in a
+    worker process.
+
+    :return: The accumulator, and the dtypes of a CSV byte range.
+    """
+    rows = _load_partition(partition, columns, options)
+    dtypes = _range_dtypes(partition, rows)
+    rows = _apply_predicate(rows, predicate)
+    if select is not None:
+        if isinstance(rows, pd.DataFrame):
+            rows = rows[select]
+        else:
+            rows = JsonDataView.of(rows.to_container(keys=select))
+    if sketch is not None:
+        accumulator = SketchAccumulator(**sketch)
+    elif isinstance(rows, pd.DataFrame):
+        accumulator = FrameStatsAccumulator()
+    else:
+        accumulator = StatsAccumulator()
+    if isinstance(rows, pd.DataFrame):
+        accumulator.update_frame(rows)
+    else:
+        accumulator.update_container(rows)
+    return accumulator, dtypes
+
+
+def _range_dtypes(partition: Partition, rows: Rows) -> Optional[Dict[str, Any]]:
+    """
+    Get the dtypes a CSV byte range was parsed with, None for other partitions and for
+    ranges parsed with the dtypes of the whole file.
+    """
+    if partition.start is None or partition.dtype is not None:
+        return None
+    return CSVDataContainer._value_dtypes(rows)
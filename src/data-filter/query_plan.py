@@ -0,0 +1,453 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Set, Union
+import numpy as np
+import pandas as pd
+from .data_loader.factory import Factory
+from .data_loader.sharded_data_loader import (
+    ShardedDataLoader,
+    is_sharded,
+    list_data_files,
+)
+from .filter.csv_filter import CSVFilter
+from .filter.json_filter import JSONFilter
+from .filter.predicate import And, Condition, Predicate
+from .models.data_containers.json_data_view import JsonDataView
+from .parallel import ParallelExecutor
+from .sorter.csv_sorter import CSVSorter
+from .sorter.json_sorter import JsonSorter
+from .stats.csv_stats import CSVStats
+from .stats.json_stats import JSONStats
+from .stats.sketches import SketchAccumulator
+
+"""
+Lazy query plans over one data file, or many data files named by a directory or a glob
+pattern.
+
+A QueryPlan only records the steps it is given; nothing is loaded until it is
+executed. Before execution the steps are optimized:
+
+- filters are moved before the sorts, so that only the kept rows are sorted,
+- adjacent filters are fused into a single predicate, evaluated in one pass,
+- a sort followed by a limit becomes a top-k selection,
+- when the output columns are projected, only the columns read by the plan are loaded.
+
+The leading filter of the optimized plan prunes the files whose partition values (the
+key=value directories of their path) or zone maps cannot match it, before any file is
+opened, and the row groups of CSV files whose zone map cannot match it. A
+plan run with several workers is loaded by a ParallelExecutor, which also applies
+this filter in its worker processes.
+"""
+
+
+Rows = Union[pd.DataFrame, JsonDataView]
+
+
+class PlanStep(ABC):
+    """
+    Base class of the steps of a query plan.
+    """
+
+    @abstractmethod
+    def apply(self, rows: Rows) -> Rows:
+        """
+        Apply the step to a DataFrame or a JsonDataView.
+
+        :param rows: The input rows.
+        :return: The output rows.
+        """
+        pass
+
+    def columns(self) -> Set[str]:
+        """
+        Get the columns/keys the step reads.
+
+        :return: The set of column names.
+        """
+        return set()
+
+
+class FilterStep(PlanStep):
+    """
+    Keep the rows matching a predicate.
+    """
+
+    def __init__(self, predicate: Predicate):
+        self.predicate = predicate
+
+    def apply(self, rows: Rows) -> Rows:
+        if isinstance(rows, pd.DataFrame):
+            filterer = CSVFilter(rows)
+            filterer.filter_by_predicate(self.predicate)
+            return filterer.get_filtered_dataframe()
+        filterer = JSONFilter(rows)
+        filterer.filter_by_predicate(self.predicate)
+        return filterer.get_filtered_data()
+
+    def columns(self) -> Set[str]:
+        return self.predicate.columns()
+
+    def __repr__(self):
+        return f"Filter({self.predicate})"
+
+
+class SortStep(PlanStep):
+    """
+    Sort the rows by one or more keys, keeping the first `limit` rows if given.
+    """
+
+    def __init__(self, keys: List[str], reverse: bool = False, limit: int = None):
+        self.keys = list(keys)
+        self.reverse = reverse
+        self.limit = limit
+
+    def apply(self, rows: Rows) -> Rows:
+        if isinstance(rows, pd.DataFrame):
+            sorter = CSVSorter(rows)
+            if len(self.keys) == 1:
+                sorter.sort_by_column(
+                    self.keys[0], ascending=not self.reverse, limit=self.limit
+                )
+            else:
+                sorter.sort_by_multiple_columns(
+                    self.keys,
+                    ascending=[not self.reverse] * len(self.keys),
+                    limit=self.limit,
+                )
+            return sorter.get_sorted_dataframe()
+        sorter = JsonSorter(rows)
+        if len(self.keys) == 1:
+            sorter.sort_by_key(self.keys[0], reverse=self.reverse, limit=self.limit)
+        else:
+            sorter.sort_by_multiple_keys(
+                self.keys, reverse=self.reverse, limit=self.limit
+            )
+        return sorter.get_sorted_data()
+
+    def columns(self) -> Set[str]:
+        return set(self.keys)
+
+    def __repr__(self):
+        order = "desc" if self.reverse else "asc"
+        if self.limit is None:
+            return f"Sort({', '.join(self.keys)} {order})"
+        return f"TopK({', '.join(self.keys)} {order}, k={self.limit})"
+
+
+class LimitStep(PlanStep):
+    """
+    Keep the first `limit` rows.
+    """
+
+    def __init__(self, limit: int):
+        if limit < 0:
+            raise ValueError("Limit must be a non-negative integer")
+        self.limit = limit
+
+    def apply(self, rows: Rows) -> Rows:
+        if isinstance(rows, pd.DataFrame):
+            return rows.iloc[: self.limit]
+        return rows.select(np.arange(min(self.limit, len(rows))))
+
+    def __repr__(self):
+        return f"Limit({self.limit})"
+
+
+class QueryPlan:
+    """
+    Lazy plan of the steps applied to a data file, built with the filter, where,
+    sort, limit and select methods and run by execute.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        trusted: bool = False,
+        record_tag: str = None,
+        workers: int = 1,
+    ):
+        """
+        :param file_path: The path to the data file, its extension gives the loader, or
+            a directory or glob pattern of data files of the same type.
+        :param trusted: Whether to skip the validation of each JSON item.
+        :param record_tag: The tag of the XML record elements.
+        :param workers: The number of processes loading and filtering the partitions
+            of the data.
+        """
+        if workers < 1:
+            raise ValueError("workers must be a positive integer")
+        self.file_path = file_path
+        self.loader_name = list_data_files(file_path)[0].split(".")[-1]
+        self.trusted = trusted
+        self.record_tag = record_tag
+        self.workers = workers
+        self.steps: List[PlanStep] = []
+        # output columns, all columns if None
+        self.projection: Optional[List[str]] = None
+
+    def filter(self, column: str, value: Any, comparison: str = "eq") -> "QueryPlan":
+        """
+        Keep the rows where the column compares to the value.
+
+        :param column: The column/key to filter by.
+        :param value: The value to compare against.
+        :param comparison: The type of comparison ('eq', 'lt', 'gt').
+        :return: The plan.
+        """
+        if comparison not in ["eq", "lt", "gt"]:
+            raise ValueError("Comparison must be 'eq', 'lt', or 'gt'")
+        return self.where(Condition(column, comparison, value))
+
+    def where(self, predicate: Predicate) -> "QueryPlan":
+        """
+        Keep the rows matching a predicate.
+
+        :param predicate: The predicate, e.g. built with predicate.parse_expression.
+        :return: The plan.
+        """
+        self.steps.append(FilterStep(predicate))
+        return self
+
+    def sort(self, keys: Union[str, List[str]], reverse: bool = False) -> "QueryPlan":
+        """
+        Sort the rows by one or more keys.
+
+        :param keys: The key or list of keys to sort by.
+        :param reverse: Whether to sort in descending order.
+        :return: The plan.
+        """
+        self.steps.append(SortStep([keys] if isinstance(keys, str) else keys, reverse))
+        return self
+
+    def limit(self, limit: int) -> "QueryPlan":
+        """
+        Keep the first rows.
+
+        :param limit: The number of rows to keep.
+        :return: The plan.
+        """
+        self.steps.append(LimitStep(limit))
+        return self
+
+    def select(self, columns: List[str]) -> "QueryPlan":
+        """
+        Only keep some columns in the output.
+
+        :param columns: The columns/keys to keep.
+        :return: The plan.
+        """
+        self.projection = list(columns)
+        return self
+
+    def optimize(self) -> List[PlanStep]:
+        """
+        Rewrite the steps into an equivalent, cheaper list of steps. The plan itself
+        is left unchanged.
+
+        :return: The optimized steps.
+        """
+        steps = list(self.steps)
+
+        # filters commute with the stable sorts, but not with limits
+        moved = True
+        while moved:
+            moved = False
+            for position in range(1, len(steps)):
+                step, previous = steps[position], steps[position - 1]
+                if (
+                    isinstance(step, FilterStep)
+                    and isinstance(previous, SortStep)
+                    and previous.limit is None
+                ):
+                    steps[position - 1], steps[position] = step, previous
+                    moved = True
+
+        optimized: List[PlanStep] = []
+        for step in steps:
+            previous = optimized[-1] if optimized else None
+            if isinstance(step, FilterStep) and isinstance(previous, FilterStep):
+                optimized[-1] = FilterStep(_fuse(previous.predicate, step.predicate))
+            elif isinstance(step, LimitStep) and isinstance(previous, LimitStep):
+                optimized[-1] = LimitStep(min(previous.limit, step.limit))
+            elif isinstance(step, LimitStep) and isinstance(previous, SortStep):
+                limit = step.limit
+                if previous.limit is not None:
+                    limit = min(limit, previous.limit)
+                optimized[-1] = SortStep(previous.keys, previous.reverse, limit)
+            else:
+                optimized.append(step)
+        return optimized
+
+    def load_columns(self) -> Optional[List[str]]:
+        """
+        Get the columns to load: the projected columns plus those read by the steps.
+
+        :return: The columns, or None to load every column.
+        """
+        if self.projection is None:
+            return None
+        columns = list(self.projection)
+        for step in self.steps:
+            columns.extend(
+                column for column in sorted(step.columns()) if column not in columns
+            )
+        return columns
+
+    def explain(self) -> str:
+        """
+        Describe the optimized plan, one step per line.
+
+        :return: The description.
+        """
+        columns = self.load_columns()
+        options = ""
+        if columns is not None:
+            options += f", columns=[{', '.join(columns)}]"
+        if is_sharded(self.file_path):
+            shards = self._sharded_loader()
+            options += (
+                f", shards={len(shards.prune(self._leading_predicate()))}"
+                f"/{len(shards.shards)}"
+            )
+        if self.is_parallel:
+            options += f", workers={self.workers}"
+        lines = [f"Load({self.file_path}{options})"]
+        lines.extend(repr(step) for step in self.optimize())
+        if self.projection is not None:
+            lines.append(f"Select({', '.join(self.projection)})")
+        return "\n".join(lines)
+
+    def execute(self) -> Rows:
+        """
+        Load the file and run the optimized steps.
+
+        :return: A DataFrame for CSV files, a JsonDataView over a columnar container for
+            JSON, XML and YAML files.
+        """
+        steps = self.optimize()
+        if self.is_parallel:
+            predicate = None
+            if steps and isinstance(steps[0], FilterStep):
+                predicate = steps.pop(0).predicate
+            rows = self._executor().filter(
+                self.file_path, predicate, columns=self.load_columns()
+            )
+        else:
+            rows = self._load(self._leading_predicate())
+        for step in steps:
+            rows = step.apply(rows)
+        if self.projection is not None:
+            if isinstance(rows, pd.DataFrame):
+                rows = rows[self.projection]
+            else:
+                rows = JsonDataView.of(rows.to_container(keys=self.projection))
+        return rows
+
+    def stats(self, sketch: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Compute the stats of the result of the plan. When the data is loaded in parallel
+        and the plan only filters, every worker computes the stats of its partition and
+        only the accumulators are merged, without gathering the rows. Approximate stats
+        of a plan which only filters are always computed a partition at a time.
+
+        :param sketch: The error bounds of the approximate stats, as SketchAccumulator
+            arguments, None for the exact stats.
+        :return: The stats, as returned by CSVStats and JSONStats.get_all_stats, or by
+            SketchAccumulator.get_all_stats.
+        """
+        steps = self.optimize()
+        only_filters = all(isinstance(step, FilterStep) for step in steps)
+        if only_filters and (self.is_parallel or sketch is not None):
+            return self._executor().stats(
+                self.file_path,
+                steps[0].predicate if steps else None,
+                columns=self.load_columns(),
+                select=self.projection,
+                sketch=sketch,
+            )
+        rows = self.execute()
+        if sketch is not None:
+            accumulator = SketchAccumulator(**sketch)
+            if isinstance(rows, pd.DataFrame):
+                accumulator.update_frame(rows)
+            else:
+                accumulator.update_container(rows)
+            return accumulator.get_all_stats()
+        if isinstance(rows, pd.DataFrame):
+            return CSVStats(rows).get_all_stats()
+        return JSONStats(rows).get_all_stats()
+
+    @property
+    def is_parallel(self) -> bool:
+        return self.workers > 1
+
+    def _leading_predicate(self) -> Optional[Predicate]:
+        """
+        Get the predicate of the filter run first by the optimized plan, which every
+        row of the result matches.
+        """
+        steps = self.optimize()
+        if steps and isinstance(steps[0], FilterStep):
+            return steps[0].predicate
+        return None
+
+    def _sharded_loader(self) -> ShardedDataLoader:
+        return ShardedDataLoader(
+            self.file_path, trusted=self.trusted, record_tag=self.record_tag
+        )
+
+    def _executor(self) -> ParallelExecutor:
+        if self.loader_name == "xml" and self.record_tag is None:
+            raise ValueError("A record tag is required to load XML records")
+        return ParallelExecutor(
+            self.workers, trusted=self.trusted, record_tag=self.record_tag
+        )
+
+    def _load(self, predicate: Predicate = None) -> Rows:
+        """
+        Load the data in this process, the files of a sharded dataset and the row
+        groups of CSV files which cannot match the predicate being skipped.
+        """
+        if self.loader_name == "xml" and self.record_tag is None:
+            raise ValueError("A record tag is required to load XML records")
+        columns = self.load_columns()
+        if is_sharded(self.file_path):
+            data_loader = self._sharded_loader()
+            if self.loader_name == "csv":
+                data = data_loader.load_data(usecols=columns, predicate=predicate)
+            else:
+                data = data_loader.load_columnar_data(keys=columns, predicate=predicate)
+        else:
+            data_loader = Factory.get_data_loader(
+                loader_name=self.loader_name,
+                data_source=self.file_path,
+                trusted=self.trusted,
+                record_tag=self.record_tag,
+            )
+            if self.loader_name == "csv":
+                data = data_loader.load_data(usecols=columns, predicate=predicate)
+            else:
+                data = data_loader.load_columnar_data(keys=columns)
+        if data is None:
+            raise ValueError(f"Could not load {self.file_path}")
+        if self.loader_name == "csv":
+            return data
+        return JsonDataView.of(data)
+
+    def __repr__(self):
+        return f"QueryPlan(file_path={self.file_path}, steps={self.steps})"
+
+    def __str__(self):
+        return self.explain()
+
+
+def _fuse(first: Predicate, second: Predicate) -> Predicate:
+    """
+    Combine two predicates into a single flat And.
+    """
+    operands = []
+    for predicate in (first, second):
+        if isinstance(predicate, And):
+            operands.extend(predicate.operands)
+        else:
+            operands.append(predicate)
+    return And(*operands)
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from typing import List
 from .base_sorter import BaseSorter
@@ -8,27 +9,116 @@ class CSVSorter(BaseSorter):
     def __init__(self, dataframe: pd.DataFrame):
         self.dataframe = dataframe
 
-    def sort_by_column(self, column: str, ascending: bool = True):
+    @property
+    def dataframe(self) -> pd.DataFrame:
+        """
+        The sorted rows. The sorts only reorder a selection vector over the original
+        DataFrame, which is copied once when the sorted rows are accessed.
+        """
+        if self._frame is None:
+            self._frame = self._base.iloc[self._order]
+        return self._frame
+
+    @dataframe.setter
+    def dataframe(self, dataframe: pd.DataFrame):
+        self._base = dataframe
+        self._frame = dataframe
+        # positions of the rows of the original DataFrame, in sorted order
+        self._order = np.arange(len(dataframe))
+
+    def sort_by_column(self, column: str, ascending: bool = True, limit: int = None):
         """
         Sort the DataFrame by a specific column.
 
         :param column: The column to sort by.
         :param ascending: Whether to sort in ascending order.
+        :param limit: Only keep the first `limit` rows of the sorted DataFrame, selected
+            with nsmallest/nlargest without sorting the other rows.
         """
-        self.dataframe = self.dataframe.sort_values(by=column, ascending=ascending)
+        self._check_limit(limit)
+        keys = self._keys([column])
+        if limit is not None and limit < len(keys):
+            series = keys[column]
+            try:
+                top = series.nsmallest(limit) if ascending else series.nlargest(limit)
+            except TypeError:
+                # nsmallest/nlargest only support numeric columns
+                top = None
+            if top is not None:
+                positions = top.index.to_numpy()
+                if len(positions) < limit:
+                    # like sort_values, rows with a missing value are placed last
+                    missing = np.flatnonzero(series.isna().to_numpy())
+                    positions = np.concatenate(
+                        [positions, missing[: limit - len(positions)]]
+                    )
+                self._order = self._order[positions]
+                self._frame = None
+                return
+        self._reorder(
+            keys.sort_values(by=column, ascending=ascending, kind="stable"), limit
+        )
 
     def sort_by_multiple_columns(
-        self, columns: List[str], ascending: List[bool] = None
+        self, columns: List[str], ascending: List[bool] = None, limit: int = None
     ):
         """
         Sort the DataFrame by multiple columns.
 
         :param columns: The list of columns to sort by.
         :param ascending: List of booleans indicating sort order for each column.
+        :param limit: Only keep the first `limit` rows of the sorted DataFrame.
         """
+        self._check_limit(limit)
         if ascending is None:
             ascending = [True] * len(columns)
-        self.dataframe = self.dataframe.sort_values(by=columns, ascending=ascending)
+        keys = self._keys(columns)
+        if (
+            limit is not None
+            and limit < len(keys)
+            and len(set(ascending)) == 1
+            and not keys.isna().to_numpy().any()
+        ):
+            try:
+                if ascending[0]:
+                    top = keys.nsmallest(limit, columns)
+                else:
+                    top = keys.nlargest(limit, columns)
+            except TypeError:
+                # nsmallest/nlargest only support numeric columns
+                top = None
+            if top is not None:
+                self._reorder(top)
+                return
+        self._reorder(keys.sort_values(by=columns, ascending=ascending), limit)
+
+    def _keys(self, columns: List[str]) -> pd.DataFrame:
+        """
+        Get the sort key columns of the rows in their current order, indexed by position.
+
+        :param columns: The sort key columns.
+        :return: The key columns.
+        """
+        if self._frame is not None:
+            keys = self._frame[columns]
+        else:
+            keys = self._base[columns].iloc[self._order]
+        return keys.reset_index(drop=True)
+
+    def _reorder(self, sorted_keys: pd.DataFrame, limit: int = None):
+        """
+        Reorder the selection vector like the sorted key columns.
+
+        :param sorted_keys: The key columns returned by _keys, once sorted.
+        :param limit: The number of rows to keep, all rows if None.
+        """
+        self._order = self._order[sorted_keys.index.to_numpy()[:limit]]
+        self._frame = None
+
+    @staticmethod
+    def _check_limit(limit: int):
+        if limit is not None and limit < 0:
+            raise ValueError("Limit must be a non-negative integer")
 
     def get_sorted_dataframe(self) -> pd.DataFrame:
         """
@@ -42,7 +132,7 @@ class CSVSorter(BaseSorter):
         return f"CSVSorter(dataframe={self.dataframe})"
 
     def __str__(self):
-        return f"CSVSorter with {len(self.dataframe)} rows"
+        return f"CSVSorter with {len(self._order)} rows"
 
 
 if __name__ == "__main__":
@@ -0,0 +1,404 @@
+from ..data_loader.json_data_loader import JsonDataLoader
+from ..models.data_containers.csv_data_container import CSVDataContainer
+from typing import Any, Callable, Iterable, Iterator, List, Tuple, Union
+import csv, heapq, json, os, sys, tempfile
+from operator import itemgetter
+from .base_sorter import BaseSorter
+from .json_sorter import JsonSorter
+
+"""
+External merge sort of JSON and CSV files larger than memory.
+
+Records are buffered until the memory budget is reached, then the buffer is sorted and
+spilled to a temporary run file. Runs are finally merged k at a time with a heap and the
+merged records are streamed to the output file, so memory stays bounded by the budget
+plus one read buffer per merged run.
+"""
+
+
+# approximate per record memory of the buffer on top of the serialized record:
+# the list slot, the (key, line) tuple and the key object
+_RECORD_OVERHEAD = 200
+
+
+# the strings read_csv reads as missing values by default
+_CSV_NA_VALUES = frozenset(
+    [
+        "",
+        "#N/A",
+        "#N/A N/A",
+        "#NA",
+        "-1.#IND",
+        "-1.#QNAN",
+        "-NaN",
+        "-nan",
+        "1.#IND",
+        "1.#QNAN",
+        "<NA>",
+        "N/A",
+        "NA",
+        "NULL",
+        "NaN",
+        "None",
+        "n/a",
+        "nan",
+        "null",
+    ]
+)
+
+
+def _parse_bool(value: str) -> bool:
+    if value.lower() == "true":
+        return True
+    if value.lower() == "false":
+        return False
+    raise ValueError(f"Not a boolean: {value}")
+
+
+_CSV_VALUE_PARSERS = {"int": int, "float": float, "bool": _parse_bool, "str": str}
+
+
+def _parse_csv_value(
+    fields: List[str], position: int, parse: Callable[[str], Any]
+) -> Any:
+    """
+    Parse a field of a CSV record, None if it is missing.
+    """
+    if position >= len(fields) or fields[position] in _CSV_NA_VALUES:
+        return None
+    return parse(fields[position])
+
+
+class _SortKey:
+    """
+    Sort key of one record, comparing its values key by key in the direction of each
+    key. Missing values are placed last in both directions.
+    """
+
+    __slots__ = ("values", "reverse")
+
+    def __init__(self, values: List[Any], reverse: List[bool]):
+        self.values = values
+        self.reverse = reverse
+
+    def __lt__(self, other: "_SortKey") -> bool:
+        for value, other_value, reverse in zip(self.values, other.values, self.reverse):
+            if value == other_value:
+                continue
+            if value is None:
+                return False
+            if other_value is None:
+                return True
+            return value > other_value if reverse else value < other_value
+        return False
+
+    def __eq__(self, other: "_SortKey") -> bool:
+        # heapq.merge compares [key, run index, ...] lists, which needs == on keys to
+        # fall back to the run index, keeping the merge stable
+        return self.values == other.values
+
+
+class ExternalSorter(BaseSorter):
+
+    def __init__(
+        self,
+        keys: List[str],
+        reverse: Union[bool, List[bool]] = False,
+        memory_budget: int = 256 * 1024 * 1024,
+        temp_dir: str = None,
+        max_fan_in: int = 64,
+    ):
+        """
+        :param keys: The keys/columns to sort by.
+        :param reverse: Whether to sort in descending order, for all keys or per key.
+        :param memory_budget: The maximum size in bytes of the records held in memory.
+        :param temp_dir: The directory of the run files, the system default if None.
+        :param max_fan_in: The maximum number of runs merged at once.
+        """
+        if not keys:
+            raise ValueError("At least one sort key is required")
+        if isinstance(reverse, bool):
+            reverse = [reverse] * len(keys)
+        if len(reverse) != len(keys):
+            raise ValueError("reverse must have one entry per sort key")
+        if memory_budget <= 0:
+            raise ValueError("memory_budget must be a positive number of bytes")
+        if max_fan_in < 2:
+            raise ValueError("max_fan_in must be at least 2")
+        self.keys = list(keys)
+        self.reverse = list(reverse)
+        self.memory_budget = memory_budget
+        self.temp_dir = temp_dir
+        self.max_fan_in = max_fan_in
+        # number of run files written by the last sort
+        self.run_count = 0
+
+    def sort_json_file(
+        self, data_source: str, output_path: str, trusted: bool = False
+    ) -> int:
+        """
+        Sort the items of a JSON file into another JSON file of the same format.
+        Sort keys follow JsonSorter: lists are sorted by their first element.
+
+        :param data_source: The path to the JSON file.
+        :param output_path: The path of the sorted JSON file.
+        :param trusted: Whether to skip the validation of each item.
+        :return: The number of sorted items.
+        """
+        keys = self.keys
+        items = (
+            item.item
+            for item in JsonDataLoader(data_source, trusted=trusted).iter_data()
+        )
+        count = 0
+        with open(output_path, "w", encoding="utf-8") as output:
+            output.write('{"data": [')
+            for item in self.sort_records(
+                items,
+                lambda item: [JsonSorter._get_sort_key(item.get(key)) for key in keys],
+            ):
+                output.write(",\n" if count else "\n")
+                output.write(json.dumps({"item": item}))
+                count += 1
+            output.write("\n]}\n")
+        return count
+
+    def sort_csv_file(
+        self, data_source: str, output_path: str, chunksize: int = 10_000
+    ) -> int:
+        """
+        Sort the rows of a CSV file into another CSV file with the same columns.
+        Like DataFrame.sort_values, missing values are placed last.
+
+        The rows are written as they are in the file, byte for byte: only the values
+        of the sort columns are parsed, with the type read_csv gives to the whole column.
+
+        :param data_source: The path to the CSV file.
+        :param output_path: The path of the sorted CSV file.
+        :param chunksize: The number of rows parsed at a time to find the type of the
+            sort columns.
+        :return: The number of sorted rows.
+        """
+        with open(data_source, "r", encoding="utf-8", newline="") as file:
+            records = self._iter_csv_records(file)
+            header, header_line = next(records, (None, None))
+            if header is None:
+                raise ValueError(f"No columns to parse from file: {data_source}")
+            missing = [key for key in self.keys if key not in header]
+            if missing:
+                raise KeyError(f"Unknown sort columns: {', '.join(missing)}")
+            positions = [header.index(key) for key in self.keys]
+            parsers = [
+                _CSV_VALUE_PARSERS[kind]
+                for kind in self._csv_key_kinds(data_source, chunksize)
+            ]
+            line_break = "\r\n" if header_line.endswith("\r\n") else "\n"
+
+            # the records are the values of the sort columns and the raw text of the row
+            keyed_records = (
+                (
+                    [
+                        _parse_csv_value(fields, position, parse)
+                        for position, parse in zip(positions, parsers)
+                    ],
+                    text,
+                )
+                for fields, text in records
+            )
+
+            count = 0
+            with open(output_path, "w", encoding="utf-8", newline="") as output:
+                output.write(header_line)
+                if not header_line.endswith("\n"):
+                    output.write(line_break)
+                for _, line in self.sort_records(keyed_records, itemgetter(0)):
+                    output.write(line)
+                    if not line.endswith("\n"):
+                        # the last line of the file may have no line break
+                        output.write(line_break)
+                    count += 1
+        return count
+
+    def _csv_key_kinds(self, data_source: str, chunksize: int) -> List[str]:
+        """
+        Find the type of each sort column over the whole file, as read_csv infers it
+        when reading the file at once: a column is numeric only if it is numeric in
+        every chunk.
+
+        :param data_source: The path to the CSV file.
+        :param chunksize: The number of rows parsed at a time.
+        :return: The type of each sort column: "int", "float", "bool" or "str".
+        """
+        kinds = {key: set() for key in self.keys}
+        for chunk in CSVDataContainer._iter_pandas_chunks(
+            data_source, chunksize=chunksize, usecols=self.keys
+        ):
+            for key in self.keys:
+                column = chunk[key]
+                if column.isna().all():
+                    # an empty chunk is parsed as floats whatever the column holds
+                    continue
+                kinds[key].add(column.dtype.kind)
+        result = []
+        for key in self.keys:
+            if kinds[key] <= {"i", "u"}:
+                result.append("int")
+            elif kinds[key] <= {"i", "u", "f"}:
+                result.append("float")
+            elif kinds[key] == {"b"}:
+                result.append("bool")
+            else:
+                result.append("str")
+        return result
+
+    @staticmethod
+    def _iter_csv_records(file) -> Iterator[Tuple[List[str], str]]:
+        """
+        Read the records of a CSV file with their raw text, which spans several lines
+        when a quoted field holds line breaks. Blank lines are skipped, as read_csv does.
+
+        :param file: The CSV file, opened with newline="".
+        :return: An iterator over the fields and the raw text of each record.
+        """
+        lines: List[str] = []
+
+        def read_lines() -> Iterator[str]:
+            for line in file:
+                lines.append(line)
+                yield line
+
+        # the reader pulls the lines of one record at a time
+        for fields in csv.reader(read_lines()):
+            text = "".join(lines)
+            lines.clear()
+            if fields:
+                yield fields, text
+
+    def sort_records(
+        self, records: Iterable[Any], key: Callable[[Any], List[Any]]
+    ) -> Iterator[Any]:
+        """
+        Sort a stream of JSON serializable records in bounded memory. The sort is stable.
+
+        :param records: The records to sort.
+        :param key: Function returning the values of the sort keys of a record.
+        :return: An iterator over the sorted records.
+        """
+        runs = []
+        try:
+            runs, buffer = self._spill_runs(records, key)
+            self.run_count = len(runs)
+            if not runs:
+                # everything fit in the memory budget, no need for run files
+                buffer.sort(key=itemgetter(0))
+                for _, line in buffer:
+                    yield json.loads(line)[1]
+                return
+            if buffer:
+                runs.append(self._flush(buffer))
+                self.run_count += 1
+            while len(runs) > self.max_fan_in:
+                # merge the first runs together, keeping the runs in input order
+                merged = self._write_run(self._merge(runs[: self.max_fan_in]))
+                self._remove(runs[: self.max_fan_in])
+                runs = [merged] + runs[self.max_fan_in :]
+            for _, record in self._merge(runs):
+                yield record
+        finally:
+            self._remove(runs)
+
+    def _spill_runs(
+        self, records: Iterable[Any], key: Callable[[Any], List[Any]]
+    ) -> Tuple[List[str], List[Tuple[_SortKey, str]]]:
+        """
+        Buffer the records until the memory budget is reached, then sort the buffer and
+        write it to a run file.
+
+        :param records: The records to sort.
+        :param key: Function returning the values of the sort keys of a record.
+        :return: The paths of the run files in input order, and the buffered records
+            that were not written to a run.
+        """
+        runs = []
+        buffer: List[Tuple[_SortKey, str]] = []
+        size = 0
+        try:
+            for record in records:
+                values = key(record)
+                # records are held serialized, which is both compact and measurable
+                line = json.dumps([values, record])
+                buffer.append((_SortKey(values, self.reverse), line))
+                size += sys.getsizeof(line) + _RECORD_OVERHEAD
+                if size >= self.memory_budget:
+                    runs.append(self._flush(buffer))
+                    buffer, size = [], 0
+        except BaseException:
+            self._remove(runs)
+            raise
+        return runs, buffer
+
+    def _flush(self, buffer: List[Tuple[_SortKey, str]]) -> str:
+        """
+        Sort a buffer of records and write it to a new run file.
+
+        :param buffer: The sort keys and serialized records.
+        :return: The path of the run file.
+        """
+        buffer.sort(key=itemgetter(0))
+        descriptor, path = tempfile.mkstemp(
+            prefix="data-filter-run-", suffix=".jsonl", dir=self.temp_dir
+        )
+        with os.fdopen(descriptor, "w", encoding="utf-8") as run:
+            for _, line in buffer:
+                run.write(line)
+                run.write("\n")
+        return path
+
+    def _write_run(self, entries: Iterator[Tuple[_SortKey, Any]]) -> str:
+        """
+        Write already sorted entries to a new run file.
+
+        :param entries: The sort keys and records, in sorted order.
+        :return: The path of the run file.
+        """
+        descriptor, path = tempfile.mkstemp(
+            prefix="data-filter-run-", suffix=".jsonl", dir=self.temp_dir
+        )
+        with os.fdopen(descriptor, "w", encoding="utf-8") as run:
+            for sort_key, record in entries:
+                run.write(json.dumps([sort_key.values, record]))
+                run.write("\n")
+        return path
+
+    def _read_run(self, path: str) -> Iterator[Tuple[_SortKey, Any]]:
+        """
+        Read the entries of a run file.
+
+        :param path: The path of the run file.
+        :return: An iterator over the sort keys and records.
+        """
+        with open(path, "r", encoding="utf-8") as run:
+            for line in run:
+                values, record = json.loads(line)
+                yield _SortKey(values, self.reverse), record
+
+    def _merge(self, runs: List[str]) -> Iterator[Tuple[_SortKey, Any]]:
+        """
+        K-way merge of sorted runs. Equal keys keep the order of the runs.
+
+        :param runs: The paths of the run files, in input order.
+        :return: An iterator over the merged sort keys and records.
+        """
+        return heapq.merge(*(self._read_run(path) for path in runs), key=itemgetter(0))
+
+    @staticmethod
+    def _remove(runs: List[str]):
+        for path in runs:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def __repr__(self):
+        return f"ExternalSorter(keys={self.keys}, reverse={self.reverse}, memory_budget={self.memory_budget})"
+
+    def __str__(self):
+        return f"ExternalSorter by {', '.join(self.keys)}"
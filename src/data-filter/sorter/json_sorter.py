@@ -1,39 +1,193 @@
 from ..models.data_containers.json_data_container import JsonDataContainer
-from typing import List
+from ..models.data_containers.columnar_json_data_container import (
+    ColumnarJsonDataContainer,
+)
+from ..models.data_containers.columns import MISSING, build_column
+from ..models.data_containers.json_data_view import JsonDataView
+from typing import List, Tuple, Union
+import heapq
+import numpy as np
 from .base_sorter import BaseSorter
 
 
 class JsonSorter(BaseSorter):
 
-    def __init__(self, data_container: JsonDataContainer):
-        self.data_container = data_container
+    def __init__(
+        self,
+        data_container: Union[
+            JsonDataContainer, ColumnarJsonDataContainer, JsonDataView
+        ],
+    ):
+        # the sorters reorder a view of the container, the container itself is never modified
+        self.data_container = JsonDataView.of(data_container)
 
-    def sort_by_key(self, key: str, reverse: bool = False):
+    def sort_by_key(self, key: str, reverse: bool = False, limit: int = None):
         """
         Sort the data container by a specific key.
 
         :param key: The key to sort by.
         :param reverse: Whether to sort in descending order.
+        :param limit: Only keep the first `limit` rows of the sorted data, selected
+            without sorting the other rows.
         """
-        self.data_container.data.sort(
-            key=lambda item: self._get_sort_key(item.item.get(key)), reverse=reverse
+        self._check_limit(limit)
+        if self.data_container.is_columnar:
+            column = self.data_container.column(key)
+            sort_keys = column.sort_keys() if column is not None else None
+            if sort_keys is not None:
+                order = self._argsort(*sort_keys, reverse=reverse, limit=limit)
+                self.data_container = self.data_container.select(order)
+                return
+
+        self._reorder(
+            [self._get_sort_key(item.get(key)) for item in self.data_container.items()],
+            reverse=reverse,
+            limit=limit,
         )
 
-    def sort_by_multiple_keys(self, keys: List[str], reverse: bool = False):
+    def sort_by_multiple_keys(
+        self,
+        keys: List[str],
+        reverse: bool = False,
+        limit: int = None,
+        nulls: str = "last",
+    ):
         """
         Sort the data container by multiple keys.
 
+        The sort key of every row is extracted once per key into a typed array, then the
+        rows are ordered with a stable np.lexsort. Rows without a value for a key
+        (missing, None or empty list) are grouped before or after the others.
+
         :param keys: The list of keys to sort by.
         :param reverse: Whether to sort in descending order.
+        :param limit: Only keep the first `limit` rows of the sorted data.
+        :param nulls: 'first' or 'last', where to place the rows without a value.
         """
-        self.data_container.data.sort(
-            key=lambda item: tuple(
-                self._get_sort_key(item.item.get(key)) for key in keys
-            ),
-            reverse=reverse,
+        self._check_limit(limit)
+        if nulls not in ("first", "last"):
+            raise ValueError("nulls must be 'first' or 'last'")
+
+        # np.lexsort sorts by the last array first
+        arrays = []
+        for key in reversed(keys):
+            sort_keys, valid = self._extract_sort_keys(key)
+            sort_keys = np.where(valid, sort_keys, 0)
+            if reverse:
+                # negate the rank of the keys, not the keys: -x overflows for the int64
+                # minimum and does not reverse unsigned or bool keys
+                ranks = np.unique(sort_keys, return_inverse=True)[1].reshape(-1)
+                sort_keys = -ranks
+            arrays.append(sort_keys)
+            arrays.append(~valid if nulls == "last" else valid)
+        if arrays:
+            order = np.lexsort(arrays)
+        else:
+            order = np.arange(len(self.data_container))
+        self.data_container = self.data_container.select(order[:limit])
+
+    def _extract_sort_keys(self, key: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Compute the sort key of every row of the view for one key, with the semantics of
+        _get_sort_key, as a numeric array.
+
+        :param key: The key to sort by.
+        :return: The sort keys, and the mask of the rows having one.
+        """
+        view = self.data_container
+        if view.is_columnar:
+            column = view.column(key)
+            if column is None:
+                return np.zeros(len(view), dtype=np.int8), np.zeros(len(view), bool)
+            sort_keys = column.sort_keys()
+            if sort_keys is not None:
+                return sort_keys
+            values = column.to_list()
+        else:
+            values = [item.get(key) for item in view.items()]
+
+        values = [self._get_sort_key(value) for value in values]
+        column = build_column([MISSING if value is None else value for value in values])
+        sort_keys = column.sort_keys()
+        if sort_keys is not None:
+            return sort_keys
+        # mixed types, e.g. int and bool: rank the distinct values, which raises a
+        # TypeError for values that cannot be compared, as list.sort does
+        ranks = {
+            value: rank
+            for rank, value in enumerate(
+                sorted({value for value in values if value is not None})
+            )
+        }
+        sort_keys = np.fromiter(
+            (ranks.get(value, 0) for value in values), dtype=np.int64, count=len(values)
         )
+        return sort_keys, column.present
+
+    def _reorder(self, sort_keys: List, reverse: bool, limit: int = None):
+        """
+        Reorder the view by the sort key of each of its rows, with the same stable
+        ordering as list.sort. Rows without a sort key are placed last, as in _argsort.
+        With a limit, the first rows are selected with a heap in O(n log limit).
+
+        :param sort_keys: The sort key of every row of the view, None for rows without
+            one.
+        :param reverse: Whether to sort in descending order.
+        :param limit: The number of rows to keep, all rows if None.
+        """
+        rows = [row for row, sort_key in enumerate(sort_keys) if sort_key is not None]
+        missing = [row for row, sort_key in enumerate(sort_keys) if sort_key is None]
+        if limit is None:
+            order = sorted(rows, key=sort_keys.__getitem__, reverse=reverse)
+        elif reverse:
+            order = heapq.nlargest(limit, rows, key=sort_keys.__getitem__)
+        else:
+            order = heapq.nsmallest(limit, rows, key=sort_keys.__getitem__)
+        self.data_container = self.data_container.select((order + missing)[:limit])
+
+    @staticmethod
+    def _check_limit(limit: int):
+        if limit is not None and limit < 0:
+            raise ValueError("Limit must be a non-negative integer")
+
+    @staticmethod
+    def _argsort(
+        keys: np.ndarray, valid: np.ndarray, reverse: bool, limit: int = None
+    ) -> np.ndarray:
+        """
+        Stable argsort of the rows having a sort key, rows without one are placed last.
+        Like list.sort, equal keys keep their original order in both directions.
+
+        With a limit, the rows that can be among the first `limit` ones are found with
+        np.partition in O(n), so only them are sorted.
 
-    def _get_sort_key(self, value):
+        :param keys: The sort key of every row.
+        :param valid: The mask of the rows having a sort key.
+        :param reverse: Whether to sort in descending order.
+        :param limit: The number of rows to keep, all rows if None.
+        :return: The positions of the rows in sorted order.
+        """
+        rows = np.flatnonzero(valid)
+        missing = np.flatnonzero(~valid)
+        if limit is not None and 0 < limit < len(rows):
+            candidates = keys[rows]
+            if reverse:
+                kth = len(rows) - limit
+                rows = rows[candidates >= np.partition(candidates, kth)[kth]]
+            else:
+                rows = rows[
+                    candidates <= np.partition(candidates, limit - 1)[limit - 1]
+                ]
+            missing = missing[:0]
+        if reverse:
+            rows = rows[::-1]
+            order = rows[np.argsort(keys[rows], kind="stable")[::-1]]
+        else:
+            order = rows[np.argsort(keys[rows], kind="stable")]
+        return np.concatenate([order, missing])[:limit]
+
+    @staticmethod
+    def _get_sort_key(value):
         """
         Helper function to get the sort key.
 
@@ -44,11 +198,12 @@ class JsonSorter(BaseSorter):
             return value[0] if value else None
         return value
 
-    def get_sorted_data(self) -> JsonDataContainer:
+    def get_sorted_data(self) -> JsonDataView:
         """
-        Get the sorted data container.
+        Get the sorted data, as a view over the rows of the original data container.
+        Use JsonDataView.to_container to materialize it.
 
-        :return: The sorted JsonDataContainer.
+        :return: The sorted JsonDataView.
         """
         return self.data_container
 
@@ -0,0 +1,529 @@
+from ..models.data_containers.json_data_container import JsonDataContainer, JsonDataItem
+from ..models.data_containers.columnar_json_data_container import (
+    ColumnarJsonDataContainer,
+)
+from ..models.data_containers.json_data_view import JsonDataView
+from ..models.data_containers.columns import (
+    BoolColumn,
+    ListColumn,
+    NumericColumn,
+    ObjectColumn,
+)
+from typing import Any, Dict, Iterable, Union
+import numpy as np
+import pandas as pd
+
+
+def _json_value(value: Any) -> Any:
+    # NumPy scalars of the aggregates
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class RunningAggregate:
+    """
+    Running count, min, max and sum of a stream of numbers.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.min = None
+        self.max = None
+        self.sum = 0
+
+    def add(self, value: Any):
+        """
+        Add one value to the aggregate.
+
+        :param value: The value to add.
+        """
+        if self.count == 0:
+            self.min = self.max = value
+        elif value < self.min:
+            self.min = value
+        elif value > self.max:
+            self.max = value
+        self.count += 1
+        self.sum += value
+
+    def add_array(self, values: np.ndarray):
+        """
+        Add every value of an array to the aggregate.
+
+        :param values: The values to add.
+        """
+        if len(values) == 0:
+            return
+        other = RunningAggregate()
+        other.count = len(values)
+        other.min = values.min()
+        other.max = values.max()
+        other.sum = values.sum()
+        self.merge(other)
+
+    def merge(self, other: "RunningAggregate"):
+        """
+        Merge the values added to another aggregate into this one.
+
+        :param other: The aggregate to merge.
+        """
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.min, self.max = other.min, other.max
+        else:
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+        self.count += other.count
+        self.sum += other.sum
+
+    @property
+    def average(self) -> float:
+        return self.sum / self.count
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get the state of the aggregate as JSON values.
+
+        :return: The count, min, max and sum.
+        """
+        return {
+            "count": self.count,
+            "min": _json_value(self.min),
+            "max": _json_value(self.max),
+            "sum": _json_value(self.sum),
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "RunningAggregate":
+        """
+        Restore an aggregate from its state.
+
+        :param state: The state, as returned by to_dict.
+        :return: The aggregate.
+        """
+        aggregate = cls()
+        aggregate.count = state["count"]
+        aggregate.min = state["min"]
+        aggregate.max = state["max"]
+        aggregate.sum = state["sum"]
+        return aggregate
+
+
+class FieldAccumulator:
+    """
+    Running statistics of one key: numeric values (numeric lists count as their size),
+    true/false counts and list sizes.
+    """
+
+    def __init__(self):
+        self.numeric = RunningAggregate()
+        self.list_sizes = RunningAggregate()
+        self.true_count = 0
+        self.false_count = 0
+
+    def add(self, value: Any):
+        """
+        Add one value of the key.
+
+        :param value: The value to add.
+        """
+        if isinstance(value, bool):
+            self.numeric.add(value)
+            if value:
+                self.true_count += 1
+            else:
+                self.false_count += 1
+        elif isinstance(value, (int, float)):
+            self.numeric.add(value)
+        elif isinstance(value, list):
+            self.list_sizes.add(len(value))
+            if all(isinstance(i, (int, float)) for i in value):
+                self.numeric.add(len(value))
+
+    def merge(self, other: "FieldAccumulator"):
+        """
+        Merge the values added to another accumulator into this one.
+
+        :param other: The accumulator to merge.
+        """
+        self.numeric.merge(other.numeric)
+        self.list_sizes.merge(other.list_sizes)
+        self.true_count += other.true_count
+        self.false_count += other.false_count
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get the state of the accumulator as JSON values.
+
+        :return: The state of the running aggregates and the true/false counts.
+        """
+        return {
+            "numeric": self.numeric.to_dict(),
+            "list_sizes": self.list_sizes.to_dict(),
+            "true_count": self.true_count,
+            "false_count": self.false_count,
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "FieldAccumulator":
+        """
+        Restore an accumulator from its state.
+
+        :param state: The state, as returned by to_dict.
+        :return: The accumulator.
+        """
+        field = cls()
+        field.numeric = RunningAggregate.from_dict(state["numeric"])
+        field.list_sizes = RunningAggregate.from_dict(state["list_sizes"])
+        field.true_count = state["true_count"]
+        field.false_count = state["false_count"]
+        return field
+
+
+class StatsAccumulator:
+    """
+    Computes the numeric, boolean and list statistics of JSON data in a single pass,
+    keeping running aggregates per key: memory is O(keys) whatever the number of items.
+
+    Items can be fed one at a time or in batches, e.g. from JsonDataLoader.iter_data, and
+    accumulators computed on separate parts of the data can be merged.
+    """
+
+    def __init__(self):
+        self.fields: Dict[str, FieldAccumulator] = {}
+
+    def _field(self, key: str) -> FieldAccumulator:
+        field = self.fields.get(key)
+        if field is None:
+            field = self.fields[key] = FieldAccumulator()
+        return field
+
+    def update(self, item: Dict[str, Any]):
+        """
+        Add the values of one item.
+
+        :param item: The item dict.
+        """
+        for key, value in item.items():
+            self._field(key).add(value)
+
+    def update_container(
+        self,
+        data_container: Union[
+            JsonDataContainer, ColumnarJsonDataContainer, JsonDataView
+        ],
+    ):
+        """
+        Add the values of every item of a data container. Columnar containers are
+        aggregated column by column with NumPy.
+
+        :param data_container: The data container, or a view of one.
+        """
+        if isinstance(data_container, JsonDataView):
+            if not data_container.is_columnar:
+                for item in data_container.items():
+                    self.update(item)
+                return
+            data_container = data_container.to_container()
+
+        if not isinstance(data_container, ColumnarJsonDataContainer):
+            for item in data_container.data:
+                self.update(item.item)
+            return
+
+        for key, column in data_container.columns.items():
+            field = self._field(key)
+            if isinstance(column, NumericColumn):
+                values = column.values[column.present]
+                field.numeric.add_array(values)
+                if isinstance(column, BoolColumn):
+                    true_count = int(np.count_nonzero(values))
+                    field.true_count += true_count
+                    field.false_count += len(values) - true_count
+            elif isinstance(column, ListColumn) and column.is_numeric():
+                sizes = column.lengths[column.present]
+                field.list_sizes.add_array(sizes)
+                field.numeric.add_array(sizes)
+            elif isinstance(column, (ListColumn, ObjectColumn)):
+                for index in np.flatnonzero(column.present):
+                    field.add(column.get(index))
+
+    def consume(
+        self, stream: Iterable[Union[Dict[str, Any], JsonDataItem, JsonDataContainer]]
+    ) -> "StatsAccumulator":
+        """
+        Add every element of a stream of items, JsonDataItem objects or data containers.
+
+        :param stream: The stream to consume.
+        :return: The accumulator itself.
+        """
+        for element in stream:
+            if isinstance(element, JsonDataItem):
+                self.update(element.item)
+            elif isinstance(element, dict):
+                self.update(element)
+            else:
+                self.update_container(element)
+        return self
+
+    def merge(self, other: "StatsAccumulator"):
+        """
+        Merge the values added to another accumulator into this one.
+
+        :param other: The accumulator to merge.
+        """
+        for key, field in other.fields.items():
+            self._field(key).merge(field)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get the state of the accumulator as JSON values, e.g. to persist it and add
+        more items later.
+
+        :return: The state of every key.
+        """
+        return {"fields": {key: field.to_dict() for key, field in self.fields.items()}}
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "StatsAccumulator":
+        """
+        Restore an accumulator from its state.
+
+        :param state: The state, as returned by to_dict.
+        :return: The accumulator.
+        """
+        accumulator = cls()
+        for key, field in state["fields"].items():
+            accumulator.fields[key] = FieldAccumulator.from_dict(field)
+        return accumulator
+
+    def get_numeric_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get statistics for numeric fields (min, max, average).
+
+        :return: A dictionary with statistics for each numeric field.
+        """
+        return {
+            key: {
+                "min": field.numeric.min,
+                "max": field.numeric.max,
+                "average": field.numeric.average,
+            }
+            for key, field in self.fields.items()
+            if field.numeric.count
+        }
+
+    def get_boolean_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get statistics for boolean fields (% true and % false).
+
+        :return: A dictionary with statistics for each boolean field.
+        """
+        stats = {}
+        for key, field in self.fields.items():
+            total = field.true_count + field.false_count
+            if total:
+                stats[key] = {
+                    "true_percentage": (field.true_count / total) * 100,
+                    "false_percentage": (field.false_count / total) * 100,
+                }
+        return stats
+
+    def get_list_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get statistics for list fields (min, max, average size).
+
+        :return: A dictionary with statistics for each list field.
+        """
+        return {
+            key: {
+                "min_size": field.list_sizes.min,
+                "max_size": field.list_sizes.max,
+                "average_size": field.list_sizes.average,
+            }
+            for key, field in self.fields.items()
+            if field.list_sizes.count
+        }
+
+    def get_all_stats(self) -> Dict[str, Any]:
+        """
+        Get all statistics for numeric, boolean, and list fields.
+
+        :return: A dictionary with all statistics.
+        """
+        return {
+            "numeric_stats": self.get_numeric_stats(),
+            "boolean_stats": self.get_boolean_stats(),
+            "list_stats": self.get_list_stats(),
+        }
+
+
+class FrameStatsAccumulator:
+    """
+    Mergeable counterpart of CSVStats: running aggregates per DataFrame column, so that
+    the stats of parts of a CSV file, e.g. chunks or partitions, can be combined.
+
+    Columns are classified like CSVStats does: number columns get numeric stats, bool
+    columns boolean stats and object columns holding only lists list stats. A column
+    whose kind differs between the merged parts, e.g. parsed as numbers in one part
+    and as text in another, is treated as text, as read_csv would over the whole file.
+    """
+
+    def __init__(self):
+        self.fields: Dict[str, FieldAccumulator] = {}
+        # "number", "bool", "list" or "other", per column
+        self.kinds: Dict[str, str] = {}
+
+    def _field(self, column: str, kind: str) -> FieldAccumulator:
+        known = self.kinds.get(column)
+        if known is None:
+            self.kinds[column] = kind
+            self.fields[column] = FieldAccumulator()
+        elif known != kind:
+            self.kinds[column] = "other"
+            self.fields[column] = FieldAccumulator()
+        return self.fields[column]
+
+    @staticmethod
+    def _kind(series: pd.Series) -> str:
+        if pd.api.types.is_bool_dtype(series.dtype):
+            return "bool"
+        if pd.api.types.is_numeric_dtype(series.dtype):
+            return "number"
+        if (
+            series.dtype == object
+            and series.map(lambda value: isinstance(value, list)).all()
+        ):
+            return "list"
+        return "other"
+
+    def update_frame(self, dataframe: pd.DataFrame):
+        """
+        Add the values of every row of a DataFrame.
+
+        :param dataframe: The DataFrame.
+        """
+        for column in dataframe.columns:
+            series = dataframe[column]
+            field = self._field(column, self._kind(series))
+            kind = self.kinds[column]
+            if kind == "number":
+                field.numeric.add_array(series.dropna().to_numpy())
+            elif kind == "bool":
+                true_count = int(np.count_nonzero(series.to_numpy()))
+                field.true_count += true_count
+                field.false_count += len(series) - true_count
+            elif kind == "list":
+                field.list_sizes.add_array(series.map(len).to_numpy())
+
+    def merge(self, other: "FrameStatsAccumulator"):
+        """
+        Merge the values added to another accumulator into this one.
+
+        :param other: The accumulator to merge.
+        """
+        for column, field in other.fields.items():
+            kind = other.kinds[column]
+            merged = self._field(column, kind)
+            if self.kinds[column] == kind:
+                merged.merge(field)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get the state of the accumulator as JSON values, e.g. to persist it and add
+        more rows later.
+
+        :return: The state and the kind of every column.
+        """
+        return {
+            "fields": {
+                column: field.to_dict() for column, field in self.fields.items()
+            },
+            "kinds": dict(self.kinds),
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "FrameStatsAccumulator":
+        """
+        Restore an accumulator from its state.
+
+        :param state: The state, as returned by to_dict.
+        :return: The accumulator.
+        """
+        accumulator = cls()
+        for column, field in state["fields"].items():
+            accumulator.fields[column] = FieldAccumulator.from_dict(field)
+        accumulator.kinds = dict(state["kinds"])
+        return accumulator
+
+    def get_numeric_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get statistics for numeric columns (min, max, average), NaN for columns
+        without any value.
+
+        :return: A dictionary with statistics for each numeric column.
+        """
+        stats = {}
+        for column, field in self.fields.items():
+            if self.kinds[column] != "number":
+                continue
+            if field.numeric.count:
+                stats[column] = {
+                    "min": field.numeric.min,
+                    "max": field.numeric.max,
+                    "average": field.numeric.average,
+                }
+            else:
+                stats[column] = {"min": np.nan, "max": np.nan, "average": np.nan}
+        return stats
+
+    def get_boolean_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get statistics for boolean columns (% true and % false).
+
+        :return: A dictionary with statistics for each boolean column.
+        """
+        stats = {}
+        for column, field in self.fields.items():
+            if self.kinds[column] != "bool":
+                continue
+            total = field.true_count + field.false_count
+            stats[column] = {
+                "true_percentage": (
+                    (field.true_count / total) * 100 if total else np.nan
+                ),
+                "false_percentage": (
+                    (field.false_count / total) * 100 if total else np.nan
+                ),
+            }
+        return stats
+
+    def get_list_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get statistics for list columns (min, max, average size).
+
+        :return: A dictionary with statistics for each list column.
+        """
+        stats = {}
+        for column, field in self.fields.items():
+            if self.kinds[column] != "list":
+                continue
+            sizes = field.list_sizes
+            stats[column] = {
+                "min_size": sizes.min if sizes.count else np.nan,
+                "max_size": sizes.max if sizes.count else np.nan,
+                "average_size": sizes.average if sizes.count else np.nan,
+            }
+        return stats
+
+    def get_all_stats(self) -> Dict[str, Any]:
+        """
+        Get all statistics for numeric, boolean, and list columns.
+
+        :return: A dictionary with all statistics.
+        """
+        return {
+            "numeric_stats": self.get_numeric_stats(),
+            "boolean_stats": self.get_boolean_stats(),
+            "list_stats": self.get_list_stats(),
+        }
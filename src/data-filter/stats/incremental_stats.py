@@ -0,0 +1,264 @@
+from ..data_loader.json_stream_parser import JsonArrayStreamParser
+from ..models.data_containers.json_data_container import JsonDataItem
+from .accumulators import FrameStatsAccumulator, StatsAccumulator
+from copy import deepcopy
+from io import BytesIO, TextIOWrapper
+from typing import Any, Dict, Optional, Union
+import hashlib, json, logging, os, tempfile
+import pandas as pd
+
+"""
+Stats of append-only data files, maintained from the appended rows only.
+
+The state of the stats accumulator of a file (counts, sums, min/max, true/false counts
+and list size aggregates per column) is persisted in a "<data file>.stats" sidecar,
+with the byte offset up to which the file was consumed and a fingerprint of the bytes
+before it. When the stats are refreshed, the fingerprint tells whether the file was
+only appended to: if so, only the bytes after the offset are parsed, so a refresh costs
+O(appended rows). Otherwise the stats are computed from scratch.
+
+CSV files are consumed up to their last complete line, JSON files up to the last item
+of their "data" array: the closing "]}" of the document moves when items are appended,
+and the items after the former end of the array are parsed alone.
+"""
+
+
+STATS_SUFFIX = ".stats"
+DEFAULT_BLOCK_SIZE = 16 * 1024 * 1024
+
+# bytes hashed at each end of the consumed part of a file
+_FINGERPRINT_SIZE = 4096
+
+
+def stats_path(data_source: str) -> str:
+    return f"{data_source}{STATS_SUFFIX}"
+
+
+class IncrementalStats:
+    """
+    Stats of an append-only CSV or JSON file, kept in a sidecar and updated from the
+    rows appended since the last refresh.
+
+    Usage:
+        stats = IncrementalStats("events.csv")
+        all_stats = stats.refresh()  # the first refresh reads the whole file
+        # ... rows are appended to events.csv ...
+        all_stats = stats.refresh()  # only the appended rows are read
+    """
+
+    def __init__(
+        self,
+        data_source: str,
+        trusted: bool = False,
+        validation_sample_size: int = 100,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+    ):
+        """
+        :param data_source: The path of the CSV or JSON file.
+        :param trusted: Whether to skip the validation of each JSON item, only
+            validating the first validation_sample_size items.
+        :param validation_sample_size: The number of items validated when trusted is set.
+        :param block_size: The number of bytes of CSV rows parsed at a time.
+        """
+        file_type = data_source.split(".")[-1]
+        if file_type not in ("csv", "json"):
+            raise ValueError(
+                f"Incremental stats are only maintained for CSV and JSON files, "
+                f"got: {file_type}"
+            )
+        if not os.path.isfile(data_source):
+            raise FileNotFoundError(f"File not found: {data_source}")
+        if block_size < 1:
+            raise ValueError("block_size must be a positive number of bytes")
+        self.data_source = data_source
+        self.file_type = file_type
+        self.trusted = trusted
+        self.validation_sample_size = validation_sample_size
+        self.block_size = block_size
+        self.offset: Optional[int] = None
+        self.fingerprint: Optional[str] = None
+        self.row_count = 0
+        self.header = None
+        self.accumulator = self._new_accumulator()
+
+    def refresh(self) -> Dict[str, Any]:
+        """
+        Update the stats with the rows appended since the last refresh, from scratch if
+        the consumed part of the file changed, and persist them.
+
+        :return: The stats of the whole file, as returned by CSVStats and
+            JSONStats.get_all_stats.
+        """
+        if self.offset is None or not self._is_unchanged(self.fingerprint):
+            self._restore()
+        consumed = self.offset
+        try:
+            if self.file_type == "csv":
+                pending = self._consume_csv()
+            else:
+                pending = None
+                self._consume_json()
+        except Exception:
+            # the accumulator may hold part of the appended rows
+            self.offset = None
+            raise
+        self.fingerprint = self._fingerprint(self.offset)
+        if self.offset != consumed:
+            try:
+                self.save()
+            except Exception as e:
+                logging.warning(f"Could not write the stats of {self.data_source}: {e}")
+        if pending is None:
+            return self.accumulator.get_all_stats()
+        # a last line being written is counted, but not persisted
+        accumulator = deepcopy(self.accumulator)
+        accumulator.update_frame(pending)
+        return accumulator.get_all_stats()
+
+    def save(self):
+        """
+        Write the state of the stats to the sidecar of the file.
+        """
+        content = {
+            "file_type": self.file_type,
+            "offset": self.offset,
+            "fingerprint": self.fingerprint,
+            "row_count": self.row_count,
+            "header": self.header,
+            "accumulator": self.accumulator.to_dict(),
+        }
+        path = stats_path(self.data_source)
+        # written under another name first, so that readers never see a partial file
+        with tempfile.NamedTemporaryFile(
+            "w",
+            encoding="utf-8",
+            dir=os.path.dirname(os.path.abspath(path)),
+            prefix=".stats-",
+            delete=False,
+        ) as file:
+            try:
+                json.dump(content, file)
+            except Exception:
+                file.close()
+                os.remove(file.name)
+                raise
+        os.replace(file.name, path)
+
+    def _restore(self):
+        """
+        Restore the persisted state if it still describes a prefix of the file, else
+        start from the beginning of the file.
+        """
+        try:
+            with open(stats_path(self.data_source), "r", encoding="utf-8") as file:
+                content = json.load(file)
+            if content["file_type"] != self.file_type:
+                raise ValueError(f"Stats of a {content['file_type']} file")
+            self.offset = content["offset"]
+            self.fingerprint = content["fingerprint"]
+            if not self._is_unchanged(self.fingerprint):
+                raise ValueError("The file was rewritten")
+            self.row_count = content["row_count"]
+            self.header = content["header"]
+            self.accumulator = self._accumulator_class().from_dict(
+                content["accumulator"]
+            )
+            return
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logging.info(f"Recomputing the stats of {self.data_source}: {e}")
+        self.offset = 0
+        self.row_count = 0
+        self.header = None
+        self.accumulator = self._new_accumulator()
+
+    def _consume_csv(self) -> Optional[pd.DataFrame]:
+        """
+        Add the complete lines after the offset to the accumulator, a block at a time.
+
+        :return: The rows of a last line without line break, None if there is none.
+        """
+        with open(self.data_source, "rb") as file:
+            if self.header is None:
+                self.header = pd.read_csv(self.data_source, nrows=0).columns.tolist()
+                file.readline()
+                self.offset = file.tell()
+            file.seek(self.offset)
+            remainder = b""
+            while True:
+                block = file.read(self.block_size)
+                if not block:
+                    break
+                block = remainder + block
+                end = block.rfind(b"\n") + 1
+                remainder = block[end:]
+                self._add_csv_lines(block[:end])
+                self.offset += end
+        if not remainder.strip():
+            return None
+        return self._parse_csv_lines(remainder)
+
+    def _add_csv_lines(self, lines: bytes):
+        if not lines.strip():
+            return
+        rows = self._parse_csv_lines(lines)
+        self.accumulator.update_frame(rows)
+        self.row_count += len(rows)
+
+    def _parse_csv_lines(self, lines: bytes) -> pd.DataFrame:
+        return pd.read_csv(BytesIO(lines), header=None, names=self.header)
+
+    def _consume_json(self):
+        """
+        Add the items of the data array after the offset to the accumulator.
+        """
+        with open(self.data_source, "rb") as binary_file:
+            binary_file.seek(self.offset)
+            file = TextIOWrapper(binary_file, encoding="utf-8", newline="")
+            parser = JsonArrayStreamParser(file, key="data", start_offset=self.offset)
+            if self.offset == 0:
+                items = iter(parser)
+            else:
+                items = parser.iter_appended(after_item=self.row_count > 0)
+            for raw_item in items:
+                if self.trusted and self.row_count >= self.validation_sample_size:
+                    self.accumulator.update(raw_item["item"])
+                else:
+                    self.accumulator.update(JsonDataItem.model_validate(raw_item).item)
+                self.row_count += 1
+            self.offset = parser.array_end_offset
+
+    def _is_unchanged(self, fingerprint: str) -> bool:
+        """
+        Whether the consumed part of the file still has the given fingerprint, i.e. the
+        file was at most appended to.
+        """
+        if os.path.getsize(self.data_source) < self.offset:
+            return False
+        return self._fingerprint(self.offset) == fingerprint
+
+    def _fingerprint(self, offset: int) -> str:
+        """
+        Hash the first and last bytes of the first offset bytes of the file. Rewrites
+        of the middle of a large file go unnoticed: the file must be append-only.
+        """
+        digest = hashlib.sha256(str(offset).encode())
+        with open(self.data_source, "rb") as file:
+            digest.update(file.read(min(offset, _FINGERPRINT_SIZE)))
+            start = max(0, offset - _FINGERPRINT_SIZE)
+            file.seek(start)
+            digest.update(file.read(offset - start))
+        return digest.hexdigest()
+
+    def _accumulator_class(self):
+        return FrameStatsAccumulator if self.file_type == "csv" else StatsAccumulator
+
+    def _new_accumulator(self) -> Union[FrameStatsAccumulator, StatsAccumulator]:
+        return self._accumulator_class()()
+
+    def __repr__(self):
+        return (
+            f"IncrementalStats(data_source={self.data_source}, offset={self.offset}, "
+            f"row_count={self.row_count})"
+        )
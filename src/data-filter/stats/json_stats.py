@@ -1,12 +1,21 @@
 from ..models.data_containers.json_data_container import JsonDataContainer
-from typing import Dict, Any
-import numpy as np
+from ..models.data_containers.columnar_json_data_container import (
+    ColumnarJsonDataContainer,
+)
+from ..models.data_containers.json_data_view import JsonDataView
+from typing import Dict, Any, Iterable, Union
+from .accumulators import StatsAccumulator
 from .base_stats import BaseStats
 
 
 class JSONStats(BaseStats):
 
-    def __init__(self, data_container: JsonDataContainer):
+    def __init__(
+        self,
+        data_container: Union[
+            JsonDataContainer, ColumnarJsonDataContainer, JsonDataView
+        ],
+    ):
         self.data_container = data_container
 
     def get_numeric_stats(self) -> Dict[str, Dict[str, float]]:
@@ -15,28 +24,7 @@ class JSONStats(BaseStats):
 
         :return: A dictionary with statistics for each numeric field.
         """
-        numeric_stats = {}
-        for item in self.data_container.data:
-            for key, value in item.item.items():
-                if isinstance(value, (int, float)):
-                    if key not in numeric_stats:
-                        numeric_stats[key] = []
-                    numeric_stats[key].append(value)
-                elif isinstance(value, list) and all(
-                    isinstance(i, (int, float)) for i in value
-                ):
-                    if key not in numeric_stats:
-                        numeric_stats[key] = []
-                    numeric_stats[key].append(len(value))
-
-        stats = {}
-        for key, values in numeric_stats.items():
-            stats[key] = {
-                "min": np.min(values),
-                "max": np.max(values),
-                "average": np.mean(values),
-            }
-        return stats
+        return self._accumulate().get_numeric_stats()
 
     def get_boolean_stats(self) -> Dict[str, Dict[str, float]]:
         """
@@ -44,25 +32,7 @@ class JSONStats(BaseStats):
 
         :return: A dictionary with statistics for each boolean field.
         """
-        boolean_stats = {}
-        for item in self.data_container.data:
-            for key, value in item.item.items():
-                if isinstance(value, bool):
-                    if key not in boolean_stats:
-                        boolean_stats[key] = {"true": 0, "false": 0}
-                    if value:
-                        boolean_stats[key]["true"] += 1
-                    else:
-                        boolean_stats[key]["false"] += 1
-
-        stats = {}
-        for key, counts in boolean_stats.items():
-            total = counts["true"] + counts["false"]
-            stats[key] = {
-                "true_percentage": (counts["true"] / total) * 100,
-                "false_percentage": (counts["false"] / total) * 100,
-            }
-        return stats
+        return self._accumulate().get_boolean_stats()
 
     def get_list_stats(self) -> Dict[str, Dict[str, float]]:
         """
@@ -70,34 +40,36 @@ class JSONStats(BaseStats):
 
         :return: A dictionary with statistics for each list field.
         """
-        list_stats = {}
-        for item in self.data_container.data:
-            for key, value in item.item.items():
-                if isinstance(value, list):
-                    if key not in list_stats:
-                        list_stats[key] = []
-                    list_stats[key].append(len(value))
-
-        stats = {}
-        for key, values in list_stats.items():
-            stats[key] = {
-                "min_size": np.min(values),
-                "max_size": np.max(values),
-                "average_size": np.mean(values),
-            }
-        return stats
+        return self._accumulate().get_list_stats()
 
     def get_all_stats(self) -> Dict[str, Any]:
         """
-        Get all statistics for numeric, boolean, and list fields.
+        Get all statistics for numeric, boolean, and list fields, in a single pass over the data.
 
         :return: A dictionary with all statistics.
         """
-        return {
-            "numeric_stats": self.get_numeric_stats(),
-            "boolean_stats": self.get_boolean_stats(),
-            "list_stats": self.get_list_stats(),
-        }
+        return self._accumulate().get_all_stats()
+
+    @staticmethod
+    def get_stream_stats(stream: Iterable[Any]) -> Dict[str, Any]:
+        """
+        Get all statistics of a stream of items or data containers, such as the batches
+        of JsonDataLoader.iter_data, without holding the stream in memory.
+
+        :param stream: The items, JsonDataItem objects or data containers to consume.
+        :return: A dictionary with all statistics.
+        """
+        return StatsAccumulator().consume(stream).get_all_stats()
+
+    def _accumulate(self) -> StatsAccumulator:
+        """
+        Compute the running aggregates of every key in one pass over the data container.
+
+        :return: The filled accumulator.
+        """
+        accumulator = StatsAccumulator()
+        accumulator.update_container(self.data_container)
+        return accumulator
 
     def __repr__(self):
         return f"JSONStats(data_container={self.data_container})"
@@ -0,0 +1,714 @@
+from ..models.data_containers.json_data_container import JsonDataContainer, JsonDataItem
+from ..models.data_containers.columnar_json_data_container import (
+    ColumnarJsonDataContainer,
+)
+from ..models.data_containers.json_data_view import JsonDataView
+from ..models.data_containers.columns import BoolColumn, NumericColumn, StringColumn
+from typing import Any, Dict, Iterable, List, Sequence, Union
+import math
+import numpy as np
+import pandas as pd
+
+"""
+Approximate statistics computed in one streaming pass with bounded memory.
+
+- distinct counts with HyperLogLog,
+- quantiles with a KLL sketch,
+- heavy hitters, the most frequent values, with a count-min sketch.
+
+The memory of every sketch only depends on its error bound, not on the number of
+values, and sketches of separate parts of the data can be merged, so that the stats of
+partitions computed by parallel workers are combined like exact accumulators.
+"""
+
+
+DEFAULT_DISTINCT_ERROR = 0.01
+DEFAULT_RANK_ERROR = 0.01
+DEFAULT_FREQUENCY_ERROR = 0.001
+DEFAULT_CONFIDENCE = 0.99
+DEFAULT_TOP_K = 10
+DEFAULT_QUANTILES = (0.25, 0.5, 0.75, 0.9, 0.99)
+
+# values of records buffered per key before being added to the sketches at once
+_BATCH_SIZE = 4096
+
+
+def hash_values(values: np.ndarray) -> np.ndarray:
+    """
+    Hash values to 64 bits, the same way in every process. Numbers are hashed as
+    floats, so that 1 and 1.0 have the same hash.
+
+    :param values: The values, numbers, bools or strings.
+    :return: The uint64 hashes.
+    """
+    if values.dtype.kind in "iuf":
+        values = values.astype(np.float64)
+    hashes = pd.util.hash_array(values)
+    # splitmix64 finalizer, hash_array hashing 0 and False to 0
+    hashes = hashes + np.uint64(0x9E3779B97F4A7C15)
+    hashes ^= hashes >> np.uint64(30)
+    hashes *= np.uint64(0xBF58476D1CE4E5B9)
+    hashes ^= hashes >> np.uint64(27)
+    hashes *= np.uint64(0x94D049BB133111EB)
+    hashes ^= hashes >> np.uint64(31)
+    return hashes
+
+
+class HyperLogLog:
+    """
+    Distinct count estimator: 2^precision registers holding the longest run of leading
+    zeros of the hashes routed to them. The relative standard error of the estimate is
+    about 1.04 / sqrt(2^precision).
+    """
+
+    def __init__(self, precision: int = 14):
+        """
+        :param precision: The number of hash bits selecting a register, from 4 to 18.
+        """
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @classmethod
+    def for_error(cls, relative_error: float) -> "HyperLogLog":
+        """
+        Create an estimator with the given relative standard error.
+
+        :param relative_error: The relative standard error, e.g. 0.01 for 1%.
+        :return: The estimator.
+        """
+        precision = math.ceil(math.log2((1.04 / relative_error) ** 2))
+        return cls(min(max(precision, 4), 18))
+
+    def add_hashes(self, hashes: np.ndarray):
+        """
+        Add values by their 64 bit hashes.
+
+        :param hashes: The uint64 hashes of the values.
+        """
+        if len(hashes) == 0:
+            return
+        indexes = (hashes >> np.uint64(64 - self.precision)).astype(np.intp)
+        rest = hashes << np.uint64(self.precision)
+        # leading zeros of the remaining bits, the float log2 being exact on 32 bits
+        high = (rest >> np.uint64(32)).astype(np.float64)
+        low = (rest & np.uint64(0xFFFFFFFF)).astype(np.float64)
+        with np.errstate(divide="ignore"):
+            zeros = np.where(
+                high > 0,
+                31 - np.floor(np.log2(high)),
+                np.where(low > 0, 63 - np.floor(np.log2(low)), 64),
+            )
+        ranks = np.minimum(zeros + 1, 64 - self.precision + 1).astype(np.uint8)
+        np.maximum.at(self.registers, indexes, ranks)
+
+    def merge(self, other: "HyperLogLog"):
+        """
+        Merge the values added to another estimator into this one.
+
+        :param other: The estimator to merge, of the same precision.
+        """
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        """
+        Estimate the number of distinct values added, with the improved raw estimator
+        of Ertl, which is unbiased from small to large counts without correction tables.
+
+        :return: The estimated distinct count.
+        """
+        size = len(self.registers)
+        limit = 64 - self.precision
+        counts = np.bincount(self.registers, minlength=limit + 2)
+        denominator = size * _tau(1 - counts[limit + 1] / size)
+        for rank in range(limit, 0, -1):
+            denominator = 0.5 * (denominator + counts[rank])
+        denominator += size * _sigma(counts[0] / size)
+        return int(round(size * size / (2 * math.log(2)) / denominator))
+
+
+def _sigma(x: float) -> float:
+    if x == 1:
+        return math.inf
+    power, total, previous = 1.0, x, None
+    while total != previous:
+        x *= x
+        previous = total
+        total += x * power
+        power += power
+    return total
+
+
+def _tau(x: float) -> float:
+    if x == 0 or x == 1:
+        return 0.0
+    power, total, previous = 1.0, 1 - x, None
+    while total != previous:
+        x = math.sqrt(x)
+        previous = total
+        power *= 0.5
+        total -= (1 - x) ** 2 * power
+    return total / 3
+
+
+class KLLSketch:
+    """
+    Quantile sketch of Karnin, Lang and Liberty: levels of compactors where the items
+    of level h stand for 2^h values. A full level is sorted and every other item, from
+    a random offset, is promoted to the level above. The rank error of a quantile is
+    about 3.3 / k of the number of values, at 99% confidence.
+    """
+
+    def __init__(self, k: int = 200, seed: int = 0):
+        """
+        :param k: The capacity of the top level, giving the accuracy.
+        :param seed: The seed of the random offsets, for reproducible results.
+        """
+        if k < 8:
+            raise ValueError("k must be at least 8")
+        self.k = k
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self.count = 0
+        self.min = None
+        self.max = None
+        self._random = np.random.default_rng(seed)
+
+    @classmethod
+    def for_error(cls, rank_error: float) -> "KLLSketch":
+        """
+        Create a sketch with the given normalized rank error.
+
+        :param rank_error: The rank error as a fraction of the number of values, e.g.
+            0.01 for quantiles within 1% of the values of the exact ones.
+        :return: The sketch.
+        """
+        return cls(max(8, math.ceil(3.3 / rank_error)))
+
+    def add_array(self, values: np.ndarray):
+        """
+        Add every value of an array of numbers, NaN values being left out.
+
+        :param values: The values to add.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        low, high = values.min(), values.max()
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other: "KLLSketch"):
+        """
+        Merge the values added to another sketch into this one.
+
+        :param other: The sketch to merge, with the same k.
+        """
+        if other.k != self.k:
+            raise ValueError("Cannot merge KLL sketches with different k")
+        if other.count == 0:
+            return
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self.count += other.count
+        self._compress()
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile of the values added.
+
+        :param q: The quantile, between 0 and 1.
+        :return: The estimated value, None if no value was added.
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("Quantiles must be between 0 and 1")
+        if self.count == 0:
+            return None
+        if q == 0:
+            return float(self.min)
+        if q == 1:
+            return float(self.max)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [
+                np.full(len(level_items), 2**level)
+                for level, level_items in enumerate(self.levels)
+            ]
+        )
+        order = np.argsort(items, kind="stable")
+        cumulative = np.cumsum(weights[order])
+        position = np.searchsorted(cumulative, q * cumulative[-1], side="left")
+        return float(items[order][min(position, len(items) - 1)])
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, math.ceil(self.k * (2 / 3) ** depth))
+
+    def _compress(self):
+        """
+        Compact the levels holding more items than their capacity, from the bottom up.
+        """
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # an odd item out stays at its level
+                kept = len(items) % 2
+                promoted = items[kept + self._random.integers(2) :: 2]
+                self.levels[level] = items[:kept]
+                self.levels[level + 1] = np.concatenate(
+                    [self.levels[level + 1], promoted]
+                )
+            level += 1
+
+
+class CountMinSketch:
+    """
+    Frequency estimator: depth rows of width counters, each value incrementing one
+    counter per row. The estimated count of a value, the smallest of its counters, is
+    at most its count plus error * the number of values, with the given confidence.
+    """
+
+    def __init__(self, width: int = 2719, depth: int = 5):
+        """
+        :param width: The number of counters per row.
+        :param depth: The number of rows.
+        """
+        if width < 1 or depth < 1:
+            raise ValueError("width and depth must be positive integers")
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+
+    @classmethod
+    def for_error(cls, error: float, confidence: float) -> "CountMinSketch":
+        """
+        Create an estimator with the given error bound.
+
+        :param error: The overestimate of counts, as a fraction of the number of values.
+        :param confidence: The probability that an estimate is within the bound.
+        :return: The estimator.
+        """
+        return cls(math.ceil(math.e / error), math.ceil(math.log(1 / (1 - confidence))))
+
+    def _columns(self, hashes: np.ndarray) -> np.ndarray:
+        # double hashing: the counter of row i is h1 + i * h2
+        first = hashes & np.uint64(0xFFFFFFFF)
+        second = (hashes >> np.uint64(32)) | np.uint64(1)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, None]
+        return ((first + rows * second) % np.uint64(self.width)).astype(np.intp)
+
+    def add_hashes(self, hashes: np.ndarray, counts: np.ndarray = None):
+        """
+        Count values by their 64 bit hashes.
+
+        :param hashes: The uint64 hashes of the values.
+        :param counts: The number of occurrences of each value, 1 if None.
+        """
+        if len(hashes) == 0:
+            return
+        for row, columns in enumerate(self._columns(hashes)):
+            self.table[row] += np.bincount(
+                columns, weights=counts, minlength=self.width
+            ).astype(np.int64)
+
+    def estimate(self, hashes: np.ndarray) -> np.ndarray:
+        """
+        Estimate the counts of values by their 64 bit hashes.
+
+        :param hashes: The uint64 hashes of the values.
+        :return: The estimated counts.
+        """
+        columns = self._columns(hashes)
+        return self.table[np.arange(self.depth)[:, None], columns].min(axis=0)
+
+    def merge(self, other: "CountMinSketch"):
+        """
+        Merge the values counted by another estimator into this one.
+
+        :param other: The estimator to merge, of the same width and depth.
+        """
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Cannot merge count-min sketches of different sizes")
+        self.table += other.table
+
+
+class FieldSketch:
+    """
+    Sketches of the values of one key/column: distinct count, quantiles of its numbers
+    and heavy hitters. Values of records are buffered and added in batches.
+    """
+
+    def __init__(
+        self,
+        distinct_error: float,
+        rank_error: float,
+        frequency_error: float,
+        confidence: float,
+        top_k: int,
+    ):
+        """
+        :param distinct_error: The relative standard error of the distinct count.
+        :param rank_error: The rank error of the quantiles.
+        :param frequency_error: The overestimate of the heavy hitter counts, as a
+            fraction of the number of values.
+        :param confidence: The confidence of the heavy hitter counts.
+        :param top_k: The number of heavy hitters kept.
+        """
+        self.count = 0
+        self.distinct = HyperLogLog.for_error(distinct_error)
+        self.quantiles = KLLSketch.for_error(rank_error)
+        self.frequencies = CountMinSketch.for_error(frequency_error, confidence)
+        self.frequency_error = frequency_error
+        self.top_k = top_k
+        # the values with the highest estimated counts, by hash
+        self.candidates: Dict[int, Any] = {}
+        self._pending = {"number": [], "bool": [], "other": []}
+        self._pending_count = 0
+
+    def add(self, value: Any):
+        """
+        Add one value of a record. Numbers, bools and strings are sketched, other values,
+        such as lists, are left out.
+
+        :param value: The value to add.
+        """
+        if isinstance(value, bool):
+            self._pending["bool"].append(value)
+        elif isinstance(value, (int, float)):
+            if value != value:
+                return
+            self._pending["number"].append(value)
+        elif isinstance(value, str):
+            self._pending["other"].append(value)
+        else:
+            return
+        self._pending_count += 1
+        if self._pending_count >= _BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        """
+        Add the buffered values of records to the sketches.
+        """
+        if not self._pending_count:
+            return
+        pending, self._pending = self._pending, {"number": [], "bool": [], "other": []}
+        self._pending_count = 0
+        if pending["number"]:
+            self.add_array(np.array(pending["number"]), "number")
+        if pending["bool"]:
+            self.add_array(np.array(pending["bool"], dtype=bool), "bool")
+        if pending["other"]:
+            self.add_array(np.array(pending["other"], dtype=object), "other")
+
+    def add_array(self, values: np.ndarray, kind: str, hashes: np.ndarray = None):
+        """
+        Add an array of values of the same kind, without missing values.
+
+        :param values: The values.
+        :param kind: "number" for numbers, which also get quantiles, "bool" for bools
+            and "other" for strings.
+        :param hashes: The hashes of the values, computed if None.
+        """
+        if kind == "number" and values.dtype.kind == "f":
+            values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        if hashes is None:
+            hashes = hash_values(values)
+        self.distinct.add_hashes(hashes)
+        unique, first, counts = np.unique(hashes, return_index=True, return_counts=True)
+        self.frequencies.add_hashes(unique, counts)
+        self._update_candidates(unique, values[first].tolist())
+        if kind == "number":
+            self.quantiles.add_array(values)
+
+    def merge(self, other: "FieldSketch"):
+        """
+        Merge the values added to another sketch into this one.
+
+        :param other: The sketch to merge, with the same error bounds.
+        """
+        self.flush()
+        other.flush()
+        self.count += other.count
+        self.distinct.merge(other.distinct)
+        self.quantiles.merge(other.quantiles)
+        self.frequencies.merge(other.frequencies)
+        self._update_candidates(
+            np.array(list(other.candidates), dtype=np.uint64),
+            list(other.candidates.values()),
+        )
+
+    def heavy_hitters(self) -> List[tuple]:
+        """
+        Get the most frequent values with their estimated counts. The estimates exceed
+        the true counts by up to frequency_error times the number of values, so values
+        estimated below that are left out: their count cannot be told from the error.
+
+        :return: The (value, count) pairs, by decreasing count.
+        """
+        self.flush()
+        if not self.candidates:
+            return []
+        estimates = self.frequencies.estimate(
+            np.array(list(self.candidates), dtype=np.uint64)
+        )
+        threshold = self.frequency_error * self.count
+        pairs = [
+            (value, estimate)
+            for value, estimate in zip(self.candidates.values(), estimates.tolist())
+            if estimate > threshold
+        ]
+        return sorted(pairs, key=lambda pair: -pair[1])
+
+    def _update_candidates(self, hashes: np.ndarray, values: List[Any]):
+        """
+        Keep the top_k values with the highest estimated counts among the current
+        candidates and new values.
+        """
+        hashes = np.concatenate(
+            [np.array(list(self.candidates), dtype=np.uint64), hashes]
+        )
+        values = list(self.candidates.values()) + list(values)
+        hashes, first = np.unique(hashes, return_index=True)
+        estimates = self.frequencies.estimate(hashes)
+        top = np.argsort(-estimates, kind="stable")[: self.top_k]
+        self.candidates = {int(hashes[i]): values[first[i]] for i in top}
+
+    def __getstate__(self):
+        # values still buffered are added before the sketch is sent to another process
+        self.flush()
+        return self.__dict__
+
+
+class SketchAccumulator:
+    """
+    Computes approximate statistics of JSON data or DataFrames in a single pass, with
+    memory bounded by the error bounds whatever the number of values: distinct counts,
+    quantiles of numbers and heavy hitters per key/column.
+
+    Items, data containers and DataFrames can be fed in any number of parts, and
+    accumulators computed on separate parts of the data can be merged, like
+    StatsAccumulator.
+    """
+
+    def __init__(
+        self,
+        distinct_error: float = DEFAULT_DISTINCT_ERROR,
+        rank_error: float = DEFAULT_RANK_ERROR,
+        frequency_error: float = DEFAULT_FREQUENCY_ERROR,
+        confidence: float = DEFAULT_CONFIDENCE,
+        top_k: int = DEFAULT_TOP_K,
+        quantiles: Sequence[float] = DEFAULT_QUANTILES,
+    ):
+        """
+        :param distinct_error: The relative standard error of the distinct counts.
+        :param rank_error: The rank error of the quantiles, as a fraction of the number
+            of values: 0.01 gives a median between the 49th and 51st percentiles.
+        :param frequency_error: The overestimate of the heavy hitter counts, as a
+            fraction of the number of values of the key/column. Values whose estimated
+            count is below that bound are not reported.
+        :param confidence: The probability that a heavy hitter count is within its bound.
+        :param top_k: The number of heavy hitters reported per key/column.
+        :param quantiles: The quantiles reported for numbers.
+        """
+        for name, bound in (
+            ("distinct_error", distinct_error),
+            ("rank_error", rank_error),
+            ("frequency_error", frequency_error),
+            ("confidence", confidence),
+        ):
+            if not 0 < bound < 1:
+                raise ValueError(f"{name} must be between 0 and 1, got: {bound}")
+        if top_k < 1:
+            raise ValueError("top_k must be a positive integer")
+        if any(not 0 <= q <= 1 for q in quantiles):
+            raise ValueError("Quantiles must be between 0 and 1")
+        self.options = {
+            "distinct_error": distinct_error,
+            "rank_error": rank_error,
+            "frequency_error": frequency_error,
+            "confidence": confidence,
+            "top_k": top_k,
+        }
+        self.quantiles = tuple(quantiles)
+        self.fields: Dict[str, FieldSketch] = {}
+
+    def _field(self, key: str) -> FieldSketch:
+        field = self.fields.get(key)
+        if field is None:
+            field = self.fields[key] = FieldSketch(**self.options)
+        return field
+
+    def update(self, item: Dict[str, Any]):
+        """
+        Add the values of one item.
+
+        :param item: The item dict.
+        """
+        for key, value in item.items():
+            self._field(key).add(value)
+
+    def update_container(
+        self,
+        data_container: Union[
+            JsonDataContainer, ColumnarJsonDataContainer, JsonDataView
+        ],
+    ):
+        """
+        Add the values of every item of a data container. Columnar containers are
+        sketched column by column.
+
+        :param data_container: The data container, or a view of one.
+        """
+        if isinstance(data_container, JsonDataView):
+            if not data_container.is_columnar:
+                for item in data_container.items():
+                    self.update(item)
+                return
+            data_container = data_container.to_container()
+
+        if not isinstance(data_container, ColumnarJsonDataContainer):
+            for item in data_container.data:
+                self.update(item.item)
+            return
+
+        for key, column in data_container.columns.items():
+            field = self._field(key)
+            if isinstance(column, BoolColumn):
+                field.add_array(column.values[column.present].astype(bool), "bool")
+            elif isinstance(column, NumericColumn):
+                field.add_array(column.values[column.present], "number")
+            elif isinstance(column, StringColumn):
+                # each distinct string is hashed once
+                codes = column.codes[column.present]
+                field.add_array(
+                    column.categories[codes],
+                    "other",
+                    hash_values(column.categories)[codes],
+                )
+            else:
+                for index in np.flatnonzero(column.present):
+                    field.add(column.get(index))
+
+    def update_frame(self, dataframe: pd.DataFrame):
+        """
+        Add the values of every row of a DataFrame.
+
+        :param dataframe: The DataFrame.
+        """
+        for column in dataframe.columns:
+            series = dataframe[column].dropna()
+            field = self._field(column)
+            if pd.api.types.is_bool_dtype(series.dtype):
+                field.add_array(series.to_numpy(dtype=bool), "bool")
+            elif pd.api.types.is_numeric_dtype(series.dtype):
+                values = series.to_numpy()
+                if values.dtype.kind not in "iuf":
+                    # nullable extension dtypes
+                    values = values.astype(np.float64)
+                field.add_array(values, "number")
+            elif pd.api.types.infer_dtype(series, skipna=True) in ("string", "empty"):
+                field.add_array(series.to_numpy(dtype=object), "other")
+            else:
+                for value in series:
+                    field.add(value)
+
+    def consume(
+        self, stream: Iterable[Union[Dict[str, Any], JsonDataItem, JsonDataContainer]]
+    ) -> "SketchAccumulator":
+        """
+        Add every element of a stream of items, JsonDataItem objects or data containers.
+
+        :param stream: The stream to consume.
+        :return: The accumulator itself.
+        """
+        for element in stream:
+            if isinstance(element, JsonDataItem):
+                self.update(element.item)
+            elif isinstance(element, dict):
+                self.update(element)
+            else:
+                self.update_container(element)
+        return self
+
+    def merge(self, other: "SketchAccumulator"):
+        """
+        Merge the values added to another accumulator into this one.
+
+        :param other: The accumulator to merge, with the same error bounds.
+        """
+        if other.options != self.options:
+            raise ValueError("Cannot merge sketches with different error bounds")
+        for key, field in other.fields.items():
+            self._field(key).merge(field)
+
+    def get_distinct_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get the estimated number of distinct values of each key/column.
+
+        :return: A dictionary with the distinct count of each key/column.
+        """
+        stats = {}
+        for key, field in self.fields.items():
+            field.flush()
+            if field.count:
+                stats[key] = {"distinct_count": field.distinct.estimate()}
+        return stats
+
+    def get_quantile_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get the estimated quantiles of the numbers of each key/column, e.g. "p50" for
+        the median.
+
+        :return: A dictionary with the quantiles of each numeric key/column.
+        """
+        stats = {}
+        for key, field in self.fields.items():
+            field.flush()
+            if field.quantiles.count:
+                stats[key] = {
+                    f"p{q * 100:g}": field.quantiles.quantile(q) for q in self.quantiles
+                }
+        return stats
+
+    def get_heavy_hitter_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get the most frequent values of each key/column with their estimated counts.
+
+        :return: A dictionary with the {value: count} of each key/column.
+        """
+        stats = {}
+        for key, field in self.fields.items():
+            pairs = field.heavy_hitters()
+            if pairs:
+                stats[key] = {str(value): count for value, count in pairs}
+        return stats
+
+    def get_all_stats(self) -> Dict[str, Any]:
+        """
+        Get all approximate statistics: distinct counts, quantiles and heavy hitters.
+
+        :return: A dictionary with all statistics.
+        """
+        return {
+            "distinct_stats": self.get_distinct_stats(),
+            "quantile_stats": self.get_quantile_stats(),
+            "heavy_hitter_stats": self.get_heavy_hitter_stats(),
+        }
@@ -0,0 +1,9 @@
+import importlib, os, sys
+
+# the package directory, data-filter, is not a valid module name: the tests import its
+# modules with importlib, from the src directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+
+def import_module(name: str):
+    return importlib.import_module(f"data-filter.{name}")
@@ -0,0 +1,112 @@
+import importlib, json, os, shutil
+import pytest
+
+cli = importlib.import_module("data-filter")
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.dirname(__file__)), "examples")
+
+
+@pytest.fixture
+def xml_file(tmp_path):
+    # loads write sidecar files next to the data
+    return shutil.copy(os.path.join(EXAMPLES, "example.xml"), tmp_path)
+
+
+def test_load_xml_without_record_tag_loads_the_document(xml_file):
+    data = cli.load_data(xml_file)
+    assert isinstance(data, dict)
+    assert [flower["name"] for flower in data["flowerShop"]["flower"]["flower"]] == [
+        "Dead Flower",
+        "Lily",
+    ]
+
+
+def test_load_xml_records(xml_file):
+    data = cli.load_data(xml_file, record_tag="flower")
+    assert [item.item["price"] for item in data.data] == [10, 15]
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    return shutil.copy(os.path.join(EXAMPLES, "example.csv"), tmp_path)
+
+
+def test_run_cli_writes_the_rows(csv_file, capsys):
+    code = cli.run_cli(
+        ["run", csv_file, "--filter", "Age", "gt", "20", "--sort", "ID", "--limit", "2"]
+    )
+    assert code == cli.EXIT_OK
+    rows = [row["item"] for row in json.loads(capsys.readouterr().out)["data"]]
+    assert [row["ID"] for row in rows] == [2, 4]
+    assert all(row["Age"] > 20 for row in rows)
+
+
+def test_run_cli_stats(csv_file, capsys):
+    assert cli.run_cli(["run", csv_file, "--stats"]) == cli.EXIT_OK
+    stats = json.loads(capsys.readouterr().out)
+    assert stats["numeric_stats"]["Age"] == {"min": 19, "max": 23, "average": 21.0}
+
+
+def test_run_cli_out(csv_file, tmp_path):
+    out = str(tmp_path / "out.json")
+    assert cli.run_cli(["run", csv_file, "--where", "Age lt 21", "--out", out]) == (
+        cli.EXIT_OK
+    )
+    with open(out, encoding="utf-8") as file:
+        rows = [row["item"] for row in json.load(file)["data"]]
+    assert rows and all(row["Age"] < 21 for row in rows)
+
+
+def test_run_cli_help_and_version(capsys):
+    assert cli.run_cli(["--help"]) == cli.EXIT_OK
+    assert cli.run_cli(["--version"]) == cli.EXIT_OK
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        [],
+        ["run"],
+        ["run", "{file}", "--unknown"],
+        ["run", "{file}", "--limit", "two"],
+        ["run", "{file}", "--filter", "Age", "ne", "20"],
+        ["run", "{file}", "--limit", "-1"],
+        ["run", "{file}", "--workers", "0"],
+        ["run", "{file}", "--stats", "--top", "0"],
+        ["run", "{file}", "--approx"],
+        ["run", "{file}", "--incremental"],
+        ["run", "{file}", "--stats", "--incremental", "--sort", "ID"],
+    ],
+)
+def test_run_cli_invalid_arguments(csv_file, argv, capsys):
+    argv = [arg.format(file=csv_file) for arg in argv]
+    assert cli.run_cli(argv) == cli.EXIT_USAGE
+    assert capsys.readouterr().out == ""
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        ["run", "{missing}"],
+        ["run", "{file}", "--sort", "Unknown"],
+        ["run", "{file}", "--out", "{out}"],
+    ],
+)
+def test_run_cli_errors(csv_file, tmp_path, argv, capsys):
+    argv = [
+        arg.format(
+            file=csv_file,
+            missing=str(tmp_path / "missing.csv"),
+            out=str(tmp_path / "out.txt"),
+        )
+        for arg in argv
+    ]
+    assert cli.run_cli(argv) == cli.EXIT_ERROR
+    assert capsys.readouterr().err.startswith("Error: ")
+
+
+def test_run_cli_fail_on_empty(csv_file, capsys):
+    argv = ["run", csv_file, "--filter", "Age", "gt", "100"]
+    assert cli.run_cli(argv) == cli.EXIT_OK
+    assert cli.run_cli(argv + ["--fail-on-empty"]) == cli.EXIT_EMPTY
+    assert cli.run_cli(["run", csv_file, "--fail-on-empty"]) == cli.EXIT_OK
@@ -0,0 +1,96 @@
+from .conftest import import_module
+import pytest
+
+JSONFilter = import_module("filter.json_filter").JSONFilter
+predicate = import_module("filter.predicate")
+JsonDataContainer = import_module(
+    "models.data_containers.json_data_container"
+).JsonDataContainer
+ColumnarJsonDataContainer = import_module(
+    "models.data_containers.columnar_json_data_container"
+).ColumnarJsonDataContainer
+columns = import_module("models.data_containers.columns")
+
+BIG = 2**53 + 1
+
+RECORDS = [
+    {"mixed": 1, "ints": BIG, "sparse": 3, "tags": [1, 2.5]},
+    {"mixed": 2.5, "ints": -1, "tags": [BIG]},
+    {"mixed": BIG, "ints": 0, "sparse": -2},
+    {"mixed": -0.5, "sparse": 7, "tags": []},
+    {"ints": 2**63 - 1},
+]
+
+
+def _containers():
+    return (
+        JsonDataContainer.model_validate(
+            {"data": [{"item": record} for record in RECORDS]}
+        ),
+        ColumnarJsonDataContainer.from_records(RECORDS),
+    )
+
+
+def test_records_round_trip():
+    _, columnar = _containers()
+    assert [columnar[i] for i in range(len(columnar))] == RECORDS
+    for record, item in zip(RECORDS, columnar.data):
+        for key, value in record.items():
+            assert type(item.item[key]) is type(value)
+
+
+@pytest.mark.parametrize("key", ["mixed", "ints", "tags"])
+def test_concat_matches_a_single_load(key):
+    parts = [RECORDS[:2], RECORDS[2:3], RECORDS[3:]]
+    concatenated = ColumnarJsonDataContainer.concat(
+        [ColumnarJsonDataContainer.from_records(part) for part in parts]
+    )
+    single = ColumnarJsonDataContainer.from_records(RECORDS)
+    assert type(concatenated.columns[key]) is type(single.columns[key])
+    assert concatenated.columns[key].to_list() == single.columns[key].to_list()
+
+
+def test_infer_array_keeps_ints():
+    assert columns.infer_array([1, BIG]).dtype == "int64"
+    assert columns.infer_array([0.5, 1.5]).dtype == "float64"
+    mixed = columns.infer_array([1, 0.5, BIG])
+    assert mixed.dtype == object
+    assert mixed.tolist() == [1, 0.5, BIG]
+
+
+def _row_filter(container, key, value, comparison, use_index=False):
+    filterer = JSONFilter(container, use_index=use_index)
+    filterer.filter_by_key(key, value, comparison=comparison)
+    return [item.item for item in filterer.get_filtered_data().data]
+
+
+@pytest.mark.parametrize("comparison", ["eq", "lt", "gt"])
+@pytest.mark.parametrize("key", ["mixed", "ints", "sparse", "tags", "absent"])
+@pytest.mark.parametrize("value", [0, 1, 2.5, BIG])
+def test_row_and_columnar_paths_agree(key, value, comparison):
+    rows, columnar = _containers()
+    expected = _row_filter(rows, key, value, comparison)
+    assert _row_filter(rows, key, value, comparison, use_index=True) == expected
+    assert _row_filter(columnar, key, value, comparison) == expected
+    assert _row_filter(columnar, key, value, comparison, use_index=True) == expected
+
+    condition = predicate.Condition(key, comparison, value)
+    evaluate = condition.compile()
+    assert [record for record in RECORDS if evaluate(record)] == expected
+    mask = condition.mask_columnar(columnar)
+    assert [record for record, keep in zip(RECORDS, mask) if keep] == expected
+
+
+def test_missing_keys_do_not_match_lt_and_gt():
+    rows, columnar = _containers()
+    for container in (rows, columnar):
+        assert _row_filter(container, "sparse", 100, "lt") == [
+            RECORDS[0],
+            RECORDS[2],
+            RECORDS[3],
+        ]
+        assert _row_filter(container, "sparse", -100, "gt") == [
+            RECORDS[0],
+            RECORDS[2],
+            RECORDS[3],
+        ]
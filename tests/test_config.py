@@ -0,0 +1,69 @@
+from .conftest import import_module
+import importlib, os
+import pytest
+
+config_module = import_module("config")
+cli = importlib.import_module("data-filter")
+
+
+def test_project_config_validates():
+    config = config_module.load_config(
+        os.path.join(
+            os.path.dirname(os.path.dirname(__file__)), "config", "config.yaml"
+        )
+    )
+    assert config.data_loader.trusted_input is False
+    assert config.data_loader.xml_record_tag is None
+
+
+def test_config_sets_option_defaults(tmp_path, monkeypatch):
+    path = tmp_path / "config.yaml"
+    path.write_text("data_loader:\n  trusted_input: true\n")
+    monkeypatch.setenv(config_module.CONFIG_PATH_VARIABLE, str(path))
+    config = config_module.get_config()
+    args = cli._build_run_parser(config).parse_args(["run", "data.json"])
+    assert args.trusted is True
+    args = cli._build_run_parser(config).parse_args(
+        ["run", "data.json", "--no-trusted"]
+    )
+    assert args.trusted is False
+    args = cli._build_parser(config).parse_args(["load", "data.json"])
+    assert args.trusted is True
+
+
+def test_invalid_config(tmp_path, monkeypatch):
+    path = tmp_path / "config.yaml"
+    path.write_text("data_loader:\n  loader_name: txt\n")
+    monkeypatch.setenv(config_module.CONFIG_PATH_VARIABLE, str(path))
+    with pytest.raises(ValueError):
+        config_module.get_config()
+    assert cli.run_cli(["run", "data.json"]) == cli.EXIT_USAGE
+
+
+def test_config_sets_memory_budget(tmp_path, monkeypatch):
+    path = tmp_path / "config.yaml"
+    path.write_text("sorter:\n  memory_budget_mb: 64\n")
+    monkeypatch.setenv(config_module.CONFIG_PATH_VARIABLE, str(path))
+    parser = cli._build_parser(config_module.get_config())
+    args = parser.parse_args(["sort-file", "data.csv", "sorted.csv", "id"])
+    assert args.memory_budget == 64
+
+
+def test_config_sets_record_tag(tmp_path, monkeypatch):
+    path = tmp_path / "config.yaml"
+    path.write_text("data_loader:\n  xml_record_tag: flower\n")
+    monkeypatch.setenv(config_module.CONFIG_PATH_VARIABLE, str(path))
+    config = config_module.get_config()
+    args = cli._build_parser(config).parse_args(["load", "data.xml"])
+    assert args.record_tag == "flower"
+    args = cli._build_run_parser(config).parse_args(["run", "data.xml"])
+    assert args.record_tag == "flower"
+
+
+def test_config_sets_cache(tmp_path, monkeypatch):
+    path = tmp_path / "config.yaml"
+    path.write_text(f"cache:\n  directory: {tmp_path / 'cache'}\n  max_size_mb: 8\n")
+    monkeypatch.setenv(config_module.CONFIG_PATH_VARIABLE, str(path))
+    cache = cli._get_dataset_cache()
+    assert cache.directory == str(tmp_path / "cache")
+    assert cache.max_size == 8 * 1024 * 1024
@@ -0,0 +1,63 @@
+from .conftest import import_module
+import pandas as pd
+import pytest
+
+CSVDataLoader = import_module("data_loader.csv_data_loader").CSVDataLoader
+CSVFilter = import_module("filter.csv_filter").CSVFilter
+
+
+def _full_filter(path, column, value, comparison):
+    filterer = CSVFilter(pd.read_csv(path))
+    filterer.filter_by_column(column, value, comparison=comparison)
+    return filterer.get_filtered_dataframe()
+
+
+@pytest.mark.parametrize(
+    "column, value, comparison",
+    [("code", 5, "eq"), ("code", "5", "eq"), ("amount", 2.5, "gt"), ("id", 7, "lt")],
+)
+def test_chunked_filter_matches_full_filter(tmp_path, column, value, comparison):
+    path = tmp_path / "mixed.csv"
+    # code is numeric in the first chunks and text in the last one, amount has a
+    # missing value in the second chunk only
+    path.write_text(
+        "id,code,amount\n"
+        "1,5,1.5\n2,5,2.5\n3,7,3.5\n4,5,\n5,x,4.5\n6,5,5.5\n7,y,6.5\n8,5,7.5\n"
+    )
+    chunked = CSVDataLoader(str(path)).load_filtered_data(
+        column, value, comparison=comparison, chunksize=2
+    )
+    pd.testing.assert_frame_equal(
+        chunked, _full_filter(str(path), column, value, comparison)
+    )
+
+
+def test_chunked_filter_projects_columns(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("id,code,amount\n1,5,1.5\n2,6,2.5\n3,5,3.5\n")
+    chunked = CSVDataLoader(str(path)).load_filtered_data(
+        "code", 5, chunksize=1, usecols=["amount"]
+    )
+    assert chunked.columns.tolist() == ["amount"]
+    assert chunked["amount"].tolist() == [1.5, 3.5]
+
+
+def test_mmap_load_warns_about_non_numeric_columns(tmp_path, capsys):
+    path = tmp_path / "data.csv"
+    path.write_text("id,name,amount,flag\n1,a,1.5,true\n2,b,2.5,false\n")
+    loader = CSVDataLoader(str(path))
+    for _ in range(2):
+        # converted on the first load, read from the .npy files on the second
+        data = loader.load_mmap_data()
+        assert data.columns.tolist() == ["id", "amount", "flag"]
+        assert "not memory-mapped: name" in capsys.readouterr().out
+
+
+def test_mmap_load_rejects_non_numeric_usecols(tmp_path, capsys):
+    path = tmp_path / "data.csv"
+    path.write_text("id,name\n1,a\n")
+    assert CSVDataLoader(str(path)).load_mmap_data(usecols=["id", "name"]) is None
+    assert "not converted to .npy: name" in capsys.readouterr().out
+    numeric = CSVDataLoader(str(path)).load_mmap_data(usecols=["id"])
+    assert numeric.columns.tolist() == ["id"]
+    assert "not memory-mapped" not in capsys.readouterr().out
@@ -0,0 +1,75 @@
+from .conftest import import_module
+import pandas as pd
+import pytest
+
+CSVFilter = import_module("filter.csv_filter").CSVFilter
+
+LISTS = [[1, 2, 3], [], [5], [2.5, 4], [-1, 10, 3], [2, 2], [1.5, 2, 2.5], [7, 0]]
+
+
+def _frame():
+    return pd.DataFrame({"id": range(len(LISTS)), "values": LISTS})
+
+
+def _apply_ids(predicate):
+    """
+    The ids kept by the row by row Series.apply filters the vectorized ones replaced,
+    empty lists being filtered out.
+    """
+    return [i for i, values in enumerate(LISTS) if values and predicate(values)]
+
+
+def _filtered_ids(method, *args, **kwargs):
+    filterer = CSVFilter(_frame())
+    getattr(filterer, method)("values", *args, **kwargs)
+    return filterer.get_filtered_dataframe()["id"].tolist()
+
+
+@pytest.mark.parametrize("min_value", [-1, 0, 1.5, 2, 5, 11])
+def test_list_min_matches_apply(min_value):
+    assert _filtered_ids("filter_by_list_min", min_value) == _apply_ids(
+        lambda values: min(values) >= min_value
+    )
+
+
+@pytest.mark.parametrize("max_value", [-1, 2, 2.5, 5, 10])
+def test_list_max_matches_apply(max_value):
+    assert _filtered_ids("filter_by_list_max", max_value) == _apply_ids(
+        lambda values: max(values) <= max_value
+    )
+
+
+@pytest.mark.parametrize("comparison", ["eq", "lt", "gt"])
+@pytest.mark.parametrize("avg_value", [2, 3.25, 4, 5])
+def test_list_average_matches_apply(avg_value, comparison):
+    compare = {
+        "eq": lambda a: a == avg_value,
+        "lt": lambda a: a < avg_value,
+        "gt": lambda a: a > avg_value,
+    }[comparison]
+    assert _filtered_ids(
+        "filter_by_list_average", avg_value, comparison=comparison
+    ) == _apply_ids(lambda values: compare(sum(values) / len(values)))
+
+
+@pytest.mark.parametrize("elements", [[], [2], [2, 3], [2.5], [0, 7], [9]])
+def test_list_all_elements_matches_apply(elements):
+    expected = [
+        i for i, values in enumerate(LISTS) if all(e in values for e in elements)
+    ]
+    assert _filtered_ids("filter_by_list_all_elements", elements) == expected
+
+
+def test_chained_list_filters_follow_the_kept_rows():
+    filterer = CSVFilter(_frame())
+    filterer.filter_by_list_min("values", 1)
+    filterer.filter_by_list_all_elements("values", [2])
+    filterer.filter_by_list_max("values", 2.5)
+    assert filterer.get_filtered_dataframe()["id"].tolist() == _apply_ids(
+        lambda values: min(values) >= 1 and 2 in values and max(values) <= 2.5
+    )
+
+
+def test_list_average_rejects_unknown_comparisons():
+    with pytest.raises(ValueError):
+        _filtered_ids("filter_by_list_average", 1, comparison="le")
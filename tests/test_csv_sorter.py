@@ -0,0 +1,55 @@
+from .conftest import import_module
+import numpy as np
+import pandas as pd
+import pytest
+
+CSVSorter = import_module("sorter.csv_sorter").CSVSorter
+
+
+def _frame():
+    return pd.DataFrame(
+        {
+            "n": [5, 3, 5, 1, np.nan, 3, 5, 2, 1, 4, 3, np.nan],
+            "m": [1, 0, 1, 1, 0, 0, 0, 1, 1, 0, 1, 0],
+            "name": ["e", "c", "e", "a", "z", "c", "e", "b", "a", "d", "c", "y"],
+        },
+        index=[f"row{i}" for i in range(12)],
+    )
+
+
+@pytest.mark.parametrize("column", ["n", "name"])
+@pytest.mark.parametrize("ascending", [True, False])
+@pytest.mark.parametrize("limit", [0, 1, 2, 4, 6, 10, 11, 12, 30])
+def test_top_k_matches_a_stable_full_sort(column, ascending, limit):
+    frame = _frame()
+    expected = frame.sort_values(column, ascending=ascending, kind="stable")
+    sorter = CSVSorter(frame)
+    sorter.sort_by_column(column, ascending=ascending, limit=limit)
+    pd.testing.assert_frame_equal(sorter.dataframe, expected.head(limit))
+
+
+@pytest.mark.parametrize(
+    "columns, ascending",
+    [
+        (["m", "name"], [True, True]),
+        (["m", "name"], [False, False]),
+        (["m", "n"], [True, False]),
+        (["m", "n"], [True, True]),
+    ],
+)
+@pytest.mark.parametrize("limit", [1, 3, 5, 12])
+def test_top_k_of_several_columns_matches_a_stable_full_sort(columns, ascending, limit):
+    frame = _frame()
+    expected = frame.sort_values(columns, ascending=ascending, kind="stable")
+    sorter = CSVSorter(frame)
+    sorter.sort_by_multiple_columns(columns, ascending=ascending, limit=limit)
+    pd.testing.assert_frame_equal(sorter.dataframe, expected.head(limit))
+
+
+def test_sorting_leaves_the_dataframe_unchanged():
+    frame = _frame()
+    before = frame.copy()
+    sorter = CSVSorter(frame)
+    sorter.sort_by_column("n", limit=3)
+    sorter.sort_by_multiple_columns(["m", "name"])
+    pd.testing.assert_frame_equal(frame, before)
@@ -0,0 +1,38 @@
+from .conftest import import_module
+import random
+import pandas as pd
+import pytest
+
+ExternalSorter = import_module("sorter.external_sorter").ExternalSorter
+
+
+def _write_csv(path, line_break="\n"):
+    rng = random.Random(7)
+    lines = ["id,code,price,label"]
+    for row in range(5000):
+        code = rng.choice(["007", "42", "", "3"])
+        price = rng.choice(["1.50", "2", "", "10.25"])
+        label = rng.choice(['"a, b"', '"multi\nline"', "plain", '""'])
+        lines.append(f"{rng.randrange(1000)},{code},{price},{label}")
+    path.write_bytes(line_break.join(lines).encode() + line_break.encode())
+    return lines
+
+
+@pytest.mark.parametrize("keys", [["id"], ["code", "price"], ["price", "id"]])
+@pytest.mark.parametrize("line_break", ["\n", "\r\n"])
+def test_external_csv_sort_keeps_rows_byte_identical(tmp_path, keys, line_break):
+    source = tmp_path / "data.csv"
+    lines = _write_csv(source, line_break)
+    output = tmp_path / "sorted.csv"
+    sorter = ExternalSorter(keys, memory_budget=64 * 1024)
+    assert sorter.sort_csv_file(str(source), str(output), chunksize=500) == 5000
+    assert sorter.run_count > 1
+
+    sorted_bytes = output.read_bytes()
+    # same rows, byte for byte
+    assert sorted(sorted_bytes.split(line_break.encode())) == sorted(
+        line_break.join(lines).encode().split(line_break.encode()) + [b""]
+    )
+    # in the order of DataFrame.sort_values on the whole file
+    expected = pd.read_csv(source).sort_values(keys, kind="stable")
+    pd.testing.assert_frame_equal(pd.read_csv(output), expected.reset_index(drop=True))
@@ -0,0 +1,92 @@
+from .conftest import import_module
+import json
+import pandas as pd
+import pytest
+
+IncrementalStats = import_module("stats.incremental_stats").IncrementalStats
+CSVStats = import_module("stats.csv_stats").CSVStats
+JSONStats = import_module("stats.json_stats").JSONStats
+JsonDataLoader = import_module("data_loader.json_data_loader").JsonDataLoader
+
+
+def _assert_stats_equal(stats, expected):
+    # sums are added in another order, compare floats approximately
+    if isinstance(expected, dict):
+        assert isinstance(stats, dict) and stats.keys() == expected.keys()
+        for key in expected:
+            _assert_stats_equal(stats[key], expected[key])
+    elif isinstance(expected, float):
+        assert stats == pytest.approx(expected, nan_ok=True)
+    else:
+        assert stats == expected
+
+
+def _csv_rows(start, stop):
+    return "".join(
+        f"{i},{i * 1.5 if i % 4 else ''},{'true' if i % 3 else 'false'},n{i % 5}\n"
+        for i in range(start, stop)
+    )
+
+
+def _full_csv_stats(path):
+    return CSVStats(pd.read_csv(path)).get_all_stats()
+
+
+def _json_items(start, stop):
+    return [
+        {"item": {"id": i, "score": i / 3, "ok": i % 2 == 0, "tags": ["a"] * (i % 4)}}
+        for i in range(start, stop)
+    ]
+
+
+def _append_json(path, items):
+    # like a writer appending to the data array: only the closing "]}" is rewritten
+    content = path.read_bytes()
+    end = content.rindex(b"]")
+    added = ",\n".join(json.dumps(item) for item in items).encode()
+    path.write_bytes(content[:end] + b",\n" + added + b"\n]}\n")
+
+
+def _assert_restored(path, row_count):
+    # the sidecar still describes a prefix of the file: only the rest is read
+    stats = IncrementalStats(str(path))
+    stats._restore()
+    assert stats.row_count == row_count
+
+
+def _full_json_stats(path):
+    return JSONStats(JsonDataLoader(str(path)).load_data()).get_all_stats()
+
+
+def test_incremental_csv_stats_match_full_stats(tmp_path):
+    path = tmp_path / "events.csv"
+    path.write_text("id,amount,flag,name\n" + _csv_rows(0, 1000))
+    stats = IncrementalStats(str(path), block_size=4096)
+    _assert_stats_equal(stats.refresh(), _full_csv_stats(path))
+    for start in (1000, 1500):
+        with open(path, "a") as file:
+            file.write(_csv_rows(start, start + 500))
+        _assert_restored(path, start)
+        stats = IncrementalStats(str(path), block_size=4096)
+        _assert_stats_equal(stats.refresh(), _full_csv_stats(path))
+        assert stats.row_count == start + 500
+
+
+def test_csv_stats_of_a_rewritten_file_are_recomputed(tmp_path):
+    path = tmp_path / "events.csv"
+    path.write_text("id,amount,flag,name\n" + _csv_rows(0, 100))
+    IncrementalStats(str(path)).refresh()
+    path.write_text("id,amount,flag,name\n" + _csv_rows(50, 120))
+    _assert_stats_equal(IncrementalStats(str(path)).refresh(), _full_csv_stats(path))
+
+
+def test_incremental_json_stats_match_full_stats(tmp_path):
+    path = tmp_path / "events.json"
+    path.write_text(json.dumps({"data": _json_items(0, 300)}, indent=1))
+    _assert_stats_equal(IncrementalStats(str(path)).refresh(), _full_json_stats(path))
+    for start in (300, 450):
+        _append_json(path, _json_items(start, start + 150))
+        _assert_restored(path, start)
+        stats = IncrementalStats(str(path))
+        _assert_stats_equal(stats.refresh(), _full_json_stats(path))
+        assert stats.row_count == start + 150
@@ -0,0 +1,72 @@
+from .conftest import import_module
+import math
+import numpy as np
+import pandas as pd
+import pytest
+
+CSVFilter = import_module("filter.csv_filter").CSVFilter
+JSONFilter = import_module("filter.json_filter").JSONFilter
+JsonDataContainer = import_module(
+    "models.data_containers.json_data_container"
+).JsonDataContainer
+index = import_module("models.index")
+
+BIG = 2**53
+
+COLUMNS = {
+    "ints": [3, 1, BIG + 1, BIG, -5, 2, BIG + 3, 0],
+    "floats": [1.5, math.nan, -2.0, 3.25, 0.0, math.inf, 7.0, 2.5],
+    "strings": ["b", "a", "d", "c", "a", "e", "b", "f"],
+}
+VALUES = [0, 2, 2.5, -math.inf, math.inf, math.nan, BIG, BIG + 1, 2.0**63, "c", True]
+
+
+def _scan_or_error(filter_rows, *args):
+    try:
+        return filter_rows(*args)
+    except TypeError:
+        return TypeError
+
+
+def _json_rows(column, value, comparison, use_index):
+    container = JsonDataContainer.model_validate(
+        {"data": [{"item": {column: v}} for v in COLUMNS[column]]}
+    )
+    filterer = JSONFilter(container, use_index=use_index)
+    filterer.filter_by_key(column, value, comparison=comparison)
+    return [item.item[column] for item in filterer.get_filtered_data().data]
+
+
+def _csv_rows(column, value, comparison, use_index):
+    filterer = CSVFilter(pd.DataFrame(COLUMNS), use_index=use_index)
+    filterer.filter_by_column(column, value, comparison=comparison)
+    return filterer.get_filtered_dataframe().index.tolist()
+
+
+@pytest.mark.parametrize("rows", [_json_rows, _csv_rows])
+@pytest.mark.parametrize("column", list(COLUMNS))
+@pytest.mark.parametrize("comparison", ["eq", "lt", "gt"])
+@pytest.mark.parametrize("value", VALUES)
+def test_index_matches_scan(rows, column, comparison, value):
+    scanned = _scan_or_error(rows, column, value, comparison, False)
+    indexed = _scan_or_error(rows, column, value, comparison, True)
+    if scanned is TypeError:
+        assert indexed is TypeError
+    else:
+        assert indexed == scanned
+
+
+def test_sorted_index_keeps_int64_keys():
+    sorted_index = index.build_index(COLUMNS["ints"], "sorted")
+    assert sorted_index.range(BIG, "gt").tolist() == [2, 6]
+    assert sorted_index.range(BIG + 1, "lt").tolist() == [0, 1, 3, 4, 5, 7]
+
+
+def test_edited_items_need_invalidate_indexes():
+    container = JsonDataContainer.model_validate(
+        {"data": [{"item": {"x": 1}}, {"item": {"x": 2}}]}
+    )
+    assert container.get_index("x", "hash").lookup(5).tolist() == []
+    container.data[0].item["x"] = 5
+    container.invalidate_indexes()
+    assert container.get_index("x", "hash").lookup(5).tolist() == [0]
@@ -0,0 +1,116 @@
+from .conftest import import_module
+import copy
+import numpy as np
+import pandas as pd
+import pytest
+
+JSONFilter = import_module("filter.json_filter").JSONFilter
+CSVFilter = import_module("filter.csv_filter").CSVFilter
+JsonSorter = import_module("sorter.json_sorter").JsonSorter
+predicate = import_module("filter.predicate")
+JsonDataContainer = import_module(
+    "models.data_containers.json_data_container"
+).JsonDataContainer
+ColumnarJsonDataContainer = import_module(
+    "models.data_containers.columnar_json_data_container"
+).ColumnarJsonDataContainer
+JsonDataView = import_module("models.data_containers.json_data_view").JsonDataView
+
+RECORDS = [
+    {"id": i, "n": (i * 7) % 10, "name": f"item {i % 3}", "tags": list(range(i % 4))}
+    for i in range(12)
+]
+
+
+def _container(columnar):
+    if columnar:
+        return ColumnarJsonDataContainer.from_records(RECORDS)
+    return JsonDataContainer.model_validate(
+        {"data": [{"item": record} for record in RECORDS]}
+    )
+
+
+def _records(data):
+    return [dict(item.item) for item in data.data]
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_filters_return_views_and_leave_the_container_unchanged(columnar):
+    container = _container(columnar)
+    before = copy.deepcopy(_records(container))
+    filterer = JSONFilter(container)
+    filterer.filter_by_key("n", 5, comparison="lt")
+    filterer.filter_by_string_contains("name", "1")
+    view = filterer.get_filtered_data()
+
+    assert isinstance(view, JsonDataView)
+    assert view.base is container
+    expected = [r for r in RECORDS if r["n"] < 5 and "1" in r["name"]]
+    assert [view[i] for i in range(len(view))] == expected
+    assert list(view.items()) == expected
+    assert _records(view.to_container()) == expected
+    assert _records(container) == before == RECORDS
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_views_of_views_share_the_base(columnar):
+    container = _container(columnar)
+    first = JSONFilter(container)
+    first.filter_by_key("n", 2, comparison="gt")
+    view = first.get_filtered_data()
+    second = JSONFilter(view)
+    second.filter_by_predicate(predicate.parse_expression("id lt 8"))
+    narrowed = second.get_filtered_data()
+
+    assert narrowed.base is container
+    assert narrowed.indices.tolist() == [
+        r["id"] for r in RECORDS if r["n"] > 2 and r["id"] < 8
+    ]
+    assert len(view) == len([r for r in RECORDS if r["n"] > 2])
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_sorting_a_view_reorders_the_selection_only(columnar):
+    container = _container(columnar)
+    filterer = JSONFilter(container)
+    filterer.filter_by_key("n", 3, comparison="gt")
+    sorter = JsonSorter(filterer.get_filtered_data())
+    sorter.sort_by_key("n", reverse=True)
+    view = sorter.data_container
+
+    assert view.base is container
+    expected = sorted(
+        (r for r in RECORDS if r["n"] > 3), key=lambda r: r["n"], reverse=True
+    )
+    assert list(view.items()) == expected
+    assert _records(container) == RECORDS
+
+
+def test_full_views_materialize_to_their_base():
+    container = _container(columnar=True)
+    view = JsonDataView.of(container)
+    assert view.is_full
+    assert JsonDataView.of(view) is view
+    assert view.to_container() is container
+    assert view.column("n") is container.columns["n"]
+
+    selected = view.select(np.array([3, 1]))
+    assert not selected.is_full
+    assert selected.column("n").to_list() == [RECORDS[3]["n"], RECORDS[1]["n"]]
+    subset = selected.to_container(keys=["id", "absent"])
+    assert list(subset.columns) == ["id"]
+    assert [subset[i] for i in range(len(subset))] == [{"id": 3}, {"id": 1}]
+
+
+def test_csv_filters_narrow_a_selection_vector():
+    frame = pd.DataFrame(RECORDS)
+    before = frame.copy()
+    filterer = CSVFilter(frame)
+    filterer.filter_by_column("n", 5, comparison="lt")
+    filterer.filter_by_list_min("tags", 0)
+    filterer.filter_by_string_endswith("name", "2")
+    result = filterer.get_filtered_dataframe()
+
+    mask = (frame["n"] < 5) & frame["tags"].map(bool) & frame["name"].str.endswith("2")
+    pd.testing.assert_frame_equal(result, frame[mask])
+    pd.testing.assert_frame_equal(frame, before)
@@ -0,0 +1,129 @@
+from .conftest import import_module
+import pytest
+
+JsonSorter = import_module("sorter.json_sorter").JsonSorter
+JsonDataContainer = import_module(
+    "models.data_containers.json_data_container"
+).JsonDataContainer
+ColumnarJsonDataContainer = import_module(
+    "models.data_containers.columnar_json_data_container"
+).ColumnarJsonDataContainer
+
+INT64_MIN = -(2**63)
+INT64_MAX = 2**63 - 1
+
+
+def _containers(records):
+    yield JsonDataContainer.model_validate(
+        {"data": [{"item": record} for record in records]}
+    )
+    yield ColumnarJsonDataContainer.from_records(records)
+
+
+def _sorted_values(records, key, keys=None, read=None, **options):
+    """
+    Sort the records by key, or by keys with sort_by_multiple_keys, and get the values
+    of read, key by default, in sorted order.
+    """
+    results = []
+    for container in _containers(records):
+        sorter = JsonSorter(container)
+        if keys is None:
+            sorter.sort_by_key(key, **options)
+        else:
+            sorter.sort_by_multiple_keys(keys, **options)
+        results.append(
+            [item.get(read or key) for item in sorter.data_container.items()]
+        )
+    assert results[0] == results[1]
+    return results[0]
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+@pytest.mark.parametrize(
+    "values",
+    [
+        [INT64_MIN, 0, INT64_MAX],
+        [INT64_MAX, INT64_MIN, -1, INT64_MIN, 1],
+        [True, False, True],
+        [2**63, 0, 2**64 - 1],
+        [0.5, -1.5, float("inf"), -float("inf")],
+        ["b", "a", "c"],
+    ],
+)
+def test_multiple_keys_match_a_stable_sort(values, reverse):
+    records = [{"value": value, "position": i} for i, value in enumerate(values)]
+    expected = sorted(values, reverse=reverse)
+    assert _sorted_values(records, "value", keys=["value"], reverse=reverse) == expected
+    assert _sorted_values(records, "value", reverse=reverse) == expected
+
+
+def test_multiple_keys_reverse_keeps_ties_in_order():
+    records = [
+        {"a": INT64_MIN, "b": 1, "position": 0},
+        {"a": INT64_MAX, "b": 0, "position": 1},
+        {"a": INT64_MIN, "b": 1, "position": 2},
+        {"a": INT64_MIN, "b": 2, "position": 3},
+    ]
+    expected = sorted(
+        records, key=lambda record: (record["a"], record["b"]), reverse=True
+    )
+    assert _sorted_values(records, "position", keys=["a", "b"], reverse=True) == [
+        record["position"] for record in expected
+    ]
+
+
+def test_multiple_keys_places_missing_values():
+    records = [{"value": 2}, {}, {"value": INT64_MIN}, {"value": []}]
+    assert _sorted_values(records, "value", keys=["value"], reverse=True) == [
+        2,
+        INT64_MIN,
+        None,
+        [],
+    ]
+    assert _sorted_values(
+        records, "value", keys=["value"], reverse=True, nulls="first"
+    ) == [None, [], 2, INT64_MIN]
+
+
+TIES = [5, 3, 5, 1, 3, 5, 2, 1, 4, 3]
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+@pytest.mark.parametrize("limit", [0, 1, 2, 3, 5, 9, 10, 20])
+def test_top_k_matches_a_stable_full_sort(limit, reverse):
+    records = [{"value": value, "position": i} for i, value in enumerate(TIES)]
+    records.insert(4, {"position": -1})
+    expected = [
+        record["position"]
+        for record in sorted(
+            (record for record in records if "value" in record),
+            key=lambda record: record["value"],
+            reverse=reverse,
+        )
+    ] + [-1]
+    for keys in (None, ["value"]):
+        positions = _sorted_values(
+            records, "value", keys=keys, read="position", reverse=reverse, limit=limit
+        )
+        assert positions == expected[:limit]
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+@pytest.mark.parametrize("limit", [1, 4, 7])
+def test_top_k_of_several_keys_matches_a_stable_full_sort(limit, reverse):
+    records = [
+        {"a": value % 2, "b": value, "position": i} for i, value in enumerate(TIES)
+    ]
+    expected = sorted(
+        records, key=lambda record: (record["a"], record["b"]), reverse=reverse
+    )
+    assert _sorted_values(
+        records, "position", keys=["a", "b"], reverse=reverse, limit=limit
+    ) == [record["position"] for record in expected[:limit]]
+
+
+def test_negative_limits_are_rejected():
+    sorter = JsonSorter(ColumnarJsonDataContainer.from_records([{"a": 1}]))
+    with pytest.raises(ValueError):
+        sorter.sort_by_key("a", limit=-1)
@@ -0,0 +1,125 @@
+from .conftest import import_module
+import numpy as np
+import pytest
+
+JSONStats = import_module("stats.json_stats").JSONStats
+StatsAccumulator = import_module("stats.accumulators").StatsAccumulator
+JsonDataContainer = import_module(
+    "models.data_containers.json_data_container"
+).JsonDataContainer
+ColumnarJsonDataContainer = import_module(
+    "models.data_containers.columnar_json_data_container"
+).ColumnarJsonDataContainer
+JsonDataView = import_module("models.data_containers.json_data_view").JsonDataView
+
+RECORDS = [
+    {"n": 3, "flag": True, "tags": [1, 2], "mixed": 1, "name": "a"},
+    {"n": -1.5, "flag": False, "tags": [], "mixed": "x", "words": ["a", "b"]},
+    {"n": 2**60, "flag": True, "tags": [1.5, 2, 3], "mixed": [True]},
+    {"flag": False, "mixed": False, "words": []},
+    {"n": 0, "tags": [7], "mixed": 2.5},
+]
+
+
+def _reference_stats(records):
+    """
+    The stats computed the way JSONStats did before the fused pass: every value of a
+    key collected in a list, then reduced with NumPy.
+    """
+    numbers, booleans, sizes = {}, {}, {}
+    for record in records:
+        for key, value in record.items():
+            if isinstance(value, (int, float)):
+                numbers.setdefault(key, []).append(value)
+            elif isinstance(value, list) and all(
+                isinstance(i, (int, float)) for i in value
+            ):
+                numbers.setdefault(key, []).append(len(value))
+            if isinstance(value, bool):
+                counts = booleans.setdefault(key, [0, 0])
+                counts[0 if value else 1] += 1
+            if isinstance(value, list):
+                sizes.setdefault(key, []).append(len(value))
+    return {
+        "numeric_stats": {
+            key: {
+                "min": np.min(values),
+                "max": np.max(values),
+                "average": np.mean(values),
+            }
+            for key, values in numbers.items()
+        },
+        "boolean_stats": {
+            key: {
+                "true_percentage": true * 100 / (true + false),
+                "false_percentage": false * 100 / (true + false),
+            }
+            for key, (true, false) in booleans.items()
+        },
+        "list_stats": {
+            key: {
+                "min_size": np.min(values),
+                "max_size": np.max(values),
+                "average_size": np.mean(values),
+            }
+            for key, values in sizes.items()
+        },
+    }
+
+
+def _assert_stats_equal(actual, expected):
+    assert actual.keys() == expected.keys()
+    for key, value in expected.items():
+        if isinstance(value, dict):
+            _assert_stats_equal(actual[key], value)
+        else:
+            assert actual[key] == pytest.approx(float(value))
+
+
+def _containers(records):
+    rows = JsonDataContainer.model_validate(
+        {"data": [{"item": record} for record in records]}
+    )
+    columnar = ColumnarJsonDataContainer.from_records(records)
+    return {
+        "rows": rows,
+        "columnar": columnar,
+        "row view": JsonDataView.of(rows).select(np.arange(len(records))),
+        "columnar view": JsonDataView.of(columnar).select(np.arange(len(records))),
+    }
+
+
+@pytest.mark.parametrize("kind", ["rows", "columnar", "row view", "columnar view"])
+def test_fused_stats_match_the_reference(kind):
+    stats = JSONStats(_containers(RECORDS)[kind])
+    expected = _reference_stats(RECORDS)
+    _assert_stats_equal(stats.get_all_stats(), expected)
+    _assert_stats_equal(stats.get_numeric_stats(), expected["numeric_stats"])
+    _assert_stats_equal(stats.get_boolean_stats(), expected["boolean_stats"])
+    _assert_stats_equal(stats.get_list_stats(), expected["list_stats"])
+
+
+def test_ints_keep_their_exact_min_and_max():
+    numeric = JSONStats(_containers(RECORDS)["columnar"]).get_numeric_stats()
+    assert numeric["n"]["max"] == 2**60
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 5])
+def test_stream_stats_match_the_stats_of_the_whole_data(batch_size):
+    batches = [
+        ColumnarJsonDataContainer.from_records(RECORDS[start : start + batch_size])
+        for start in range(0, len(RECORDS), batch_size)
+    ]
+    _assert_stats_equal(JSONStats.get_stream_stats(batches), _reference_stats(RECORDS))
+    _assert_stats_equal(
+        JSONStats.get_stream_stats(iter(RECORDS)), _reference_stats(RECORDS)
+    )
+
+
+def test_merged_accumulators_match_a_single_pass():
+    merged = StatsAccumulator()
+    for record in RECORDS:
+        part = StatsAccumulator()
+        part.update(record)
+        merged.merge(StatsAccumulator.from_dict(part.to_dict()))
+    _assert_stats_equal(merged.get_all_stats(), _reference_stats(RECORDS))
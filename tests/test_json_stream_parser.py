@@ -0,0 +1,80 @@
+from .conftest import import_module
+import io, json
+import pytest
+
+JsonArrayStreamParser = import_module(
+    "data_loader.json_stream_parser"
+).JsonArrayStreamParser
+JsonDataLoader = import_module("data_loader.json_data_loader").JsonDataLoader
+
+ITEMS = [
+    {"item": {"name": "a", "n": 1, "tags": [1, 2.5, "x"], "nested": {"k": [None]}}},
+    {"item": {"name": 'é ü ☃ "quoted" \\ ]}', "n": -1.5e300, "big": 2**70}},
+    {"item": {"name": "", "n": 0, "flag": True, "none": None, "list": []}},
+    {"item": {"n": 123456789012345678901234567890}},
+]
+
+VALID_ITEMS = [
+    {"item": {"name": "a", "n": 1, "tags": [1, 2.5, "x"]}},
+    {"item": {"name": 'é ü ☃ "quoted" \\ ]}', "n": -1.5e300, "big": 2**70}},
+    {"item": {"name": "", "n": 0, "flag": True, "list": []}},
+]
+
+DOCUMENTS = [
+    {"data": ITEMS},
+    {"meta": {"data": [1, 2]}, "data": ITEMS, "after": "ignored"},
+    {"other": [{"a": "]"}, "}"], "data": ITEMS},
+    {"data": []},
+    {"data": [1, "two", [3], {"four": 4}, None, False, 1.5]},
+]
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+@pytest.mark.parametrize("indent", [None, 2])
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 1 << 16])
+def test_stream_matches_json_load(document, indent, chunk_size):
+    text = json.dumps(document, indent=indent, ensure_ascii=False)
+    parser = JsonArrayStreamParser(io.StringIO(text), chunk_size=chunk_size)
+    assert list(parser) == json.loads(text)["data"]
+
+
+def test_array_end_offset_points_at_the_closing_bracket():
+    text = json.dumps({"data": ITEMS, "after": "é"}, ensure_ascii=False)
+    parser = JsonArrayStreamParser(io.StringIO(text), chunk_size=5)
+    list(parser)
+    raw = text.encode("utf-8")
+    assert raw[parser.array_end_offset : parser.array_end_offset + 1] == b"]"
+    assert json.loads(raw[: parser.array_end_offset + 1].decode() + "}") == {
+        "data": ITEMS
+    }
+
+
+@pytest.mark.parametrize(
+    "text, error",
+    [
+        ('{"other": []}', KeyError),
+        ('{"data": [1, 2', json.JSONDecodeError),
+        ('{"data": [1 2]}', json.JSONDecodeError),
+        ('["data"]', json.JSONDecodeError),
+    ],
+)
+def test_invalid_documents_raise(text, error):
+    with pytest.raises(error):
+        list(JsonArrayStreamParser(io.StringIO(text), chunk_size=2))
+
+
+@pytest.mark.parametrize("batch_size", [None, 1, 3])
+def test_loader_streams_the_items_of_a_full_load(tmp_path, batch_size):
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps({"data": VALID_ITEMS}), encoding="utf-8")
+    loader = JsonDataLoader(str(path))
+    loader.write_zone_maps = False
+    expected = [item.item for item in loader.load_data().data]
+    streamed = []
+    for element in loader.iter_data(batch_size=batch_size):
+        if batch_size is None:
+            streamed.append(element.item)
+        else:
+            assert len(element.data) <= batch_size
+            streamed.extend(item.item for item in element.data)
+    assert streamed == expected == [item["item"] for item in VALID_ITEMS]
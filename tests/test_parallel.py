@@ -0,0 +1,43 @@
+from .conftest import import_module
+import pandas as pd
+import pytest
+
+parallel = import_module("parallel")
+predicate = import_module("filter.predicate")
+CSVStats = import_module("stats.csv_stats").CSVStats
+zone_map = import_module("data_loader.zone_map")
+
+
+@pytest.fixture
+def mixed_csv(tmp_path):
+    # code looks numeric in the first rows only, flag is a bool with missing values
+    path = tmp_path / "data.csv"
+    rows = [f"{i},{i % 2},{'true' if i % 3 else ''},{i * 0.5}" for i in range(400)]
+    rows += [f"{i},x{i % 2},false,{i * 0.5}" for i in range(400, 500)]
+    path.write_text("id,code,flag,amount\n" + "\n".join(rows) + "\n")
+    return path
+
+
+def _expected(path, expression):
+    data = pd.read_csv(path)
+    return data[predicate.parse_expression(expression).mask(data)]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("with_zone_map", [False, True])
+@pytest.mark.parametrize(
+    "expression", ["code eq 1", 'code eq "1"', "amount gt 100", "flag eq true"]
+)
+def test_executor_matches_single_process(mixed_csv, workers, with_zone_map, expression):
+    if with_zone_map:
+        zone_map.ZoneMap.build(pd.read_csv(mixed_csv), str(mixed_csv)).save(
+            str(mixed_csv)
+        )
+    executor = parallel.ParallelExecutor(workers=workers, partition_size=1024)
+    condition = predicate.parse_expression(expression)
+    assert len(executor.partitions(str(mixed_csv))) > 2
+    expected = _expected(mixed_csv, expression)
+    pd.testing.assert_frame_equal(executor.filter(str(mixed_csv), condition), expected)
+    assert (
+        executor.stats(str(mixed_csv), condition) == CSVStats(expected).get_all_stats()
+    )
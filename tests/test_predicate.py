@@ -0,0 +1,78 @@
+from .conftest import import_module
+import pandas as pd
+import pytest
+
+predicate = import_module("filter.predicate")
+JSONFilter = import_module("filter.json_filter").JSONFilter
+ColumnarJsonDataContainer = import_module(
+    "models.data_containers.columnar_json_data_container"
+).ColumnarJsonDataContainer
+
+RECORDS = [
+    {"name": "a3b", "code": "12", "n": 3},
+    {"name": "true story", "code": "1.5", "n": 1},
+    {"name": "xyz", "code": "21", "n": 12},
+    {"n": 5},
+]
+
+
+def _matching(expression):
+    condition = predicate.parse_expression(expression)
+    evaluate = condition.compile()
+    expected = [record for record in RECORDS if evaluate(record)]
+    mask = condition.mask_columnar(ColumnarJsonDataContainer.from_records(RECORDS))
+    assert [record for record, keep in zip(RECORDS, mask) if keep] == expected
+    frame = pd.DataFrame(RECORDS)
+    assert frame[condition.mask(frame)]["n"].tolist() == [
+        record["n"] for record in expected
+    ]
+    return [record["n"] for record in expected]
+
+
+@pytest.mark.parametrize(
+    "expression, expected",
+    [
+        ("name contains 3", [3]),
+        ('name contains "3"', [3]),
+        ("name startswith true", [1]),
+        ("code startswith 1", [3, 1]),
+        ("code endswith 1", [12]),
+        ("code contains 1.5", [1]),
+        ("n gt 2 and code startswith 2", [12]),
+        ("not name contains 3", [1, 12, 5]),
+    ],
+)
+def test_string_operators_take_unquoted_tokens_as_strings(expression, expected):
+    assert _matching(expression) == expected
+
+
+@pytest.mark.parametrize(
+    "expression, value",
+    [
+        ("n eq 3", 3),
+        ("n gt 1.5", 1.5),
+        ('n eq "3"', "3"),
+        ("n eq true", True),
+        ("n has_all [1, 2]", [1, 2]),
+    ],
+)
+def test_literals_of_other_operators(expression, value):
+    assert predicate.parse_expression(expression).value == value
+
+
+@pytest.mark.parametrize("value", [3, 1.5, True, ["a"]])
+def test_string_operators_reject_other_values(value):
+    with pytest.raises(ValueError, match="must be a string"):
+        predicate.Condition("name", "contains", value)
+
+
+def test_string_operators_reject_lists_in_expressions():
+    with pytest.raises(ValueError, match="Quote it"):
+        predicate.parse_expression("name contains [1, 2]")
+
+
+def test_filter_by_predicate_with_an_unquoted_number():
+    container = ColumnarJsonDataContainer.from_records(RECORDS)
+    filterer = JSONFilter(container)
+    filterer.filter_by_predicate(predicate.parse_expression("name contains 3"))
+    assert [item.item["n"] for item in filterer.get_filtered_data().data] == [3]
@@ -0,0 +1,102 @@
+from .conftest import import_module
+import json
+import numpy as np
+import pandas as pd
+import pytest
+
+query_plan = import_module("query_plan")
+predicate = import_module("filter.predicate")
+
+QueryPlan = query_plan.QueryPlan
+
+# (step, values) pairs, in the order given to the plan
+PIPELINES = [
+    [("where", "x gt 20")],
+    [("sort", ["x"]), ("where", "y lt 50")],
+    [("where", "x gt 10"), ("where", "y lt 80"), ("sort", ["y", "x"])],
+    [("sort", ["x"]), ("limit", 15)],
+    [("sort", ["y"]), ("where", "flag eq true"), ("limit", 10), ("limit", 4)],
+    [("limit", 30), ("where", "x lt 25"), ("sort", ["x", "id"])],
+    [("sort", ["x"]), ("limit", 20), ("where", "y gt 30")],
+    [("where", "x gt 1000")],
+    [("sort", ["y"]), ("limit", 0)],
+]
+
+
+def _rows(count):
+    rng = np.random.default_rng(7)
+    return [
+        {
+            "id": position,
+            "x": int(rng.integers(0, 40)),
+            "y": float(rng.integers(0, 100)),
+            "flag": bool(rng.integers(0, 2)),
+        }
+        for position in range(count)
+    ]
+
+
+@pytest.fixture(params=["csv", "json"])
+def data_file(request, tmp_path):
+    rows = _rows(300)
+    path = tmp_path / f"data.{request.param}"
+    if request.param == "csv":
+        pd.DataFrame(rows).to_csv(path, index=False)
+    else:
+        path.write_text(json.dumps({"data": [{"item": row} for row in rows]}))
+    return str(path)
+
+
+def _plan(path, pipeline, reverse=False, workers=1):
+    plan = QueryPlan(path, workers=workers)
+    for step, values in pipeline:
+        if step == "where":
+            plan.where(predicate.parse_expression(values))
+        elif step == "sort":
+            plan.sort(values, reverse=reverse)
+        elif step == "limit":
+            plan.limit(values)
+    return plan
+
+
+def _unoptimized(plan):
+    # the steps as given, over every row, without pruning or top-k
+    rows = QueryPlan(plan.file_path).execute()
+    for step in plan.steps:
+        rows = step.apply(rows)
+    return rows
+
+
+def _records(rows):
+    if isinstance(rows, pd.DataFrame):
+        return rows.to_dict("records")
+    return list(rows.items())
+
+
+@pytest.mark.parametrize("pipeline", PIPELINES)
+@pytest.mark.parametrize("reverse", [False, True])
+def test_optimized_plan_matches_the_steps_as_given(data_file, pipeline, reverse):
+    plan = _plan(data_file, pipeline, reverse=reverse)
+    assert _records(plan.execute()) == _records(_unoptimized(plan))
+
+
+@pytest.mark.parametrize("pipeline", PIPELINES[:3])
+def test_parallel_plan_matches_the_steps_as_given(data_file, pipeline):
+    plan = _plan(data_file, pipeline, workers=2)
+    assert _records(plan.execute()) == _records(_unoptimized(plan))
+
+
+def test_optimize_rewrites_the_steps(data_file):
+    plan = _plan(data_file, PIPELINES[4])
+    assert [repr(step) for step in plan.optimize()] == [
+        "Filter(Condition('flag' eq True))",
+        "TopK(y asc, k=4)",
+    ]
+    assert len(plan.steps) == 4
+
+
+def test_projected_plan_only_loads_the_columns_it_reads(data_file):
+    plan = _plan(data_file, PIPELINES[2]).select(["id"])
+    assert plan.load_columns() == ["id", "x", "y"]
+    expected = [{"id": row["id"]} for row in _records(_unoptimized(plan))]
+    assert _records(plan.execute()) == expected
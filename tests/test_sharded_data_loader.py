@@ -0,0 +1,99 @@
+from .conftest import import_module
+import json, os
+import pandas as pd
+import pytest
+
+sharded = import_module("data_loader.sharded_data_loader")
+predicate = import_module("filter.predicate")
+parallel = import_module("parallel")
+zone_map = import_module("data_loader.zone_map")
+
+
+def _write_csv_shards(root):
+    # the eu file has its own region column, which takes precedence over the path
+    (root / "region=eu").mkdir()
+    (root / "region=eu" / "part-0.csv").write_text("id,region\n1,us\n2,eu\n")
+    (root / "region=us").mkdir()
+    (root / "region=us" / "part-0.csv").write_text("id,amount\n3,1.5\n4,2.5\n")
+
+
+def _write_json_shards(root):
+    for region, records in [
+        ("eu", [{"id": 1, "region": "us"}, {"id": 2}]),
+        ("us", [{"id": 3}, {"id": 4}]),
+    ]:
+        (root / f"region={region}").mkdir()
+        (root / f"region={region}" / "part-0.json").write_text(
+            json.dumps({"data": [{"item": record} for record in records]})
+        )
+
+
+def _ids(data):
+    if isinstance(data, pd.DataFrame):
+        return sorted(data["id"].tolist())
+    return sorted(item.item["id"] for item in data.data)
+
+
+@pytest.mark.parametrize("with_zone_map", [False, True])
+def test_file_columns_take_precedence_over_partition_values(tmp_path, with_zone_map):
+    _write_csv_shards(tmp_path)
+    loader = sharded.ShardedDataLoader(str(tmp_path / "**" / "*.csv"))
+    if with_zone_map:
+        # loading every shard writes their sidecars
+        loader.load_data()
+    for shard in loader.shards:
+        assert (zone_map.ZoneMap.load(shard.path) is not None) == with_zone_map
+
+    condition = predicate.parse_expression('region eq "us"')
+    assert len(loader.prune(condition)) == 2
+    data = loader.load_data(predicate=condition)
+    assert data[condition.mask(data)]["id"].tolist() == [1, 3, 4]
+
+    selected = loader.load_data(usecols=["id", "region"])
+    assert selected.sort_values("id")["region"].tolist() == ["us", "eu", "us", "us"]
+
+
+def test_partition_values_prune_files_without_the_column(tmp_path):
+    _write_csv_shards(tmp_path)
+    loader = sharded.ShardedDataLoader(str(tmp_path / "**" / "*.csv"))
+    condition = predicate.parse_expression("amount gt 0 and region eq eu")
+    assert loader.prune(condition) == [loader.shards[0]]
+    assert loader.prune(predicate.parse_expression('region eq "fr"')) == [
+        loader.shards[0]
+    ]
+
+
+@pytest.mark.parametrize("with_zone_map", [False, True])
+def test_json_shards_keep_their_own_keys(tmp_path, with_zone_map):
+    _write_json_shards(tmp_path)
+    loader = sharded.ShardedDataLoader(str(tmp_path / "**" / "*.json"))
+    assert _ids(loader.load_data()) == [1, 2, 3, 4]
+    if not with_zone_map:
+        for shard in loader.shards:
+            os.remove(zone_map.zone_map_path(shard.path))
+
+    condition = predicate.parse_expression('region eq "us"')
+    data = loader.load_data(predicate=condition)
+    records = [item.item for item in data.data]
+    assert sorted(
+        record["id"] for record in records if record.get("region") == "us"
+    ) == [
+        1,
+        3,
+        4,
+    ]
+    selected = loader.load_data(usecols=["id", "region"])
+    regions = {item.item["id"]: item.item.get("region") for item in selected.data}
+    # the eu file has the region key, its rows without one get no partition value
+    assert regions == {1: "us", 2: None, 3: "us", 4: "us"}
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_executor_reads_file_columns_named_like_partition_keys(tmp_path, workers):
+    _write_csv_shards(tmp_path)
+    executor = parallel.ParallelExecutor(workers=workers, partition_size=8)
+    condition = predicate.parse_expression('region eq "us"')
+    rows = executor.filter(
+        str(tmp_path / "**" / "*.csv"), condition, columns=["id", "region"]
+    )
+    assert sorted(rows["id"].tolist()) == [1, 3, 4]
@@ -0,0 +1,69 @@
+from .conftest import import_module
+import numpy as np
+import pandas as pd
+import pytest
+
+sketches = import_module("stats.sketches")
+
+N = 200_000
+
+
+def _accumulate(frame, **options):
+    accumulator = sketches.SketchAccumulator(**options)
+    accumulator.update_frame(frame)
+    return accumulator
+
+
+def test_all_unique_column_has_no_heavy_hitters():
+    accumulator = _accumulate(pd.DataFrame({"id": np.arange(N)}))
+    assert accumulator.get_heavy_hitter_stats() == {}
+
+
+def test_heavy_hitter_counts_are_within_the_error_bound():
+    rng = np.random.default_rng(3)
+    # 5 frequent values among unique noise
+    frequent = rng.choice(5, size=N // 2, p=[0.4, 0.3, 0.15, 0.1, 0.05])
+    values = np.concatenate([frequent, np.arange(100, 100 + N // 2)])
+    rng.shuffle(values)
+    frequency_error = 0.001
+    accumulator = _accumulate(
+        pd.DataFrame({"x": values}), frequency_error=frequency_error
+    )
+    heavy_hitters = accumulator.get_heavy_hitter_stats()["x"]
+    true_counts = pd.Series(values).value_counts()
+    assert set(heavy_hitters) == {str(value) for value in range(5)}
+    for value, count in heavy_hitters.items():
+        true_count = true_counts[int(value)]
+        assert true_count <= count <= true_count + frequency_error * N
+
+
+def test_distinct_count_is_within_the_error_bound():
+    distinct_error = 0.01
+    for distinct in (1_000, 50_000):
+        values = np.arange(N) % distinct
+        accumulator = _accumulate(
+            pd.DataFrame({"x": values}), distinct_error=distinct_error
+        )
+        estimate = accumulator.get_distinct_stats()["x"]["distinct_count"]
+        # 4 standard errors
+        assert abs(estimate - distinct) <= 4 * distinct_error * distinct
+
+
+def test_quantiles_are_within_the_rank_error():
+    rank_error = 0.01
+    values = np.random.default_rng(5).normal(size=N)
+    accumulator = _accumulate(pd.DataFrame({"x": values}), rank_error=rank_error)
+    ordered = np.sort(values)
+    for name, estimate in accumulator.get_quantile_stats()["x"].items():
+        q = float(name[1:]) / 100
+        rank = np.searchsorted(ordered, estimate) / N
+        assert abs(rank - q) <= rank_error
+
+
+def test_merged_sketches_match_one_sketch():
+    values = np.random.default_rng(7).integers(0, 20, size=N)
+    whole = _accumulate(pd.DataFrame({"x": values}))
+    merged = _accumulate(pd.DataFrame({"x": values[: N // 3]}))
+    merged.merge(_accumulate(pd.DataFrame({"x": values[N // 3 :]})))
+    assert merged.get_distinct_stats() == whole.get_distinct_stats()
+    assert merged.get_heavy_hitter_stats() == whole.get_heavy_hitter_stats()
@@ -0,0 +1,148 @@
+from .conftest import import_module
+import xml.etree.ElementTree as ET
+import pytest
+
+XMLWriter = import_module("models.data_containers.xml_writer").XMLWriter
+XMLDataContainer = import_module(
+    "models.data_containers.xml_data_container"
+).XMLDataContainer
+XMLDataLoader = import_module("data_loader.xml_data_loader").XMLDataLoader
+
+DOCUMENTS = [
+    {
+        "flowerShop": {
+            "flower": [
+                {"name": "Lily & <Rose>", "price": "3", "tags": ["a", "b"]},
+                {"name": 'say "hi"\n\ttab', "price": 4.5, "empty": ""},
+            ],
+            "owner": {"name": "Zoë ☃", "open": True, "closed": None},
+        }
+    },
+    {"root": "text only"},
+    {"root": {"a": {"b": {"c": {"d": "deep"}}}}},
+    {"root": {"list": [1, [2, 3], {"x": "y"}]}},
+]
+
+
+def _element_tree_xml(data, path):
+    """
+    The document written the way _from_py_dict did before streaming: an element tree
+    built recursively, then written by ElementTree.
+    """
+
+    def dict_to_xml(tag, value):
+        element = ET.Element(tag)
+        if isinstance(value, dict):
+            for key, child in value.items():
+                element.append(dict_to_xml(key, child))
+        elif isinstance(value, list):
+            for item in value:
+                element.append(dict_to_xml(tag, item))
+        else:
+            element.text = str(value)
+        return element
+
+    root_tag = list(data)[0]
+    ET.ElementTree(dict_to_xml(root_tag, data[root_tag])).write(
+        path, encoding="utf-8", xml_declaration=True
+    )
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_streamed_document_matches_element_tree(tmp_path, document):
+    streamed, expected = tmp_path / "streamed.xml", tmp_path / "expected.xml"
+    XMLDataContainer._from_py_dict(document, str(streamed))
+    _element_tree_xml(document, str(expected))
+    assert streamed.read_bytes() == expected.read_bytes()
+
+
+def test_document_round_trip(tmp_path):
+    document = {
+        "shop": {
+            "flower": [{"name": "Lily & co", "price": "3"}, {"name": "<Rose>"}],
+            "owner": {"name": "Zoë", "note": 'a "quote"'},
+        }
+    }
+    path = tmp_path / "shop.xml"
+    XMLDataContainer._from_py_dict(document, str(path))
+    # lists are nested in an element of their tag, as ElementTree wrote them
+    assert XMLDataContainer._as_py_dict(str(path)) == {
+        "shop": {
+            "flower": {"flower": document["shop"]["flower"]},
+            "owner": document["shop"]["owner"],
+        }
+    }
+
+
+RECORDS = [
+    {"@id": 1, "name": "Lily & <Rose>", "price": 3.5, "in_stock": True},
+    {"@id": 2, "name": 'say "hi"', "tags": ["red", "blue"], "address.city": "Zoë"},
+    {"@id": 3, "address.city": "Paris", "address.@zip": "07500", "count": 0},
+    {"name": "no id", "in_stock": False, "tags": ["a", "b", "c"], "code": "007"},
+]
+
+
+@pytest.mark.parametrize("coerce_types", [True, False])
+def test_records_round_trip(tmp_path, coerce_types):
+    path = tmp_path / "records.xml"
+    assert XMLDataContainer._write_records(RECORDS, str(path), "flower") == 4
+    records = list(
+        XMLDataContainer._iter_records(str(path), "flower", coerce_types=coerce_types)
+    )
+    if coerce_types:
+        assert records == RECORDS
+    else:
+        assert records == [
+            {
+                key: (
+                    [XMLDataContainer._format_value(v) for v in value]
+                    if isinstance(value, list)
+                    else XMLDataContainer._format_value(value)
+                )
+                for key, value in record.items()
+            }
+            for record in RECORDS
+        ]
+
+
+def test_leaf_records_round_trip(tmp_path):
+    path = tmp_path / "leaves.xml"
+    records = [{"flower": "Lily"}, {"flower": "Rose & Tulip"}, {"flower": 7}]
+    XMLDataContainer._write_records(records, str(path), "flower")
+    assert list(XMLDataContainer._iter_records(str(path), "flower", True)) == records
+
+
+def test_loader_saves_the_records_it_loads(tmp_path):
+    source, copy = tmp_path / "source.xml", tmp_path / "copy.xml"
+    XMLDataContainer._write_records(RECORDS, str(source), "flower")
+    loader = XMLDataLoader(str(source), record_tag="flower")
+    loader.write_zone_maps = False
+    data = loader.load_data()
+    copy.write_text("")
+    assert XMLDataLoader(str(copy), record_tag="flower").save_records(data.data) == 4
+    assert copy.read_bytes() == source.read_bytes()
+
+
+def test_writer_rejects_unbalanced_elements(tmp_path):
+    with pytest.raises(ValueError, match="Unclosed"):
+        with XMLWriter(str(tmp_path / "open.xml")) as writer:
+            writer.start("root")
+    with pytest.raises(ValueError, match="No open"):
+        with XMLWriter(str(tmp_path / "closed.xml")) as writer:
+            writer.end()
+
+
+def test_writer_escapes_like_element_tree(tmp_path):
+    path = tmp_path / "escaped.xml"
+    attrib = {"a": 'x"y\n\t<&>', "b": "plain"}
+    with XMLWriter(str(path)) as writer:
+        writer.start("root", attrib)
+        writer.element("empty")
+        writer.element("text", "1 < 2 & 3 > \"2\" 'x'")
+        writer.end()
+    root = ET.Element("root", attrib)
+    ET.SubElement(root, "empty")
+    ET.SubElement(root, "text").text = "1 < 2 & 3 > \"2\" 'x'"
+    expected = tmp_path / "expected.xml"
+    ET.ElementTree(root).write(str(expected), encoding="utf-8", xml_declaration=True)
+    assert path.read_bytes() == expected.read_bytes()
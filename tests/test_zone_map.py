@@ -0,0 +1,75 @@
+from .conftest import import_module
+import glob, os
+import pandas as pd
+import pytest
+
+CSVDataLoader = import_module("data_loader.csv_data_loader").CSVDataLoader
+QueryPlan = import_module("query_plan").QueryPlan
+predicate = import_module("filter.predicate")
+zone_map = import_module("data_loader.zone_map")
+
+EXPRESSIONS = [
+    "not x eq 5",
+    "x eq 5",
+    "not (x eq 5 and id lt 3)",
+    "x gt 5 or not x lt 100",
+    "not name contains a",
+]
+
+
+def _run(directory, expression):
+    plan = QueryPlan(str(directory)).where(predicate.parse_expression(expression))
+    return sorted(plan.execute()["id"].tolist())
+
+
+def _remove_sidecars(directory):
+    for path in glob.glob(os.path.join(directory, "*" + zone_map.ZONE_MAP_SUFFIX)):
+        os.remove(path)
+
+
+@pytest.mark.parametrize("expression", EXPRESSIONS)
+def test_file_pruning_matches_unpruned_results(tmp_path, expression):
+    (tmp_path / "a.csv").write_text("id,x,name\n1,5,a\n2,,b\n3,5,\n")
+    (tmp_path / "b.csv").write_text("id,x,name\n4,7,a\n5,5,a\n")
+    (tmp_path / "c.csv").write_text("id,x,name\n6,5,a\n7,5,a\n")
+    unpruned = _run(tmp_path, expression)
+    # the first run wrote the sidecars, the second one prunes with them
+    assert glob.glob(str(tmp_path / ("*" + zone_map.ZONE_MAP_SUFFIX)))
+    assert _run(tmp_path, expression) == unpruned
+    _remove_sidecars(tmp_path)
+    assert _run(tmp_path, expression) == unpruned
+
+
+@pytest.mark.parametrize("expression", EXPRESSIONS)
+def test_row_group_pruning_matches_unpruned_results(tmp_path, expression):
+    path = tmp_path / "data.csv"
+    path.write_text("id,x,name\n1,5,a\n2,5,a\n3,,a\n4,5,\n5,7,b\n6,5,a\n7,5,a\n8,9,c\n")
+    condition = predicate.parse_expression(expression)
+    loader = CSVDataLoader(str(path))
+    loader.write_zone_maps = False
+    data = loader.load_data()
+    expected = data[condition.mask(data)]
+
+    zone_map.ZoneMap.build(data, str(path), row_group_size=2).save(str(path))
+    pruned = CSVDataLoader(str(path)).load_data(predicate=condition)
+    pd.testing.assert_frame_equal(pruned[condition.mask(pruned)], expected)
+
+
+@pytest.mark.parametrize("mode", [0o644, 0o640])
+def test_sidecar_gets_the_mode_of_the_data_file(tmp_path, mode):
+    path = tmp_path / "data.csv"
+    path.write_text("id,x\n1,5\n")
+    os.chmod(path, mode)
+    CSVDataLoader(str(path)).load_data()
+    sidecar = zone_map.zone_map_path(str(path))
+    assert os.stat(sidecar).st_mode & 0o777 == mode
+
+
+def test_read_only_directory_is_skipped_silently(tmp_path, monkeypatch, caplog):
+    path = tmp_path / "data.csv"
+    path.write_text("id,x\n1,5\n")
+    monkeypatch.setattr(zone_map.os, "access", lambda path, mode: False)
+    data = CSVDataLoader(str(path)).load_data()
+    assert data["id"].tolist() == [1]
+    assert not os.path.exists(zone_map.zone_map_path(str(path)))
+    assert "zone map" not in caplog.text